@@ -1,4 +1,6 @@
 
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
@@ -6,6 +8,7 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.core.security import decode_token
 from app.db.session import SessionLocal
+from app.models.account import Account
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -49,3 +52,9 @@ def require_admin(current_user: User = Depends(get_current_active_user)) -> User
             detail="No tienes permisos para esta acción",
         )
     return current_user
+
+
+def check_account(db: Session, account_id: Optional[int]):
+    """400 si se asigna una cuenta de SuperCarros que no existe (0/None = la del servidor)."""
+    if account_id and db.query(Account).get(account_id) is None:
+        raise HTTPException(status_code=400, detail="Cuenta de SuperCarros no encontrada")
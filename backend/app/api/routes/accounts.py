@@ -0,0 +1,102 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, require_admin
+from app.core.security import encrypt_secret
+from app.models.account import Account
+from app.models.brand import Brand
+from app.models.schedule import Schedule
+from app.schemas.common import AccountCreate, AccountOut, AccountUpdate
+from app.services.session_cache import session_cache_for
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[AccountOut])
+def list_accounts(db: Session = Depends(get_db), admin=Depends(require_admin)):
+    return db.query(Account).order_by(Account.name).all()
+
+
+@router.post("/", response_model=AccountOut)
+def create_account(
+    account_in: AccountCreate,
+    db: Session = Depends(get_db),
+    admin=Depends(require_admin),
+):
+    existing = db.query(Account).filter(Account.name == account_in.name).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="La cuenta ya existe")
+    account = Account(
+        name=account_in.name,
+        username=account_in.username,
+        encrypted_password=encrypt_secret(account_in.password),
+        base_url=account_in.base_url,
+        max_concurrency=account_in.max_concurrency,
+        is_active=account_in.is_active,
+    )
+    db.add(account)
+    db.commit()
+    db.refresh(account)
+    return account
+
+
+@router.put("/{account_id}", response_model=AccountOut)
+def update_account(
+    account_id: int,
+    account_in: AccountUpdate,
+    db: Session = Depends(get_db),
+    admin=Depends(require_admin),
+):
+    account = db.query(Account).get(account_id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Cuenta no encontrada")
+    if account_in.name is not None:
+        account.name = account_in.name
+    if account_in.base_url is not None:
+        account.base_url = account_in.base_url or None
+    if account_in.max_concurrency is not None:
+        account.max_concurrency = account_in.max_concurrency or None
+    if account_in.is_active is not None:
+        account.is_active = account_in.is_active
+
+    credentials_changed = False
+    if account_in.username is not None and account_in.username != account.username:
+        account.username = account_in.username
+        credentials_changed = True
+    if account_in.password is not None:
+        account.encrypted_password = encrypt_secret(account_in.password)
+        credentials_changed = True
+
+    db.add(account)
+    db.commit()
+    db.refresh(account)
+    if credentials_changed:
+        # la sesión guardada era de las credenciales anteriores
+        session_cache_for(account.id).invalidate()
+    return account
+
+
+@router.delete("/{account_id}")
+def delete_account(
+    account_id: int,
+    db: Session = Depends(get_db),
+    admin=Depends(require_admin),
+):
+    account = db.query(Account).get(account_id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Cuenta no encontrada")
+    in_use = (
+        db.query(Brand).filter(Brand.account_id == account_id).count()
+        + db.query(Schedule).filter(Schedule.account_id == account_id).count()
+    )
+    if in_use:
+        raise HTTPException(
+            status_code=400,
+            detail="La cuenta tiene marcas o programaciones asignadas",
+        )
+    db.delete(account)
+    db.commit()
+    session_cache_for(account_id).invalidate()
+    return {"detail": "Cuenta eliminada"}
@@ -4,7 +4,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_active_user, require_admin
+from app.api.deps import check_account, get_db, get_current_active_user, require_admin
 from app.models.brand import Brand
 from app.schemas.common import BrandCreate, BrandOut, BrandUpdate
 
@@ -25,7 +25,12 @@ def create_brand(
     existing = db.query(Brand).filter(Brand.name == brand_in.name).first()
     if existing:
         raise HTTPException(status_code=400, detail="La marca ya existe")
-    brand = Brand(name=brand_in.name, is_active=brand_in.is_active)
+    check_account(db, brand_in.account_id)
+    brand = Brand(
+        name=brand_in.name,
+        is_active=brand_in.is_active,
+        account_id=brand_in.account_id or None,
+    )
     db.add(brand)
     db.commit()
     db.refresh(brand)
@@ -46,6 +51,10 @@ def update_brand(
         brand.name = brand_in.name
     if brand_in.is_active is not None:
         brand.is_active = brand_in.is_active
+    if brand_in.account_id is not None:
+        # 0 = volver a la cuenta del servidor
+        check_account(db, brand_in.account_id)
+        brand.account_id = brand_in.account_id or None
     db.add(brand)
     db.commit()
     db.refresh(brand)
@@ -0,0 +1,160 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_active_user
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.brand import Brand
+from app.models.job import RepublicationJob
+from app.models.run import RepublicationRun
+from app.schemas.common import JobOut
+from app.services.progress import progress_hub
+
+router = APIRouter()
+
+FINISHED_STATUSES = ("completed", "failed")
+
+
+def _sse(event: Dict) -> str:
+    data = json.dumps(event, default=datetime.isoformat)
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+
+def _job_snapshot(job_id: int) -> Optional[Dict]:
+    """Estado actual del job y de sus corridas, para el primer evento."""
+    db: Session = SessionLocal()
+    try:
+        job = db.query(RepublicationJob).get(job_id)
+        if not job:
+            return None
+        runs = (
+            db.query(RepublicationRun, Brand.name)
+            .join(Brand, Brand.id == RepublicationRun.brand_id)
+            .filter(RepublicationRun.job_id == job_id)
+            .order_by(RepublicationRun.id.asc())
+            .all()
+        )
+        return {
+            "type": "snapshot",
+            "job_id": job.id,
+            "status": job.status,
+            "error": job.error,
+            "runs": [
+                {
+                    "id": r.id,
+                    "brand_id": r.brand_id,
+                    "brand": brand_name,
+                    "schedule_id": r.schedule_id,
+                    "status": r.status,
+                    "ads_found": r.ads_found,
+                    "ads_bumped": r.ads_bumped,
+                    "vehicles_count": r.vehicles_count,
+                }
+                for r, brand_name in runs
+            ],
+        }
+    finally:
+        db.close()
+
+
+async def _event_stream(request: Request, job_id: Optional[int] = None):
+    queue = progress_hub.subscribe(job_id)
+    try:
+        if job_id is not None:
+            snapshot = await asyncio.to_thread(_job_snapshot, job_id)
+            # el job pudo borrarse entre el 404 del endpoint y este punto
+            if snapshot is None:
+                return
+            yield _sse(snapshot)
+            if snapshot["status"] in FINISHED_STATUSES:
+                return
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=settings.PROGRESS_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if job_id is None:
+                    yield ": keepalive\n\n"
+                    continue
+                # el job puede estar corriendo en otro proceso: refrescar desde la BD
+                snapshot = await asyncio.to_thread(_job_snapshot, job_id)
+                if snapshot is None:
+                    return
+                yield _sse(snapshot)
+                if snapshot["status"] in FINISHED_STATUSES:
+                    return
+                continue
+            yield _sse(event)
+            if job_id is not None and event.get("type") == "job_finished":
+                return
+    finally:
+        progress_hub.unsubscribe(queue)
+
+
+def _sse_response(stream) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/", response_model=List[JobOut])
+def list_jobs(
+    status: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_active_user),
+):
+    """Últimos 50 jobs, opcionalmente filtrados por estado."""
+    q = db.query(RepublicationJob)
+    if status:
+        q = q.filter(RepublicationJob.status == status)
+    return q.order_by(RepublicationJob.id.desc()).limit(50).all()
+
+
+@router.get("/events")
+async def stream_all_events(
+    request: Request,
+    user=Depends(get_current_active_user),
+):
+    """
+    Server-Sent Events con el avance de todas las corridas de este proceso.
+    Los eventos salen de memoria: con JOB_WORKERS=0 (jobs en app.runner) este
+    proceso no corre jobs y el stream solo manda keepalives. En ese caso usar
+    /{job_id}/events, que refresca el estado desde la BD.
+    """
+    return _sse_response(_event_stream(request))
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: int,
+    request: Request,
+    user=Depends(get_current_active_user),
+):
+    """
+    Server-Sent Events con el avance del job: un "snapshot" inicial y luego
+    brand_started, ad_bumped, brand_finished y job_finished (cierra el stream).
+    """
+    if await asyncio.to_thread(_job_snapshot, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    return _sse_response(_event_stream(request, job_id))
+
+
+@router.get("/{job_id}", response_model=JobOut)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_active_user),
+):
+    job = db.query(RepublicationJob).get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    return job
@@ -1,4 +1,3 @@
-from datetime import datetime
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -7,22 +6,24 @@ from sqlalchemy.orm import Session
 from app.api.deps import get_db, get_current_active_user
 from app.models.brand import Brand
 from app.models.run import RepublicationRun
-from app.schemas.common import ManualRunRequest, ManualRunOut
-from app.services.supercarros import run_republication_job
+from app.schemas.common import JobOut, ManualRunRequest, ManualRunOut
+from app.services.job_queue import enqueue_job
+from app.services.run_history import status_label
 
 router = APIRouter()
 
 
-@router.post("/run", response_model=List[ManualRunOut])
+@router.post("/run", response_model=JobOut, status_code=202)
 def run_manual_republication(
     request: ManualRunRequest,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
 ):
     """
-    Ejecuta republicación manual:
+    Encola una republicación manual y responde de inmediato con el job:
       - Si all_brands = True => todas las marcas activas
       - Si brand_ids => solo esas marcas
+    El avance se consulta en GET /api/jobs/{id}.
     """
     if request.all_brands:
         brands = db.query(Brand).filter(Brand.is_active == True).all()
@@ -41,40 +42,16 @@ def run_manual_republication(
     if not brands:
         raise HTTPException(status_code=400, detail="No se encontraron marcas")
 
-    brand_names = [b.name for b in brands]
-
-    now = datetime.utcnow()
-    outputs: List[ManualRunOut] = []
-
-    try:
-        results = run_republication_job(brand_names)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error en republicación: {e}")
-
-    for b in brands:
-        count = int(results.get(b.name, 0))
-        run = RepublicationRun(
-            schedule_id=None,
-            brand_id=b.id,
-            user_id=current_user.id,
-            vehicles_count=count,
-            run_at=now,
-            status="completed",
-            is_manual=True,
-        )
-        db.add(run)
-
-        outputs.append(
-            ManualRunOut(
-                brand_name=b.name,
-                vehicles_count=count,
-                run_at=now,
-                status="Ejecutado",
-            )
-        )
-
-    db.commit()
-    return outputs
+    return enqueue_job(
+        db,
+        kind="manual",
+        user_id=current_user.id,
+        payload={
+            "brand_ids": [b.id for b in brands],
+            "all_brands": request.all_brands,
+            "bump_mode": request.bump_mode,
+        },
+    )
 
 
 @router.get("/history", response_model=List[ManualRunOut])
@@ -84,6 +61,7 @@ def manual_history(
 ):
     """
     Historial de republicaciones manuales (últimas 100).
+    Para filtros y paginación completa usar /api/runs.
     """
     q = (
         db.query(RepublicationRun, Brand)
@@ -95,17 +73,12 @@ def manual_history(
 
     results: List[ManualRunOut] = []
     for run, brand in q.all():
-        status_label = {
-            "completed": "Ejecutado",
-            "running": "En proceso",
-            "failed": "Fallido",
-        }.get(run.status or "completed", "Ejecutado")
         results.append(
             ManualRunOut(
                 brand_name=brand.name,
                 vehicles_count=run.vehicles_count,
                 run_at=run.run_at,
-                status=status_label,
+                status=status_label(run.status),
             )
         )
     return results
@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_active_user
+from app.db.session import SessionLocal
+from app.schemas.common import RunPage
+from app.services.run_history import export_csv, export_ndjson, page_runs, runs_query
+
+router = APIRouter()
+
+
+def _filters(
+    schedule_id: Optional[int] = None,
+    brand_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    is_manual: Optional[bool] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    return {
+        "schedule_id": schedule_id,
+        "brand_id": brand_id,
+        "user_id": user_id,
+        "status": status,
+        "is_manual": is_manual,
+        "start": start,
+        "end": end,
+    }
+
+
+@router.get("/", response_model=RunPage)
+def list_runs(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    filters: dict = Depends(_filters),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_active_user),
+):
+    """
+    Historial de corridas (manuales y programadas), de la más nueva a la más
+    vieja. Para la siguiente página se envía el next_cursor recibido.
+    """
+    try:
+        items, next_cursor = page_runs(runs_query(db, **filters), limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return RunPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/export")
+def export_runs(
+    format: Literal["csv", "ndjson"] = "csv",
+    filters: dict = Depends(_filters),
+    user=Depends(get_current_active_user),
+):
+    """Exporta todas las corridas filtradas en streaming (CSV o NDJSON)."""
+    writer = export_csv if format == "csv" else export_ndjson
+
+    def stream():
+        # sesión propia: la del request se cierra antes de terminar el stream
+        db: Session = SessionLocal()
+        try:
+            yield from writer(runs_query(db, **filters))
+        finally:
+            db.close()
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"runs.{format}"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
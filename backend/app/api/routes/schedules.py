@@ -1,20 +1,29 @@
 from typing import List
-from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_active_user, require_admin
-from app.models.brand import Brand
+from app.api.deps import check_account, get_db, get_current_active_user, require_admin
+from app.db.queries import (
+    get_schedule_with_brands,
+    schedules_with_brands,
+    set_schedule_brands,
+)
 from app.models.schedule import Schedule, ScheduleBrand
-from app.models.run import RepublicationRun
-from app.schemas.common import ScheduleCreate, ScheduleOut, ScheduleUpdate
+from app.schemas.common import (
+    JobOut,
+    ScheduleCreate,
+    ScheduleOut,
+    ScheduleUpdate,
+    UpcomingRunOut,
+)
+from app.services.job_queue import enqueue_job
+from app.services.schedule_index import upcoming_runs
 from app.services.scheduler import (
     refresh_schedule_job,
     remove_schedule_job,
     compute_next_run_for_schedule,
 )
-from app.services.supercarros import run_republication_job
 
 router = APIRouter()
 
@@ -23,10 +32,24 @@ router = APIRouter()
 def list_schedules(
     db: Session = Depends(get_db), user=Depends(get_current_active_user)
 ):
-    schedules = db.query(Schedule).all()
+    schedules = schedules_with_brands(db).all()
     return schedules
 
 
+@router.get("/upcoming", response_model=List[UpcomingRunOut])
+def list_upcoming_runs(
+    limit: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_active_user),
+):
+    """Próximas ejecuciones de todas las programaciones activas (calendario)."""
+    schedules = db.query(Schedule).filter(Schedule.is_active == True).all()
+    return [
+        UpcomingRunOut(schedule_id=s.id, schedule_name=s.name, run_at=run_at)
+        for run_at, s in upcoming_runs(schedules, limit)
+    ]
+
+
 @router.post("/", response_model=ScheduleOut)
 def create_schedule(
     schedule_in: ScheduleCreate,
@@ -50,23 +73,24 @@ def create_schedule(
             detail="Debes seleccionar al menos una marca",
         )
 
+    check_account(db, schedule_in.account_id)
     schedule = Schedule(
         name=schedule_in.name,
         interval_minutes=schedule_in.interval_minutes,
         is_active=schedule_in.is_active,
         days_of_week=schedule_in.days_of_week,
         times_of_day=schedule_in.times_of_day,
+        max_instances=schedule_in.max_instances,
+        coalesce=schedule_in.coalesce,
+        misfire_grace_time=schedule_in.misfire_grace_time,
+        account_id=schedule_in.account_id or None,
     )
     db.add(schedule)
     db.commit()
     db.refresh(schedule)
 
     # Asociar marcas
-    for brand_id in schedule_in.brand_ids:
-        brand = db.query(Brand).get(brand_id)
-        if brand:
-            sb = ScheduleBrand(schedule_id=schedule.id, brand_id=brand.id)
-            db.add(sb)
+    set_schedule_brands(db, schedule.id, schedule_in.brand_ids)
     db.commit()
     db.refresh(schedule)
 
@@ -77,7 +101,7 @@ def create_schedule(
     db.refresh(schedule)
 
     refresh_schedule_job(schedule.id, db)
-    return schedule
+    return get_schedule_with_brands(db, schedule.id)
 
 
 @router.put("/{schedule_id}", response_model=ScheduleOut)
@@ -101,20 +125,23 @@ def update_schedule(
         schedule.days_of_week = schedule_in.days_of_week
     if schedule_in.times_of_day is not None:
         schedule.times_of_day = schedule_in.times_of_day
+    if schedule_in.max_instances is not None:
+        schedule.max_instances = schedule_in.max_instances
+    if schedule_in.coalesce is not None:
+        schedule.coalesce = schedule_in.coalesce
+    if schedule_in.misfire_grace_time is not None:
+        schedule.misfire_grace_time = schedule_in.misfire_grace_time
+    if schedule_in.account_id is not None:
+        # 0 = volver a la cuenta del servidor
+        check_account(db, schedule_in.account_id)
+        schedule.account_id = schedule_in.account_id or None
 
     db.add(schedule)
     db.commit()
 
     # actualizar marcas si llegan
     if schedule_in.brand_ids is not None:
-        db.query(ScheduleBrand).filter(
-            ScheduleBrand.schedule_id == schedule.id
-        ).delete()
-        for brand_id in schedule_in.brand_ids:
-            brand = db.query(Brand).get(brand_id)
-            if brand:
-                sb = ScheduleBrand(schedule_id=schedule.id, brand_id=brand.id)
-                db.add(sb)
+        set_schedule_brands(db, schedule.id, schedule_in.brand_ids)
         db.commit()
 
     db.refresh(schedule)
@@ -126,60 +153,41 @@ def update_schedule(
     db.refresh(schedule)
 
     refresh_schedule_job(schedule.id, db)
-    return schedule
+    return get_schedule_with_brands(db, schedule.id)
 
 
-@router.post("/{schedule_id}/run-once")
+@router.post("/{schedule_id}/run-once", response_model=JobOut, status_code=202)
 def run_schedule_once(
     schedule_id: int,
     db: Session = Depends(get_db),
     user=Depends(get_current_active_user),
 ):
+    """
+    Encola una ejecución inmediata de la programación y responde con el job.
+    El avance se consulta en GET /api/jobs/{id}.
+    """
     schedule = db.query(Schedule).get(schedule_id)
     if not schedule:
         raise HTTPException(status_code=404, detail="Programación no encontrada")
 
-    # obtener nombres de marcas
-    brand_links = (
+    has_brands = (
         db.query(ScheduleBrand)
         .filter(ScheduleBrand.schedule_id == schedule.id)
-        .all()
+        .first()
     )
-    brand_names = []
-    for bl in brand_links:
-        brand = db.query(Brand).get(bl.brand_id)
-        if brand:
-            brand_names.append(brand.name)
-
-    if not brand_names:
+    if not has_brands:
         raise HTTPException(
             status_code=400, detail="La programación no tiene marcas asociadas"
         )
 
-    # correr playwright
-    results = run_republication_job(brand_names)
-
-    now = datetime.utcnow()
-    for brand_name, count in results.items():
-        brand = db.query(Brand).filter(Brand.name == brand_name).first()
-        if brand and count >= 0:
-            run = RepublicationRun(
-                schedule_id=schedule.id,
-                brand_id=brand.id,
-                user_id=user.id,
-                vehicles_count=count,
-                run_at=now,
-                status="completed",
-                is_manual=False,
-            )
-            db.add(run)
-    schedule.last_run_at = now
-    schedule.next_run_at = compute_next_run_for_schedule(schedule, now)
-    db.add(schedule)
-    db.commit()
-    db.refresh(schedule)
-
-    return {"detail": "Ejecución manual completada", "results": results}
+    # run_once: no espera a combinarse ni cuenta para max_instances del cron
+    return enqueue_job(
+        db,
+        kind="schedule",
+        payload={"run_once": True},
+        user_id=user.id,
+        schedule_id=schedule.id,
+    )
 
 
 @router.post("/{schedule_id}/pause")
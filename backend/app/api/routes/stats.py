@@ -1,15 +1,12 @@
+from datetime import date, datetime, timedelta
+from typing import List, Literal, Optional
 
-from datetime import datetime, timedelta
-from typing import List
-
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from app.api.deps import get_db, get_current_active_user
-from app.models.run import RepublicationRun
-from app.models.brand import Brand
 from app.schemas.common import BrandStatsItem
+from app.services.stats import brand_stats
 
 router = APIRouter()
 
@@ -19,28 +16,23 @@ def brand_stats_last_month(
     db: Session = Depends(get_db),
     user=Depends(get_current_active_user),
 ):
-    now = datetime.utcnow()
-    from_date = now - timedelta(days=30)
+    today = datetime.utcnow().date()
+    return brand_stats(db, today - timedelta(days=30), today, "day")
 
-    q = (
-        db.query(
-            Brand.name.label("brand_name"),
-            func.date(RepublicationRun.run_at).label("date"),
-            func.sum(RepublicationRun.vehicles_count).label("vehicles_count"),
-        )
-        .join(Brand, Brand.id == RepublicationRun.brand_id)
-        .filter(RepublicationRun.run_at >= from_date)
-        .group_by(Brand.name, func.date(RepublicationRun.run_at))
-        .order_by(func.date(RepublicationRun.run_at).asc())
-    )
 
-    results = []
-    for row in q.all():
-        results.append(
-            BrandStatsItem(
-                brand_name=row.brand_name,
-                date=row.date,
-                vehicles_count=row.vehicles_count,
-            )
-        )
-    return results
+@router.get("/brands", response_model=List[BrandStatsItem])
+def brand_stats_range(
+    start: date,
+    end: Optional[date] = None,
+    granularity: Literal["day", "week", "month"] = Query("day"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_active_user),
+):
+    """
+    Vehículos republicados por marca entre start y end (inclusive),
+    agrupados por día, semana (desde el lunes) o mes.
+    """
+    end = end or datetime.utcnow().date()
+    if end < start:
+        raise HTTPException(status_code=400, detail="La fecha final es anterior a la inicial")
+    return brand_stats(db, start, end, granularity)
@@ -1,5 +1,7 @@
 import os
 from functools import lru_cache
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -22,6 +24,136 @@ class Settings(BaseSettings):
     # Credenciales de SuperCarros (variables de entorno)
     SUPERCARROS_USER: str = "SC_USER"
     SUPERCARROS_PASS: str = "SC_PASS"
+    SUPERCARROS_BASE_URL: str = "https://clientes.supercarros.com"
+
+    # Cuentas adicionales en la tabla supercarros_accounts; las marcas sin
+    # cuenta usan SUPERCARROS_USER/SUPERCARROS_PASS. Clave Fernet para cifrar
+    # sus claves (vacío = derivada de SECRET_KEY).
+    CREDENTIALS_KEY: str = ""
+
+    # Sesión de SuperCarros reutilizada entre corridas (storage_state)
+    # (cada cuenta adicional usa <archivo>.account<id>.json)
+    SUPERCARROS_SESSION_FILE: str = ".supercarros_session.json"
+    SUPERCARROS_SESSION_MAX_AGE_MINUTES: int = 12 * 60
+
+    # Máximo de contextos en paralelo por cuenta de SuperCarros
+    SUPERCARROS_MAX_CONCURRENCY: int = 2
+
+    # Esperas por evento en la republicación (ver app/services/waits.py)
+    # Timeouts por paso en ms, ej: {"brand_filter": 8000, "bump_save": 15000}
+    SUPERCARROS_WAIT_TIMEOUTS_MS: Dict[str, int] = {}
+    # Regex opcional de la URL del filtro de marca / del POST de republicación.
+    # Vacío = cualquier XHR/fetch/documento (POST en el caso de republicar).
+    SUPERCARROS_FILTER_URL_PATTERN: str = ""
+    SUPERCARROS_BUMP_URL_PATTERN: str = ""
+
+    # Modo de republicación por defecto: "browser" (clics) o "http" (httpx directo)
+    SUPERCARROS_BUMP_MODE: str = "browser"
+    SUPERCARROS_HTTP_CONCURRENCY: int = 4
+    SUPERCARROS_HTTP_TIMEOUT_SECONDS: float = 20.0
+
+    # Reintentos y circuit breaker (ver app.services.resilience)
+    SUPERCARROS_RETRY_ATTEMPTS: int = 3  # por anuncio
+    SUPERCARROS_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    SUPERCARROS_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    SUPERCARROS_BRAND_ATTEMPTS: int = 3  # recreando página/contexto
+    CIRCUIT_FAILURE_THRESHOLD: int = 8  # fallas seguidas para abrir
+    CIRCUIT_COOLDOWN_SECONDS: int = 60
+    CIRCUIT_MAX_WAIT_SECONDS: int = 300  # pausa máxima antes de abortar la corrida
+
+    # Límite de republicaciones por cuenta de SuperCarros, compartido en la BD
+    # entre todas las páginas, contextos y procesos (ver app.services.rate_limit)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_INITIAL_PER_MINUTE: float = 30.0
+    RATE_LIMIT_MIN_PER_MINUTE: float = 6.0
+    RATE_LIMIT_MAX_PER_MINUTE: float = 240.0
+    RATE_LIMIT_BURST: int = 5
+    RATE_LIMIT_INCREASE_PER_MINUTE: float = 6.0  # subida por minuto sin problemas
+    RATE_LIMIT_DECREASE_FACTOR: float = 0.5  # al ver errores o lentitud
+    RATE_LIMIT_DECREASE_COOLDOWN_SECONDS: int = 15
+    RATE_LIMIT_TARGET_LATENCY_MS: int = 8000
+
+    # Scheduler: solo el proceso con el lease "scheduler" en la BD lo corre
+    SCHEDULER_ENABLED: bool = True  # false = este proceso nunca compite por el lease
+    SCHEDULER_LEASE_TTL_SECONDS: int = 30
+    SCHEDULER_HEARTBEAT_SECONDS: int = 10
+    SCHEDULER_SYNC_SECONDS: int = 60  # recarga de programaciones cambiadas
+    # Políticas por defecto (cada programación puede sobreescribirlas)
+    SCHEDULER_MAX_INSTANCES: int = 1
+    SCHEDULER_COALESCE: bool = True
+    SCHEDULER_MISFIRE_GRACE_SECONDS: int = 15 * 60
+    # Hilos del executor (0 = BROWSER_POOL_SIZE)
+    SCHEDULER_EXECUTOR_WORKERS: int = 0
+
+    # Cola de jobs de republicación (tabla republication_jobs)
+    JOB_WORKERS: int = 1  # hilos que ejecutan jobs en este proceso (0 = solo encolar)
+    JOB_POLL_SECONDS: int = 5
+    # "running" más viejo que esto se re-encola
+    # (0 = RUNNER_JOB_TIMEOUT_SECONDS + 5 min; 120 si el runner no tiene límite)
+    JOB_STALE_MINUTES: int = 0
+    JOB_MAX_ATTEMPTS: int = 3
+
+    # Runner aparte (python -m app.runner): procesos hijos que corren los jobs
+    # con Chromium, fuera de los workers de la API (ahí usar JOB_WORKERS=0)
+    RUNNER_PROCESSES: int = 2
+    RUNNER_JOB_TIMEOUT_SECONDS: int = 60 * 60  # 0 = sin límite
+    RUNNER_MAX_MEMORY_MB: int = 2048  # proceso + Chromium (0 = sin límite)
+    RUNNER_MAX_JOBS_PER_PROCESS: int = 20  # reciclar el proceso tras N jobs
+    RUNNER_CHECK_SECONDS: float = 1.0
+    RUNNER_SHUTDOWN_GRACE_SECONDS: int = 60
+    # Métricas de Prometheus del runner y sus hijos (0 = no servirlas)
+    RUNNER_METRICS_PORT: int = 9101
+    RUNNER_METRICS_DIR: str = ".runner_metrics"  # se vacía al arrancar
+
+    # Planificador: programaciones encoladas dentro de esta ventana se
+    # ejecutan en una sola sesión (0 = desactivado)
+    PLANNER_WINDOW_SECONDS: int = 60
+    PLANNER_SETTLE_SECONDS: int = 5  # espera desde el encolado antes de combinar
+
+    # Bitácora por anuncio (ad_bumps)
+    LEDGER_BATCH_SIZE: int = 50  # fallas y omisiones; los republicados se escriben al momento
+    # anuncios republicados por cualquier corrida en esta ventana no se vuelven
+    # a republicar, incluso en corridas manuales (0 = solo retomar el mismo job)
+    LEDGER_SKIP_WINDOW_MINUTES: int = 0
+
+    # Avance en vivo de las corridas
+    PROGRESS_PERSIST_EVERY: int = 10  # guardar ads_bumped cada N anuncios
+    PROGRESS_QUEUE_SIZE: int = 1000  # eventos pendientes por cliente SSE
+    PROGRESS_KEEPALIVE_SECONDS: int = 15
+
+    # Pool de navegadores Chromium calientes
+    BROWSER_POOL_SIZE: int = 2
+    BROWSER_HEADLESS: bool = True
+    BROWSER_CONTEXTS_PER_BROWSER: int = 4
+    BROWSER_MAX_RUNS: int = 20  # reciclar el navegador tras N corridas
+    BROWSER_MAX_MEMORY_MB: int = 1024  # o al superar esta memoria (0 = sin límite)
+    BROWSER_HEALTHCHECK_SECONDS: int = 60
+    BROWSER_LEAN_LAUNCH: bool = True  # flags que apagan GPU, extensiones, sync...
+    BROWSER_EXTRA_ARGS: List[str] = []
+
+    # Pedidos de red que se bloquean en los contextos (ver app/services/resource_policy.py)
+    RESOURCE_BLOCKING_ENABLED: bool = True
+    # tipos de Playwright: image, media, font, stylesheet, script, xhr, fetch...
+    RESOURCE_BLOCKED_TYPES: List[str] = ["image", "media", "font"]
+    RESOURCE_BLOCKED_DOMAINS: List[str] = [
+        "doubleclick.net",
+        "googlesyndication.com",
+        "googleadservices.com",
+        "adservice.google.com",
+        "google-analytics.com",
+        "googletagmanager.com",
+        "googletagservices.com",
+        "facebook.net",
+        "hotjar.com",
+        "clarity.ms",
+        "scorecardresearch.com",
+        "amazon-adsystem.com",
+        "adnxs.com",
+        "criteo.com",
+        "taboola.com",
+        "outbrain.com",
+    ]
+    RESOURCE_ALLOWED_DOMAINS: List[str] = []  # nunca se bloquean
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -29,6 +161,14 @@ class Settings(BaseSettings):
         extra="ignore",
     )
 
+    @property
+    def job_stale_minutes(self) -> int:
+        if self.JOB_STALE_MINUTES:
+            return self.JOB_STALE_MINUTES
+        if self.RUNNER_JOB_TIMEOUT_SECONDS:
+            return self.RUNNER_JOB_TIMEOUT_SECONDS // 60 + 5
+        return 120
+
     @property
     def db_uri(self) -> str:
         # 1) Si viene completo por env, gana.
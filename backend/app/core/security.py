@@ -1,6 +1,9 @@
+import base64
+import hashlib
 from datetime import datetime, timedelta
 from typing import Optional
 
+from cryptography.fernet import Fernet, InvalidToken
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
@@ -32,6 +35,26 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _fernet() -> Fernet:
+    key = settings.CREDENTIALS_KEY
+    if not key:
+        key = base64.urlsafe_b64encode(hashlib.sha256(settings.SECRET_KEY.encode()).digest())
+    return Fernet(key)
+
+
+def encrypt_secret(value: str) -> str:
+    """Cifra credenciales de terceros (ej. clave de SuperCarros) para guardarlas en la BD."""
+    return _fernet().encrypt(value.encode()).decode()
+
+
+def decrypt_secret(token: str) -> str:
+    """Lanza ValueError si el valor no se cifró con la clave actual."""
+    try:
+        return _fernet().decrypt(token.encode()).decode()
+    except InvalidToken as e:
+        raise ValueError("No se pudo descifrar la credencial") from e
+
+
 def decode_token(token: str) -> Optional[str]:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
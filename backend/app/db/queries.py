@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Query, Session, selectinload
+
+from app.models.brand import Brand
+from app.models.run import RepublicationRun
+from app.models.schedule import Schedule, ScheduleBrand
+from app.services.stats import record_runs
+
+# Consultas compartidas por rutas y servicios. Cargan las relaciones en
+# bloque (selectinload) para que leer schedule.brands_list o guardar las
+# corridas de N marcas cueste un número fijo de queries.
+
+
+def schedules_with_brands(db: Session) -> Query:
+    """Schedules con sus ScheduleBrand y Brand ya cargados (3 queries en total)."""
+    return db.query(Schedule).options(
+        selectinload(Schedule.brands).selectinload(ScheduleBrand.brand)
+    )
+
+
+def get_schedule_with_brands(db: Session, schedule_id: int) -> Optional[Schedule]:
+    return schedules_with_brands(db).filter(Schedule.id == schedule_id).first()
+
+
+def brands_by_ids(db: Session, brand_ids: Iterable[int]) -> List[Brand]:
+    """Marcas existentes de la lista, en el orden pedido y sin repetir."""
+    ids = list(dict.fromkeys(brand_ids))
+    if not ids:
+        return []
+    found = {b.id: b for b in db.query(Brand).filter(Brand.id.in_(ids)).all()}
+    return [found[i] for i in ids if i in found]
+
+
+def set_schedule_brands(db: Session, schedule_id: int, brand_ids: Iterable[int]):
+    """Reemplaza las marcas de la programación (sin commit)."""
+    db.query(ScheduleBrand).filter(ScheduleBrand.schedule_id == schedule_id).delete(
+        synchronize_session=False
+    )
+    db.bulk_insert_mappings(
+        ScheduleBrand,
+        [
+            {"schedule_id": schedule_id, "brand_id": b.id}
+            for b in brands_by_ids(db, brand_ids)
+        ],
+    )
+
+
+def start_brand_runs(
+    db: Session,
+    brands: Iterable[Brand],
+    run_at: datetime,
+    job_id: Optional[int] = None,
+    schedule_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    is_manual: bool = False,
+) -> Dict[str, int]:
+    """
+    Crea (o reutiliza, si el job se reintenta) una fila "running" por marca
+    antes de ejecutar y devuelve {brand_name: run_id}. Sin commit.
+    """
+    brands = list(brands)
+    existing = {}
+    if job_id is not None:
+        q = db.query(RepublicationRun).filter(
+            RepublicationRun.job_id == job_id,
+            RepublicationRun.schedule_id == schedule_id,
+        )
+        existing = {r.brand_id: r for r in q.all()}
+
+    db.bulk_insert_mappings(
+        RepublicationRun,
+        [
+            {
+                "job_id": job_id,
+                "schedule_id": schedule_id,
+                "brand_id": b.id,
+                "user_id": user_id,
+                "vehicles_count": 0,
+                "run_at": run_at,
+                "status": "running",
+                "is_manual": is_manual,
+            }
+            for b in brands
+            if b.id not in existing
+        ],
+    )
+    db.bulk_update_mappings(
+        RepublicationRun,
+        [
+            {"id": r.id, "status": "running", "finished_at": None, "error": None}
+            for r in existing.values()
+        ],
+    )
+
+    q = db.query(RepublicationRun.id, RepublicationRun.brand_id).filter(
+        RepublicationRun.status == "running",
+        RepublicationRun.brand_id.in_([b.id for b in brands]),
+        RepublicationRun.schedule_id == schedule_id,
+    )
+    if job_id is not None:
+        q = q.filter(RepublicationRun.job_id == job_id)
+    else:
+        q = q.filter(RepublicationRun.run_at == run_at)
+    ids = {brand_id: run_id for run_id, brand_id in q.all()}
+    return {b.name: ids[b.id] for b in brands if b.id in ids}
+
+
+def finish_brand_runs(
+    db: Session,
+    run_ids: Dict[str, List[int]],
+    results: Dict[str, int],
+    error: Optional[str] = None,
+):
+    """
+    Cierra las filas de start_brand_runs: las marcas con resultado quedan
+    "completed" (o "failed" si el conteo es negativo) y las que no llegaron a
+    terminar quedan "failed" con `error`. Las completadas se suman a
+    brand_daily_stats en la misma transacción. Sin commit.
+    """
+    now = datetime.utcnow()
+    ids = [run_id for group in run_ids.values() for run_id in group]
+    if not ids:
+        return
+    rows = {
+        r.id: r
+        for r in db.query(RepublicationRun).filter(RepublicationRun.id.in_(ids)).all()
+    }
+
+    updates = []
+    completed = []
+    for brand_name, group in run_ids.items():
+        count = results.get(brand_name)
+        for run_id in group:
+            run = rows.get(run_id)
+            if run is None:
+                continue
+            if count is not None and count >= 0:
+                values = {"status": "completed", "vehicles_count": int(count), "ads_bumped": int(count)}
+                completed.append(
+                    {"brand_id": run.brand_id, "run_at": run.run_at, "vehicles_count": int(count)}
+                )
+            elif run.status == "completed":
+                # la marca terminó antes de que fallara el resto de la corrida
+                completed.append(
+                    {"brand_id": run.brand_id, "run_at": run.run_at, "vehicles_count": run.vehicles_count}
+                )
+                continue
+            else:
+                values = {"status": "failed", "error": error or "La marca no se pudo procesar"}
+            updates.append({"id": run_id, "finished_at": run.finished_at or now, **values})
+
+    db.bulk_update_mappings(RepublicationRun, updates)
+    record_runs(db, completed)
@@ -1,5 +1,5 @@
-
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.core.config import settings
@@ -11,6 +11,51 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def _upgrade_schema():
+    """
+    create_all no altera tablas existentes: agrega las columnas nuevas
+    (siempre nullable) y los índices que falten en las tablas ya creadas.
+    Todos los workers lo corren al iniciar: cada sentencia va en su propia
+    transacción y si otro proceso ganó la carrera ("ya existe") se sigue.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in columns or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as conn:
+                    conn.exec_driver_sql(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"
+                    )
+                print(f"Columna agregada: {table.name}.{column.name}")
+            except DBAPIError:
+                current = {c["name"] for c in inspect(engine).get_columns(table.name)}
+                if column.name not in current:
+                    raise
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except DBAPIError:
+                current = {i["name"] for i in inspect(engine).get_indexes(table.name)}
+                if index.name not in current:
+                    raise
+
+
+def import_models():
+    """Registra todos los modelos: las relaciones se resuelven por nombre."""
+    from app.models import account, user, brand, schedule, run, job, lease, stats, ledger, rate_limit  # noqa
+
+
 def init_db():
-    from app.models import user, brand, schedule, run  # noqa
+    import_models()
     Base.metadata.create_all(bind=engine)
+    _upgrade_schema()
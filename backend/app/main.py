@@ -1,9 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import auth, brands, schedules, stats, users, manual
+from app.api.routes import auth, accounts, brands, schedules, stats, users, manual, jobs, runs
 from app.core.config import settings
-from app.db.session import init_db
+from app.db.session import engine, init_db
+from app.services.browser_pool import start_browser_pool, shutdown_browser_pool
+from app.services.job_queue import start_job_workers, shutdown_job_workers
+from app.services.leader import start_leader_election, stop_leader_election
+from app.services.metrics import MetricsMiddleware, instrument_engine, render_metrics
 from app.services.scheduler import start_scheduler, shutdown_scheduler
 
 
@@ -19,27 +23,52 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Duración y tiempo de BD por ruta (ver /metrics)
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+
     # Rutas
     app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
+    app.include_router(accounts.router, prefix="/api/accounts", tags=["accounts"])
     app.include_router(brands.router, prefix="/api/brands", tags=["brands"])
     app.include_router(schedules.router, prefix="/api/schedules", tags=["schedules"])
     app.include_router(stats.router, prefix="/api/stats", tags=["stats"])
     app.include_router(users.router, prefix="/api/users", tags=["users"])
     app.include_router(manual.router, prefix="/api/manual", tags=["manual"])
+    app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+    app.include_router(runs.router, prefix="/api/runs", tags=["runs"])
 
     # ✅ Health check para EB / Load Balancer
     @app.get("/health", include_in_schema=False)
     async def health():
         return {"status": "ok", "app": settings.APP_NAME}
 
+    # Métricas para Prometheus
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
     @app.on_event("startup")
     async def on_startup():
         init_db()
-        start_scheduler()
+        if settings.JOB_WORKERS > 0:
+            # Con JOB_WORKERS=0 los jobs corren en python -m app.runner:
+            # este proceso solo atiende la API y no lanza Chromium
+            start_browser_pool()
+        if settings.SCHEDULER_ENABLED:
+            # Un solo proceso entre todos los workers corre el scheduler
+            start_leader_election(
+                on_elected=start_scheduler, on_demoted=shutdown_scheduler
+            )
+        start_job_workers()
 
     @app.on_event("shutdown")
     async def on_shutdown():
+        shutdown_job_workers()
+        stop_leader_election()
         shutdown_scheduler()
+        shutdown_browser_pool()
 
     return app
 
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from app.db.session import Base
+
+
+class Account(Base):
+    """
+    Cuenta de SuperCarros de un dealer. La clave se guarda cifrada con
+    Fernet (ver app.core.security.encrypt_secret); cada cuenta tiene su
+    propia sesión guardada y su propio límite de republicaciones.
+    """
+
+    __tablename__ = "supercarros_accounts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False)
+    username = Column(String(100), nullable=False)
+    encrypted_password = Column(Text, nullable=False)
+    base_url = Column(String(200), nullable=True)  # None = SUPERCARROS_BASE_URL
+    max_concurrency = Column(Integer, nullable=True)  # None = SUPERCARROS_MAX_CONCURRENCY
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    brands = relationship("Brand", back_populates="account")
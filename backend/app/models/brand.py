@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, ForeignKey, Integer, String, Boolean
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -11,6 +11,9 @@ class Brand(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, index=True, nullable=False)
     is_active = Column(Boolean, default=True)
+    # cuenta de SuperCarros que republica la marca (None = la de settings)
+    account_id = Column(Integer, ForeignKey("supercarros_accounts.id"), nullable=True, index=True)
 
     schedules = relationship("ScheduleBrand", back_populates="brand")
     runs = relationship("RepublicationRun", back_populates="brand")
+    account = relationship("Account", back_populates="brands")
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, Text
+
+from app.db.session import Base
+
+
+class RepublicationJob(Base):
+    """
+    Cola persistente de corridas de republicación.
+    Las rutas encolan y responden de inmediato; los workers toman los jobs
+    en estado "queued" y los ejecutan fuera del request HTTP.
+    """
+
+    __tablename__ = "republication_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False)  # manual, schedule
+    status = Column(String(20), default="queued", index=True)  # queued, running, completed, failed
+
+    schedule_id = Column(Integer, ForeignKey("schedules.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # parámetros de la corrida, ej: {"brand_ids": [1, 2], "all_brands": false}
+    payload = Column(JSON, nullable=True)
+    # resultado {brand_name: vehicles_count}
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    attempts = Column(Integer, default=0)
+    worker_id = Column(String(100), nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
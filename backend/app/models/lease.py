@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, String
+
+from app.db.session import Base
+
+
+class Lease(Base):
+    """
+    Lease en la BD para elegir un líder entre procesos/instancias.
+    Quien tenga el lease vigente (expires_at en el futuro) es el dueño;
+    lo renueva con heartbeats y si deja de hacerlo otro lo toma.
+    """
+
+    __tablename__ = "leases"
+
+    name = Column(String(50), primary_key=True)
+    owner = Column(String(100), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    heartbeat_at = Column(DateTime, nullable=True)
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+
+from app.db.session import Base
+
+
+class AdBump(Base):
+    """
+    Bitácora por anuncio de cada corrida: qué se republicó, en qué intento,
+    cuánto tardó y con qué error. Permite retomar una corrida interrumpida
+    sin volver a republicar lo que ya se hizo (ver app.services.ledger).
+    """
+
+    __tablename__ = "ad_bumps"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("republication_jobs.id"), nullable=True)
+    attempt = Column(Integer, default=1)
+
+    ad_id = Column(String(50), nullable=False)
+    brand = Column(String(50), nullable=True)
+    outcome = Column(String(20), nullable=False)  # bumped, failed, skipped
+    latency_ms = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_ad_bumps_job_outcome", "job_id", "outcome"),
+        Index("ix_ad_bumps_outcome_created", "outcome", "created_at", "ad_id"),
+    )
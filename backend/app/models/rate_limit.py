@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Float, Integer, String
+
+from app.db.session import Base
+
+
+class RateBucket(Base):
+    """
+    Token bucket compartido por cuenta de SuperCarros. Todos los procesos
+    toman turnos de la misma fila con un UPDATE condicionado a `version`
+    (ver app.services.rate_limit). Los tiempos son epoch en segundos.
+    """
+
+    __tablename__ = "rate_buckets"
+
+    key = Column(String(100), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    rate = Column(Float, nullable=False)  # tokens por segundo
+    updated_at = Column(Float, nullable=False)
+    version = Column(Integer, nullable=False, default=0)
+
+    latency_ms = Column(Float, nullable=True)  # promedio móvil de los pasos
+    last_decrease_at = Column(Float, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Boolean
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Boolean, Index, Text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -20,6 +20,26 @@ class RepublicationRun(Base):
     status = Column(String(20), default="completed")  # completed, running, failed
     is_manual = Column(Boolean, default=False)
 
+    # Avance en vivo: la fila se crea "running" al encolar la marca y se
+    # actualiza mientras corre (ver app.services.progress)
+    job_id = Column(Integer, ForeignKey("republication_jobs.id"), nullable=True)
+    ads_found = Column(Integer, nullable=True)
+    ads_bumped = Column(Integer, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+
     schedule = relationship("Schedule", back_populates="runs")
     brand = relationship("Brand", back_populates="runs")
     user = relationship("User", back_populates="runs")
+
+    __table_args__ = (
+        Index("ix_republication_runs_run_at_brand", "run_at", "brand_id"),
+        Index("ix_republication_runs_manual_run_at", "is_manual", "run_at"),
+        # historial paginado por (run_at, id) con cada filtro de /api/runs
+        Index("ix_republication_runs_run_at_id", "run_at", "id"),
+        Index("ix_republication_runs_brand_run_at", "brand_id", "run_at", "id"),
+        Index("ix_republication_runs_schedule_run_at", "schedule_id", "run_at", "id"),
+        Index("ix_republication_runs_user_run_at", "user_id", "run_at", "id"),
+        Index("ix_republication_runs_status_run_at", "status", "run_at", "id"),
+        Index("ix_republication_runs_job", "job_id"),
+    )
@@ -23,6 +23,14 @@ class Schedule(Base):
     # horas como string CSV, ej: "09:00,14:30"
     times_of_day = Column(String(200), nullable=True)
 
+    # Políticas de disparo en APScheduler (None = default de settings)
+    max_instances = Column(Integer, nullable=True)
+    coalesce = Column(Boolean, nullable=True)
+    misfire_grace_time = Column(Integer, nullable=True)  # segundos
+
+    # cuenta para las marcas de la programación que no tienen una propia
+    account_id = Column(Integer, ForeignKey("supercarros_accounts.id"), nullable=True)
+
     # relación con la tabla puente
     brands = relationship("ScheduleBrand", back_populates="schedule")
     runs = relationship("RepublicationRun", back_populates="schedule")
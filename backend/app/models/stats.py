@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer
+
+from app.db.session import Base
+
+
+class BrandDailyStat(Base):
+    """
+    Acumulado diario por marca de republication_runs.
+    Se actualiza al guardar cada corrida (ver app.services.stats) y se puede
+    reconstruir con `python -m tools.backfill_stats`.
+    """
+
+    __tablename__ = "brand_daily_stats"
+
+    brand_id = Column(Integer, ForeignKey("brands.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    vehicles_count = Column(Integer, nullable=False, default=0)
+    runs_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_brand_daily_stats_day", "day"),)
@@ -0,0 +1,353 @@
+"""
+Runner de jobs de republicación fuera de la API:
+
+    python -m app.runner [--processes N]
+
+Un proceso supervisor (sin Chromium) toma jobs de la cola en la BD
+(republication_jobs) y le pasa cada uno por un pipe a uno de N procesos
+hijos, que lo ejecutan con su propio pool de navegadores y guardan el
+resultado en la BD como siempre (execute_job). El supervisor corta el job
+que pasa RUNNER_JOB_TIMEOUT_SECONDS o cuyo proceso (con sus Chromium) pasa
+RUNNER_MAX_MEMORY_MB, y recicla cada hijo tras RUNNER_MAX_JOBS_PER_PROCESS
+jobs. Los workers de la API corren con JOB_WORKERS=0: solo encolan.
+
+Las métricas del navegador, login y republicación se generan acá: el
+supervisor las suma de todos sus hijos y las sirve en RUNNER_METRICS_PORT.
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import time
+from typing import List, Optional
+
+import psutil
+
+from app.core.config import settings
+
+
+def _prepare_metrics_dir():
+    """
+    Directorio multiproceso de Prometheus del runner, vacío al arrancar.
+    Debe quedar en el entorno antes de importar prometheus_client; los hijos
+    lo heredan. Si ya viene PROMETHEUS_MULTIPROC_DIR se usa tal cual.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return
+    path = os.path.abspath(settings.RUNNER_METRICS_DIR)
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+
+
+if __name__ == "__main__":
+    # solo el supervisor: los hijos (spawn) importan este módulo como __mp_main__
+    _prepare_metrics_dir()
+
+from app.db.session import SessionLocal, import_models, init_db  # noqa: E402
+from app.services.job_queue import (  # noqa: E402
+    claim_next_job,
+    release_worker_jobs,
+    requeue_stale_jobs,
+)
+
+# Cada cuánto se re-encolan los jobs huérfanos (ej. de un runner caído en otra máquina)
+STALE_CHECK_SECONDS = 60
+
+
+def _child_main(conn):
+    """Proceso hijo: ejecuta los job_id que llegan por el pipe hasta recibir None."""
+    # Ctrl+C llega a todo el grupo; el supervisor decide cuándo cortar
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    from app.services.browser_pool import shutdown_browser_pool
+    from app.services.job_queue import execute_job
+
+    # el supervisor ya migró la BD; el hijo solo necesita los modelos
+    import_models()
+    try:
+        while True:
+            job_id = conn.recv()
+            if job_id is None:
+                break
+            execute_job(job_id)
+            conn.send(job_id)
+    except EOFError:
+        pass
+    finally:
+        shutdown_browser_pool()
+        conn.close()
+
+
+class RunnerSlot:
+    """Un proceso hijo y el job que está corriendo (uno a la vez)."""
+
+    def __init__(self, index: int, context):
+        self.index = index
+        self.context = context
+        # Los jobs que toma este hijo (y los que combine el planificador)
+        # quedan con este worker_id, así se pueden liberar si se corta.
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:runner-{index}"
+        self.process = None
+        self.conn = None
+        self.job_id: Optional[int] = None
+        self.job_started = 0.0
+        self.jobs_done = 0
+
+    @property
+    def busy(self) -> bool:
+        return self.job_id is not None
+
+    def spawn(self):
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_child_main,
+            args=(child_conn,),
+            name=f"runner-{self.index}",
+            daemon=False,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.job_id = None
+        self.jobs_done = 0
+        print(f"[runner-{self.index}] proceso {self.process.pid} iniciado")
+
+    def dispatch(self, job_id: int):
+        self.conn.send(job_id)
+        self.job_id = job_id
+        self.job_started = time.monotonic()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.job_started if self.busy else 0.0
+
+    def memory_mb(self) -> float:
+        """RSS del hijo y todos sus descendientes (driver de Playwright, Chromium)."""
+        total = 0
+        try:
+            proc = psutil.Process(self.process.pid)
+            procs = [proc] + proc.children(recursive=True)
+        except psutil.Error:
+            return 0.0
+        for p in procs:
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+    def stop(self, timeout: float = 30):
+        """Pide al hijo que termine (cierra sus navegadores); si no, lo mata."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self._reap()
+
+    def kill(self):
+        """Mata el hijo junto con sus Chromium, sin esperar a que cierre nada."""
+        try:
+            proc = psutil.Process(self.process.pid)
+            procs = proc.children(recursive=True) + [proc]
+        except psutil.Error:
+            procs = []
+        for p in procs:
+            try:
+                p.kill()
+            except psutil.Error:
+                continue
+        self.process.join(10)
+        self._reap()
+
+    def _reap(self):
+        self.conn.close()
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            from prometheus_client import multiprocess
+
+            multiprocess.mark_process_dead(self.process.pid)
+
+
+class Runner:
+    def __init__(self, processes: int):
+        # spawn: hijos limpios, sin conexiones de BD ni hilos del supervisor
+        context = multiprocessing.get_context("spawn")
+        self.slots: List[RunnerSlot] = [RunnerSlot(i, context) for i in range(processes)]
+        self._stopping = False
+
+    def request_stop(self, *_):
+        if not self._stopping:
+            print("[runner] deteniendo: no se toman más jobs")
+        self._stopping = True
+
+    def _release(self, slot: RunnerSlot, error: str, requeue: bool):
+        db = SessionLocal()
+        try:
+            ids = release_worker_jobs(db, slot.worker_id, error, requeue)
+        finally:
+            db.close()
+        print(f"[runner-{slot.index}] jobs {ids}: {error}")
+        slot.job_id = None
+
+    def _respawn(self, slot: RunnerSlot):
+        if not self._stopping:
+            slot.spawn()
+
+    def _check(self, slot: RunnerSlot):
+        """Revisa un hijo: job terminado, proceso caído o límites superados."""
+        try:
+            finished = slot.conn.poll()
+        except (OSError, EOFError):
+            finished = False
+        if finished:
+            try:
+                slot.conn.recv()
+            except (OSError, EOFError):
+                finished = False
+        if finished:
+            slot.job_id = None
+            slot.jobs_done += 1
+            if slot.jobs_done >= settings.RUNNER_MAX_JOBS_PER_PROCESS > 0:
+                print(f"[runner-{slot.index}] reciclando tras {slot.jobs_done} jobs")
+                slot.stop()
+                self._respawn(slot)
+            return
+
+        if not slot.process.is_alive():
+            code = slot.process.exitcode
+            slot._reap()
+            if slot.busy:
+                self._release(
+                    slot, f"El proceso del runner terminó inesperadamente (código {code})", requeue=True
+                )
+            self._respawn(slot)
+            return
+
+        if not slot.busy:
+            return
+
+        timeout = settings.RUNNER_JOB_TIMEOUT_SECONDS
+        if timeout and slot.elapsed() > timeout:
+            slot.kill()
+            self._release(slot, f"Job cortado: superó {timeout} s", requeue=False)
+            self._respawn(slot)
+            return
+
+        limit = settings.RUNNER_MAX_MEMORY_MB
+        if limit:
+            memory = slot.memory_mb()
+            if memory > limit:
+                slot.kill()
+                self._release(
+                    slot,
+                    f"Job cortado: el proceso usó {memory:.0f} MB (límite {limit} MB)",
+                    requeue=True,
+                )
+                self._respawn(slot)
+
+    def _claim(self, slot: RunnerSlot) -> bool:
+        db = SessionLocal()
+        try:
+            job = claim_next_job(db, slot.worker_id)
+            job_id = job.id if job else None
+        except Exception as e:
+            print(f"[runner] Error leyendo la cola: {e}")
+            job_id = None
+        finally:
+            db.close()
+        if job_id is None:
+            return False
+        slot.dispatch(job_id)
+        print(f"[runner-{slot.index}] job {job_id}")
+        return True
+
+    def _requeue_stale(self):
+        db = SessionLocal()
+        try:
+            ids = requeue_stale_jobs(db)
+        except Exception as e:
+            print(f"[runner] Error re-encolando jobs huérfanos: {e}")
+            ids = []
+        finally:
+            db.close()
+        if ids:
+            print(f"[runner] jobs huérfanos liberados: {ids}")
+
+    def run(self):
+        init_db()
+        for slot in self.slots:
+            slot.spawn()
+
+        next_poll = 0.0
+        next_stale_check = 0.0
+        while not self._stopping:
+            if time.monotonic() >= next_stale_check:
+                self._requeue_stale()
+                next_stale_check = time.monotonic() + STALE_CHECK_SECONDS
+            for slot in self.slots:
+                self._check(slot)
+            if time.monotonic() >= next_poll:
+                for slot in self.slots:
+                    if slot.busy or not slot.process.is_alive():
+                        continue
+                    if not self._claim(slot):
+                        # cola vacía: esperar JOB_POLL_SECONDS antes de volver a mirar
+                        next_poll = time.monotonic() + settings.JOB_POLL_SECONDS
+                        break
+            time.sleep(settings.RUNNER_CHECK_SECONDS)
+
+        self._shutdown()
+
+    def _shutdown(self):
+        """Deja terminar los jobs en curso hasta RUNNER_SHUTDOWN_GRACE_SECONDS."""
+        deadline = time.monotonic() + settings.RUNNER_SHUTDOWN_GRACE_SECONDS
+        while any(s.busy for s in self.slots):
+            if time.monotonic() >= deadline:
+                break
+            for slot in self.slots:
+                if slot.busy:
+                    self._check(slot)
+            time.sleep(settings.RUNNER_CHECK_SECONDS)
+
+        for slot in self.slots:
+            if slot.process is None or slot.conn.closed:
+                continue
+            if slot.busy:
+                slot.kill()
+                self._release(slot, "Runner detenido con el job en curso", requeue=True)
+            else:
+                slot.stop()
+        print("[runner] detenido")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runner de jobs de republicación")
+    parser.add_argument("--processes", type=int, default=settings.RUNNER_PROCESSES)
+    args = parser.parse_args()
+
+    if settings.RUNNER_METRICS_PORT:
+        from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(settings.RUNNER_METRICS_PORT, registry=registry)
+        print(f"[runner] métricas en :{settings.RUNNER_METRICS_PORT}/metrics")
+
+    runner = Runner(max(1, args.processes))
+    signal.signal(signal.SIGTERM, runner.request_stop)
+    signal.signal(signal.SIGINT, runner.request_stop)
+    print(
+        f"[runner] {len(runner.slots)} proceso(s), límite {settings.RUNNER_JOB_TIMEOUT_SECONDS} s "
+        f"y {settings.RUNNER_MAX_MEMORY_MB} MB por job"
+    )
+    runner.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
@@ -43,12 +43,46 @@ class TokenData(BaseModel):
     username: Optional[str] = None
 
 
+# ==== SUPERCARROS ACCOUNTS ====
+
+
+class AccountBase(BaseModel):
+    name: str
+    username: str
+    base_url: Optional[str] = None
+    max_concurrency: Optional[int] = None
+    is_active: bool = True
+
+
+class AccountCreate(AccountBase):
+    password: str
+
+
+class AccountUpdate(BaseModel):
+    name: Optional[str] = None
+    username: Optional[str] = None
+    password: Optional[str] = None
+    base_url: Optional[str] = None
+    max_concurrency: Optional[int] = None
+    is_active: Optional[bool] = None
+
+
+class AccountOut(AccountBase):
+    # la clave nunca sale de la API
+    id: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
 # ==== BRANDS ====
 
 
 class BrandBase(BaseModel):
     name: str
     is_active: bool = True
+    account_id: Optional[int] = None
 
 
 class BrandCreate(BrandBase):
@@ -58,6 +92,7 @@ class BrandCreate(BrandBase):
 class BrandUpdate(BaseModel):
     name: Optional[str] = None
     is_active: Optional[bool] = None
+    account_id: Optional[int] = None
 
 
 class BrandOut(BrandBase):
@@ -82,6 +117,14 @@ class ScheduleBase(BaseModel):
     days_of_week: str
     times_of_day: str
 
+    # políticas de disparo (None = default del servidor)
+    max_instances: Optional[int] = None
+    coalesce: Optional[bool] = None
+    misfire_grace_time: Optional[int] = None
+
+    # cuenta para las marcas sin cuenta propia (None = la del servidor)
+    account_id: Optional[int] = None
+
 
 class ScheduleCreate(ScheduleBase):
     pass
@@ -94,6 +137,10 @@ class ScheduleUpdate(BaseModel):
     brand_ids: Optional[List[int]] = None
     days_of_week: Optional[str] = None
     times_of_day: Optional[str] = None
+    max_instances: Optional[int] = None
+    coalesce: Optional[bool] = None
+    misfire_grace_time: Optional[int] = None
+    account_id: Optional[int] = None
 
 
 class ScheduleOut(BaseModel):
@@ -105,6 +152,10 @@ class ScheduleOut(BaseModel):
     next_run_at: Optional[datetime]
     days_of_week: Optional[str] = None
     times_of_day: Optional[str] = None
+    max_instances: Optional[int] = None
+    coalesce: Optional[bool] = None
+    misfire_grace_time: Optional[int] = None
+    account_id: Optional[int] = None
     # tomamos de la propiedad brands_list del modelo SQLAlchemy
     brands: List[BrandOut] = Field(default_factory=list, alias="brands_list")
 
@@ -128,6 +179,8 @@ class BrandStatsItem(BaseModel):
 class ManualRunRequest(BaseModel):
     brand_ids: Optional[List[int]] = None
     all_brands: bool = False
+    # None => SUPERCARROS_BUMP_MODE
+    bump_mode: Optional[Literal["browser", "http"]] = None
 
 
 class ManualRunOut(BaseModel):
@@ -135,3 +188,56 @@ class ManualRunOut(BaseModel):
     vehicles_count: int
     run_at: datetime
     status: str
+
+
+# ==== RUNS ====
+
+
+class RunOut(BaseModel):
+    id: int
+    run_at: datetime
+    brand_id: int
+    brand_name: str
+    schedule_id: Optional[int] = None
+    schedule_name: Optional[str] = None
+    user_id: Optional[int] = None
+    vehicles_count: int
+    status: str
+    status_label: str
+    is_manual: bool
+    job_id: Optional[int] = None
+    ads_found: Optional[int] = None
+    ads_bumped: Optional[int] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class RunPage(BaseModel):
+    items: List[RunOut]
+    next_cursor: Optional[str] = None
+
+
+# ==== JOBS ====
+
+
+class UpcomingRunOut(BaseModel):
+    schedule_id: int
+    schedule_name: str
+    run_at: datetime
+
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    schedule_id: Optional[int] = None
+    user_id: Optional[int] = None
+    attempts: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, int]] = None
+    error: Optional[str] = None
+
+    class Config:
+        orm_mode = True
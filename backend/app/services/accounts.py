@@ -0,0 +1,100 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import decrypt_secret
+from app.models.account import Account
+
+
+class SuperCarrosAccount:
+    """
+    Credenciales ya descifradas de una cuenta, listas para el motor (que
+    corre en el loop de Playwright, sin sesión de BD).
+    `id` None es la cuenta de settings (SUPERCARROS_USER/SUPERCARROS_PASS).
+    """
+
+    def __init__(
+        self,
+        id: Optional[int],
+        name: str,
+        username: str,
+        password: str,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.id = id
+        self.name = name
+        self.username = username
+        self.password = password
+        self.base_url = (base_url or settings.SUPERCARROS_BASE_URL).rstrip("/")
+        self.max_concurrency = max_concurrency or settings.SUPERCARROS_MAX_CONCURRENCY
+
+    @property
+    def login_url(self) -> str:
+        return f"{self.base_url}/Login"
+
+    @property
+    def rate_key(self) -> str:
+        """Clave del límite de republicaciones: el usuario de SuperCarros."""
+        return self.username
+
+    def __repr__(self):
+        return f"<SuperCarrosAccount {self.name}>"
+
+
+def default_account() -> SuperCarrosAccount:
+    return SuperCarrosAccount(
+        None, "default", settings.SUPERCARROS_USER, settings.SUPERCARROS_PASS
+    )
+
+
+def to_credentials(account: Account) -> SuperCarrosAccount:
+    return SuperCarrosAccount(
+        account.id,
+        account.name,
+        account.username,
+        decrypt_secret(account.encrypted_password),
+        account.base_url,
+        account.max_concurrency,
+    )
+
+
+def group_by_account(
+    db: Session, brand_accounts: Dict[str, Optional[int]]
+) -> Tuple[List[Tuple[SuperCarrosAccount, List[str]]], Dict[str, str]]:
+    """
+    Reparte las marcas ({brand_name: account_id}) por cuenta, en el orden
+    recibido. Devuelve ([(credenciales, marcas)], {marca: error}) con las
+    marcas cuya cuenta no existe, está inactiva o no se puede descifrar.
+    """
+    ids = {a for a in brand_accounts.values() if a is not None}
+    accounts: Dict[Optional[int], SuperCarrosAccount] = {None: default_account()}
+    unavailable: Dict[int, str] = {}
+    if ids:
+        rows = {a.id: a for a in db.query(Account).filter(Account.id.in_(ids)).all()}
+        for account_id in ids:
+            row = rows.get(account_id)
+            if row is None:
+                unavailable[account_id] = "Cuenta de SuperCarros no encontrada"
+            elif not row.is_active:
+                unavailable[account_id] = f"Cuenta {row.name} inactiva"
+            else:
+                try:
+                    accounts[account_id] = to_credentials(row)
+                except ValueError as e:
+                    unavailable[account_id] = f"Cuenta {row.name}: {e}"
+
+    groups: Dict[Optional[int], List[str]] = {}
+    errors: Dict[str, str] = {}
+    for brand_name, account_id in brand_accounts.items():
+        if account_id in unavailable:
+            errors[brand_name] = unavailable[account_id]
+        else:
+            groups.setdefault(account_id, []).append(brand_name)
+    return [(accounts[a], names) for a, names in groups.items()], errors
+
+
+def brand_accounts_of(brands: Iterable, fallback: Optional[int] = None) -> Dict[str, Optional[int]]:
+    """{brand_name: account_id}; las marcas sin cuenta usan `fallback`."""
+    return {b.name: b.account_id or fallback for b in brands}
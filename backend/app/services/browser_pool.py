@@ -0,0 +1,276 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Set
+
+import psutil
+from playwright.async_api import async_playwright
+
+from app.core.config import settings
+from app.services.engine import run_in_engine, shutdown_engine
+from app.services.metrics import BROWSER_LAUNCH_SECONDS
+from app.services.resource_policy import (
+    ResourceStats,
+    default_policy,
+    launch_args,
+    resource_totals,
+)
+
+
+def _descendant_pids() -> Set[int]:
+    return {p.pid for p in psutil.Process().children(recursive=True)}
+
+
+class _PooledBrowser:
+    """Un Chromium caliente del pool y su contabilidad de uso."""
+
+    def __init__(self, index: int):
+        self.name = f"browser-pool-{index}"
+        self.browser = None
+        self.runs = 0
+        self.active = 0
+        self.draining = False
+        self.recycle_reason: Optional[str] = None
+        self.pids: Set[int] = set()
+        self.lock = asyncio.Lock()
+
+    def is_healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+    def memory_mb(self) -> float:
+        """RSS de los procesos de este Chromium, en MB."""
+        total = 0
+        for pid in self.pids:
+            try:
+                proc = psutil.Process(pid)
+                for p in [proc] + proc.children(recursive=True):
+                    total += p.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+
+class BrowserPool:
+    """
+    Pool de N navegadores Chromium calientes reutilizados entre corridas.
+    Vive en el loop del motor (app.services.engine): cada trabajo recibe un
+    BrowserContext nuevo sobre un navegador ya lanzado, y cada navegador puede
+    atender hasta `contexts_per_browser` contextos a la vez.
+    El navegador se recicla tras `max_runs` corridas o al pasar `max_memory_mb`.
+    Cada contexto nace con la política de recursos (imágenes, fuentes,
+    anuncios y analítica bloqueados; ver app.services.resource_policy).
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_runs: int,
+        max_memory_mb: int,
+        healthcheck_seconds: int,
+        contexts_per_browser: int,
+    ):
+        self.size = max(1, size)
+        self.max_runs = max(1, max_runs)
+        self.max_memory_mb = max_memory_mb
+        self.healthcheck_seconds = healthcheck_seconds
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self._slots: List[_PooledBrowser] = []
+        self._playwright = None
+        self._cond: Optional[asyncio.Condition] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self.resource_policy = default_policy()
+
+    @property
+    def capacity(self) -> int:
+        return self.size * self.contexts_per_browser
+
+    # ---- ciclo de vida de los navegadores ----
+
+    async def _launch(self, slot: _PooledBrowser):
+        # Lanzar de a uno para poder identificar los procesos de cada navegador
+        async with self._launch_lock:
+            before = _descendant_pids()
+            started = time.perf_counter()
+            # Para depurar, puedes poner BROWSER_HEADLESS=false y ver el navegador
+            slot.browser = await self._playwright.chromium.launch(
+                headless=settings.BROWSER_HEADLESS, args=launch_args()
+            )
+            BROWSER_LAUNCH_SECONDS.observe(time.perf_counter() - started)
+            slot.pids = _descendant_pids() - before
+        slot.runs = 0
+        slot.draining = False
+        print(f"[{slot.name}] Chromium iniciado (pids {sorted(slot.pids)})")
+
+    async def _close(self, slot: _PooledBrowser):
+        try:
+            if slot.browser is not None:
+                await slot.browser.close()
+        except Exception:
+            pass
+        slot.browser = None
+        slot.pids = set()
+
+    async def _restart(self, slot: _PooledBrowser, reason: str):
+        print(f"[{slot.name}] Reiniciando Chromium ({reason})")
+        await self._close(slot)
+        await self._launch(slot)
+
+    def _recycle_reason(self, slot: _PooledBrowser) -> Optional[str]:
+        if slot.runs >= self.max_runs:
+            return f"{slot.runs} corridas"
+        if self.max_memory_mb:
+            mem = slot.memory_mb()
+            if mem >= self.max_memory_mb:
+                return f"{mem:.0f} MB de memoria"
+        return None
+
+    async def start(self):
+        self._cond = asyncio.Condition()
+        self._launch_lock = asyncio.Lock()
+        self._playwright = await async_playwright().start()
+        for i in range(self.size):
+            slot = _PooledBrowser(i)
+            self._slots.append(slot)
+            try:
+                await self._launch(slot)
+            except Exception as e:
+                print(f"[{slot.name}] No se pudo iniciar Chromium: {e}")
+        self._health_task = asyncio.create_task(self._healthcheck_loop())
+
+    async def _healthcheck_loop(self):
+        while True:
+            await asyncio.sleep(self.healthcheck_seconds)
+            for slot in self._slots:
+                if slot.active or slot.is_healthy():
+                    continue
+                async with slot.lock:
+                    try:
+                        await self._restart(slot, "health check")
+                    except Exception as e:
+                        print(f"[{slot.name}] Health check fallido: {e}")
+
+    async def shutdown(self):
+        if self._health_task:
+            self._health_task.cancel()
+        for slot in self._slots:
+            await self._close(slot)
+        self._slots = []
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    # ---- préstamo de contextos ----
+
+    def _pick(self) -> Optional[_PooledBrowser]:
+        free = [
+            s
+            for s in self._slots
+            if not s.draining and s.active < self.contexts_per_browser
+        ]
+        return min(free, key=lambda s: s.active) if free else None
+
+    async def _acquire(self) -> _PooledBrowser:
+        async with self._cond:
+            while True:
+                slot = self._pick()
+                if slot is not None:
+                    slot.active += 1
+                    return slot
+                await self._cond.wait()
+
+    async def _release(self, slot: _PooledBrowser):
+        slot.active -= 1
+        slot.runs += 1
+        if not slot.draining:
+            slot.recycle_reason = self._recycle_reason(slot)
+            slot.draining = slot.recycle_reason is not None
+        if slot.draining and slot.active == 0:
+            async with slot.lock:
+                try:
+                    await self._restart(slot, slot.recycle_reason)
+                except Exception as e:
+                    print(f"[{slot.name}] No se pudo reciclar Chromium: {e}")
+                    slot.draining = False
+        async with self._cond:
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def context(
+        self,
+        resource_stats: Optional[ResourceStats] = None,
+        site_url: Optional[str] = None,
+        **context_options,
+    ) -> AsyncIterator:
+        """
+        Presta un BrowserContext nuevo sobre un navegador caliente.
+        context_options se pasan a browser.new_context (ej. storage_state).
+        Los pedidos bloqueados y descargados se cuentan en `resource_stats`
+        (o solo en los totales del proceso). `site_url` es la base de
+        SuperCarros de la cuenta: sus páginas, scripts y XHR nunca se bloquean.
+        Espera si todos los navegadores están al tope de contextos.
+        """
+        slot = await self._acquire()
+        try:
+            async with slot.lock:
+                if not slot.is_healthy():
+                    await self._restart(slot, "navegador caído")
+            if self.resource_policy is not None:
+                # los service workers saltean context.route
+                context_options.setdefault("service_workers", "block")
+            context = await slot.browser.new_context(**context_options)
+            try:
+                if self.resource_policy is not None:
+                    await self.resource_policy.apply(
+                        context,
+                        resource_stats or ResourceStats(parent=resource_totals),
+                        site_url,
+                    )
+                yield context
+            finally:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+        finally:
+            await self._release(slot)
+
+
+browser_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def start_browser_pool() -> BrowserPool:
+    """
+    Inicia el loop del motor y el pool dentro de él.
+    No llamar desde el loop del motor (bloquearía esperando a sí mismo).
+    """
+    global browser_pool
+    with _pool_lock:
+        if browser_pool is None:
+            pool = BrowserPool(
+                size=settings.BROWSER_POOL_SIZE,
+                max_runs=settings.BROWSER_MAX_RUNS,
+                max_memory_mb=settings.BROWSER_MAX_MEMORY_MB,
+                healthcheck_seconds=settings.BROWSER_HEALTHCHECK_SECONDS,
+                contexts_per_browser=settings.BROWSER_CONTEXTS_PER_BROWSER,
+            )
+            run_in_engine(pool.start())
+            browser_pool = pool
+        return browser_pool
+
+
+def get_browser_pool() -> BrowserPool:
+    if browser_pool is None:
+        raise RuntimeError("El pool de navegadores no está iniciado")
+    return browser_pool
+
+
+def shutdown_browser_pool():
+    global browser_pool
+    with _pool_lock:
+        if browser_pool:
+            run_in_engine(browser_pool.shutdown())
+            browser_pool = None
+        shutdown_engine()
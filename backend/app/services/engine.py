@@ -0,0 +1,56 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Event loop dedicado a Playwright: todos los navegadores, contextos y páginas
+# viven en este loop, así un solo hilo maneja muchas páginas a la vez.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop, ready: threading.Event):
+    asyncio.set_event_loop(loop)
+    loop.call_soon(ready.set)
+    loop.run_forever()
+    loop.close()
+
+
+def start_engine() -> asyncio.AbstractEventLoop:
+    global _loop, _thread
+    with _lock:
+        if _loop is None:
+            ready = threading.Event()
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(
+                target=_run_loop,
+                args=(_loop, ready),
+                name="playwright-engine",
+                daemon=True,
+            )
+            _thread.start()
+            ready.wait()
+        return _loop
+
+
+def submit_to_engine(coro: Coroutine[Any, Any, T]) -> "Future[T]":
+    """Programa la corrutina en el loop del motor y devuelve un Future."""
+    return asyncio.run_coroutine_threadsafe(coro, start_engine())
+
+
+def run_in_engine(coro: Coroutine[Any, Any, T]) -> T:
+    """Fachada sync: bloquea el hilo actual hasta que la corrutina termine."""
+    return submit_to_engine(coro).result()
+
+
+def shutdown_engine():
+    global _loop, _thread
+    with _lock:
+        if _loop is not None:
+            _loop.call_soon_threadsafe(_loop.stop)
+            _thread.join(timeout=30)
+            _loop = None
+            _thread = None
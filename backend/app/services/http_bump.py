@@ -0,0 +1,144 @@
+import asyncio
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import httpx
+
+from app.core.config import settings
+
+TOKEN_FIELD = "__RequestVerificationToken"
+_TOKEN_RE = re.compile(
+    r'name=["\']' + TOKEN_FIELD + r'["\'][^>]*value=["\']([^"\']+)["\']'
+    r'|value=["\']([^"\']+)["\'][^>]*name=["\']' + TOKEN_FIELD + r'["\']'
+)
+
+
+class _FormParser(HTMLParser):
+    """Extrae los <form> del popup con sus campos (incluye los hidden)."""
+
+    def __init__(self):
+        super().__init__()
+        self.forms: List[Dict] = []
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "form":
+            self.forms.append(
+                {
+                    "action": a.get("action"),
+                    "method": (a.get("method") or "post").upper(),
+                    "fields": {},
+                }
+            )
+        elif tag in ("input", "textarea", "select") and self.forms and a.get("name"):
+            kind = (a.get("type") or "text").lower()
+            if kind in ("submit", "button", "image", "reset"):
+                return
+            if kind in ("checkbox", "radio") and "checked" not in a:
+                return
+            self.forms[-1]["fields"][a["name"]] = a.get("value") or ""
+
+
+def parse_form(html: str) -> Optional[Dict]:
+    parser = _FormParser()
+    parser.feed(html)
+    return parser.forms[0] if parser.forms else None
+
+
+def extract_token(html: str) -> Optional[str]:
+    """Token anti-forgery de ASP.NET presente en cualquier parte del HTML."""
+    m = _TOKEN_RE.search(html)
+    if not m:
+        return None
+    return m.group(1) or m.group(2)
+
+
+def _is_login_url(url: httpx.URL) -> bool:
+    return "/login" in url.path.lower()
+
+
+class HttpBumper:
+    """
+    Republica anuncios llamando directo al endpoint detrás de los links
+    REPUBLICAR, con las cookies de la sesión de Playwright.
+    El navegador solo hace login y descubre los anuncios; cada republicación
+    es un GET del popup + POST del formulario sobre un cliente httpx con pool
+    de conexiones, y se pueden lanzar varias en paralelo.
+    """
+
+    def __init__(
+        self,
+        storage_state: Dict,
+        base_url: str,
+        user_agent: Optional[str] = None,
+        page_token: Optional[str] = None,
+        concurrency: int = 4,
+    ):
+        cookies = httpx.Cookies()
+        for c in storage_state.get("cookies", []):
+            cookies.set(c["name"], c["value"], domain=c["domain"], path=c.get("path", "/"))
+
+        headers = {"X-Requested-With": "XMLHttpRequest"}
+        if user_agent:
+            headers["User-Agent"] = user_agent
+
+        self.page_token = page_token
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            cookies=cookies,
+            headers=headers,
+            follow_redirects=True,
+            timeout=settings.SUPERCARROS_HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=max(1, concurrency),
+                max_keepalive_connections=max(1, concurrency),
+            ),
+        )
+
+    @classmethod
+    async def from_page(cls, page, base_url: Optional[str] = None) -> "HttpBumper":
+        """Crea el cliente con la sesión, user agent y token de la página ya logueada."""
+        token = None
+        token_input = page.locator(f"input[name='{TOKEN_FIELD}']")
+        if await token_input.count() > 0:
+            token = await token_input.first.get_attribute("value")
+        return cls(
+            storage_state=await page.context.storage_state(),
+            base_url=base_url or settings.SUPERCARROS_BASE_URL,
+            user_agent=await page.evaluate("navigator.userAgent"),
+            page_token=token,
+            concurrency=settings.SUPERCARROS_HTTP_CONCURRENCY,
+        )
+
+    async def bump(self, href: str) -> bool:
+        """
+        Republica un anuncio a partir del href de su link REPUBLICAR.
+        Devuelve True si SuperCarros aceptó el POST.
+        """
+        async with self._semaphore:
+            popup = await self.client.get(href)
+            if _is_login_url(popup.url):
+                raise RuntimeError("Sesión de SuperCarros expirada")
+            popup.raise_for_status()
+
+            form = parse_form(popup.text) or {"action": None, "method": "POST", "fields": {}}
+            fields = dict(form["fields"])
+            if TOKEN_FIELD not in fields:
+                token = extract_token(popup.text) or self.page_token
+                if token:
+                    fields[TOKEN_FIELD] = token
+
+            action = urljoin(str(popup.url), form["action"] or href)
+            resp = await self.client.request(form["method"], action, data=fields)
+            if _is_login_url(resp.url):
+                raise RuntimeError("Sesión de SuperCarros expirada")
+            if resp.status_code in (429, 503):
+                # SuperCarros nos está frenando: que lo vea el limitador
+                resp.raise_for_status()
+            return resp.is_success
+
+    async def aclose(self):
+        await self.client.aclose()
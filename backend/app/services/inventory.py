@@ -0,0 +1,63 @@
+from typing import Dict, List, Optional
+
+from app.services.waits import WaitStrategy
+
+AD_ITEM_SELECTOR = "li.AdItem"
+
+# Se ejecuta una sola vez en el navegador sobre todos los li.AdItem y devuelve
+# los datos de cada anuncio en un único payload (evita un round trip por anuncio).
+_EXTRACT_ADS_JS = """
+(items) => items.map((li) => {
+  const text = (selector) => {
+    const el = li.querySelector(selector);
+    return el ? el.textContent.trim() : null;
+  };
+  const checkbox = li.querySelector("input.AdCheckBox");
+  const bump = li.querySelector("li.Bump a.cboxElement");
+  return {
+    id: checkbox ? checkbox.getAttribute("data-id") : null,
+    brand: li.getAttribute("data-brand"),
+    title: text(".Title, .AdTitle, .title, h2, h3"),
+    price: text(".Price, .AdPrice, .price"),
+    bump_href: bump ? bump.getAttribute("href") : null,
+  };
+})
+"""
+
+
+def ad_item_selector(brand: Optional[str] = None) -> str:
+    if brand is None:
+        return AD_ITEM_SELECTOR
+    return f"{AD_ITEM_SELECTOR}[data-brand='{brand}']"
+
+
+async def extract_ads(page, brand: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
+    """
+    Devuelve los anuncios visibles (de una marca o todos) como dicts con
+    id, brand, title, price y bump_href, en una sola evaluación en el DOM.
+    """
+    ads = await page.eval_on_selector_all(ad_item_selector(brand), _EXTRACT_ADS_JS)
+    return [ad for ad in ads if ad.get("id")]
+
+
+def group_by_brand(ads: List[Dict[str, Optional[str]]]) -> Dict[str, List[Dict]]:
+    grouped: Dict[str, List[Dict]] = {}
+    for ad in ads:
+        grouped.setdefault(ad.get("brand") or "", []).append(ad)
+    return grouped
+
+
+async def snapshot_inventory(
+    page, waits: Optional[WaitStrategy] = None
+) -> Dict[str, List[Dict]]:
+    """
+    Carga el listado sin filtro de marca una sola vez y devuelve
+    {brand: [anuncios]} para todas las marcas de la cuenta.
+    """
+    waits = waits or WaitStrategy()
+    current = await page.locator("#Brand").input_value()
+    if current:
+        await waits.select_brand(page, "")
+    if not await waits.ads_visible(page, AD_ITEM_SELECTOR):
+        return {}
+    return group_by_brand(await extract_ads(page))
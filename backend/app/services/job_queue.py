@@ -0,0 +1,353 @@
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.queries import brands_by_ids, finish_brand_runs, start_brand_runs
+from app.db.session import SessionLocal
+from app.models.brand import Brand
+from app.models.job import RepublicationJob
+from app.models.run import RepublicationRun
+from app.services.accounts import brand_accounts_of, group_by_account
+from app.services.metrics import JOB_QUEUE_SECONDS, JOB_SECONDS
+from app.services.planner import (
+    SchedulePlan,
+    claim_sibling_jobs,
+    finish_sibling,
+    wait_for_siblings,
+)
+from app.services.progress import RunProgress, publish_job_finished
+from app.services.supercarros import run_accounts_job
+
+# Despierta a los workers de este proceso al encolar
+_wakeup = threading.Event()
+_workers: List["JobWorker"] = []
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict] = None,
+    user_id: Optional[int] = None,
+    schedule_id: Optional[int] = None,
+) -> RepublicationJob:
+    job = RepublicationJob(
+        kind=kind,
+        status="queued",
+        payload=payload or {},
+        user_id=user_id,
+        schedule_id=schedule_id,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _wakeup.set()
+    return job
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[RepublicationJob]:
+    """
+    Toma el job encolado más viejo. El UPDATE condicionado a status="queued"
+    garantiza que solo un worker (de cualquier proceso) se lo quede.
+    """
+    candidates = (
+        db.query(RepublicationJob.id)
+        .filter(RepublicationJob.status == "queued")
+        .order_by(RepublicationJob.created_at.asc(), RepublicationJob.id.asc())
+        .limit(5)
+        .all()
+    )
+    for (job_id,) in candidates:
+        claimed = (
+            db.query(RepublicationJob)
+            .filter(
+                RepublicationJob.id == job_id,
+                RepublicationJob.status == "queued",
+            )
+            .update(
+                {
+                    RepublicationJob.status: "running",
+                    RepublicationJob.worker_id: worker_id,
+                    RepublicationJob.started_at: datetime.utcnow(),
+                    RepublicationJob.attempts: RepublicationJob.attempts + 1,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            job = db.query(RepublicationJob).get(job_id)
+            JOB_QUEUE_SECONDS.labels(job.kind).observe(
+                max(0.0, (job.started_at - job.created_at).total_seconds())
+            )
+            return job
+    return None
+
+
+def requeue_stale_jobs(db: Session) -> List[int]:
+    """
+    Jobs en "running" por más de settings.job_stale_minutes quedaron
+    huérfanos (worker caído o reinicio). Se re-encolan hasta JOB_MAX_ATTEMPTS.
+    """
+    limit = datetime.utcnow() - timedelta(minutes=settings.job_stale_minutes)
+    stale = (
+        db.query(RepublicationJob)
+        .filter(
+            RepublicationJob.status == "running",
+            RepublicationJob.started_at < limit,
+        )
+        .all()
+    )
+    return _release_jobs(db, stale, "Job interrumpido (worker caído o reinicio)", requeue=True)
+
+
+def release_worker_jobs(db: Session, worker_id: str, error: str, requeue: bool) -> List[int]:
+    """
+    Cierra los jobs "running" de un worker que murió o se cortó (el líder y
+    las programaciones que combinó). Ver _release_jobs.
+    """
+    jobs = (
+        db.query(RepublicationJob)
+        .filter(
+            RepublicationJob.status == "running",
+            RepublicationJob.worker_id == worker_id,
+        )
+        .all()
+    )
+    return _release_jobs(db, jobs, error, requeue)
+
+
+def _release_jobs(
+    db: Session,
+    jobs: List[RepublicationJob],
+    error: str,
+    requeue: bool,
+) -> List[int]:
+    """
+    Con `requeue` los jobs vuelven a la cola hasta JOB_MAX_ATTEMPTS, si no
+    quedan "failed" con `error`. Sus corridas por marca que seguían
+    "running" quedan "failed". Devuelve los ids.
+    """
+    now = datetime.utcnow()
+    ids = [job.id for job in jobs]
+    if not ids:
+        return ids
+    db.query(RepublicationRun).filter(
+        RepublicationRun.job_id.in_(ids),
+        RepublicationRun.status == "running",
+    ).update(
+        {
+            RepublicationRun.status: "failed",
+            RepublicationRun.error: error,
+            RepublicationRun.finished_at: now,
+        },
+        synchronize_session=False,
+    )
+    for job in jobs:
+        if requeue and (job.attempts or 0) < settings.JOB_MAX_ATTEMPTS:
+            job.status = "queued"
+            job.worker_id = None
+        else:
+            job.status = "failed"
+            job.error = error
+            job.finished_at = now
+        db.add(job)
+    db.commit()
+    for job in jobs:
+        if job.status == "failed":
+            publish_job_finished(job.id, job.status, job.error)
+    return ids
+
+
+# ---- ejecución de cada tipo de job ----
+
+
+def _run_by_account(
+    db: Session, job: RepublicationJob, brand_accounts: Dict[str, Optional[int]], **options
+) -> Dict[str, int]:
+    """
+    Corre las marcas agrupadas por cuenta de SuperCarros, todas las cuentas
+    en paralelo. Las marcas cuya cuenta no está disponible quedan en -1.
+    """
+    groups, unavailable = group_by_account(db, brand_accounts)
+    for brand_name, error in unavailable.items():
+        print(f"Job {job.id}: se omite {brand_name} ({error})")
+    if len(groups) > 1:
+        print(f"Job {job.id}: {len(groups)} cuentas en paralelo")
+    results = (
+        run_accounts_job(groups, job_id=job.id, attempt=job.attempts or 1, **options)
+        if groups
+        else {}
+    )
+    return {**results, **{brand_name: -1 for brand_name in unavailable}}
+
+
+def _run_manual_job(db: Session, job: RepublicationJob) -> Dict[str, int]:
+    payload = job.payload or {}
+    if payload.get("all_brands"):
+        brands = db.query(Brand).filter(Brand.is_active == True).all()
+    else:
+        brands = brands_by_ids(db, payload.get("brand_ids") or [])
+    if not brands:
+        raise ValueError("No se encontraron marcas")
+
+    started = start_brand_runs(
+        db, brands, datetime.utcnow(), job_id=job.id, user_id=job.user_id, is_manual=True
+    )
+    db.commit()
+    run_ids = {name: [run_id] for name, run_id in started.items()}
+
+    try:
+        results = _run_by_account(
+            db,
+            job,
+            brand_accounts_of(brands),
+            bump_mode=payload.get("bump_mode"),
+            single_pass=bool(payload.get("all_brands")),
+            progress=RunProgress(job.id, run_ids),
+        )
+    except Exception as e:
+        db.rollback()
+        finish_brand_runs(db, run_ids, {}, error=str(e))
+        db.commit()
+        raise
+
+    finish_brand_runs(db, run_ids, results)
+    db.commit()
+    return results
+
+
+def _run_schedule_job(db: Session, job: RepublicationJob) -> Dict[str, int]:
+    """
+    Ejecuta la programación del job junto con las demás que dispararon en la
+    misma ventana (ver app.services.planner): un solo login y cada marca
+    compartida se republica una vez. Las ejecuciones inmediatas (run-once,
+    payload "run_once") corren solas y sin esperar.
+    """
+    plan = SchedulePlan()
+    error = plan.add(db, job)
+    if error:
+        raise ValueError(error)
+
+    siblings = []
+    if not (job.payload or {}).get("run_once"):
+        wait_for_siblings(job)
+        siblings = claim_sibling_jobs(db, job, plan)
+    for sibling in siblings:
+        if sibling.id in plan.errors:
+            finish_sibling(db, sibling, job.id, error=plan.errors[sibling.id])
+    merged = [s for s in siblings if s.id not in plan.errors]
+    if merged:
+        print(
+            f"Job {job.id}: combinando {len(merged)} programación(es) más, "
+            f"{len(plan.brand_names)} marca(s) únicas"
+        )
+        job.payload = {**(job.payload or {}), "merged_jobs": [s.id for s in merged]}
+
+    run_ids = plan.start_runs(db, datetime.utcnow())
+    try:
+        results = _run_by_account(
+            db, job, plan.brand_accounts, progress=RunProgress(job.id, run_ids)
+        )
+        per_job = plan.finish(db, results, datetime.utcnow())
+    except Exception as e:
+        db.rollback()
+        plan.fail(db, str(e))
+        for sibling in merged:
+            finish_sibling(db, sibling, job.id, error=str(e))
+        raise
+
+    for sibling in merged:
+        finish_sibling(db, sibling, job.id, result=per_job[sibling.id])
+    return per_job[job.id]
+
+
+JOB_HANDLERS = {
+    "manual": _run_manual_job,
+    "schedule": _run_schedule_job,
+}
+
+
+def execute_job(job_id: int):
+    db: Session = SessionLocal()
+    try:
+        job = db.query(RepublicationJob).get(job_id)
+        try:
+            results = JOB_HANDLERS[job.kind](db, job)
+        except Exception as e:
+            db.rollback()
+            job.status = "failed"
+            job.error = str(e)
+            print(f"Job {job.id} fallido: {e}")
+        else:
+            job.status = "completed"
+            job.result = results
+        job.finished_at = datetime.utcnow()
+        if job.started_at:
+            JOB_SECONDS.labels(job.kind, job.status).observe(
+                (job.finished_at - job.started_at).total_seconds()
+            )
+        db.add(job)
+        db.commit()
+        publish_job_finished(job.id, job.status, job.error)
+    finally:
+        db.close()
+
+
+# ---- workers ----
+
+
+class JobWorker(threading.Thread):
+    """Hilo que toma jobs de la cola en la BD y los ejecuta uno a la vez."""
+
+    def __init__(self, index: int):
+        super().__init__(name=f"job-worker-{index}", daemon=True)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        _wakeup.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            job_id = None
+            db: Session = SessionLocal()
+            try:
+                job = claim_next_job(db, self.worker_id)
+                job_id = job.id if job else None
+            except Exception as e:
+                print(f"[{self.name}] Error leyendo la cola: {e}")
+            finally:
+                db.close()
+
+            if job_id is None:
+                _wakeup.wait(settings.JOB_POLL_SECONDS)
+                _wakeup.clear()
+                continue
+
+            execute_job(job_id)
+
+
+def start_job_workers():
+    if _workers:
+        return
+    db: Session = SessionLocal()
+    try:
+        requeue_stale_jobs(db)
+    finally:
+        db.close()
+    for i in range(settings.JOB_WORKERS):
+        worker = JobWorker(i)
+        worker.start()
+        _workers.append(worker)
+
+
+def shutdown_job_workers():
+    for worker in _workers:
+        worker.stop()
+    _workers.clear()
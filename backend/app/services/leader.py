@@ -0,0 +1,170 @@
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.lease import Lease
+
+
+def try_acquire_lease(db: Session, name: str, owner: str, ttl_seconds: int) -> bool:
+    """
+    Renueva el lease si ya es nuestro o lo toma si expiró.
+    Devuelve True si quedamos como dueños.
+    """
+    now = datetime.utcnow()
+    values = {
+        Lease.owner: owner,
+        Lease.expires_at: now + timedelta(seconds=ttl_seconds),
+        Lease.heartbeat_at: now,
+    }
+    updated = (
+        db.query(Lease)
+        .filter(
+            Lease.name == name,
+            or_(Lease.owner == owner, Lease.expires_at < now),
+        )
+        .update(values, synchronize_session=False)
+    )
+    if updated:
+        db.commit()
+        return True
+
+    if db.query(Lease).get(name) is not None:
+        db.rollback()
+        return False
+
+    # primera vez: crear la fila
+    try:
+        db.add(
+            Lease(
+                name=name,
+                owner=owner,
+                expires_at=now + timedelta(seconds=ttl_seconds),
+                heartbeat_at=now,
+            )
+        )
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+def release_lease(db: Session, name: str, owner: str):
+    db.query(Lease).filter(Lease.name == name, Lease.owner == owner).update(
+        {Lease.expires_at: datetime.utcnow()}, synchronize_session=False
+    )
+    db.commit()
+
+
+class LeaderElector(threading.Thread):
+    """
+    Mantiene (o intenta obtener) el lease `name` con heartbeats cada
+    `interval_seconds`. Llama on_elected al ganarlo y on_demoted al perderlo,
+    así exactamente un proceso entre todos los workers/instancias es líder.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        on_elected: Callable[[], None],
+        on_demoted: Callable[[], None],
+        ttl_seconds: int,
+        interval_seconds: int,
+    ):
+        super().__init__(name=f"leader-{name}", daemon=True)
+        self.lease_name = name
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.ttl_seconds = ttl_seconds
+        self.interval_seconds = interval_seconds
+        self.is_leader = False
+        self._stop_event = threading.Event()
+
+    def _tick(self):
+        db: Session = SessionLocal()
+        try:
+            acquired = try_acquire_lease(
+                db, self.lease_name, self.owner, self.ttl_seconds
+            )
+        except Exception as e:
+            print(f"[{self.name}] Error renovando lease: {e}")
+            acquired = False
+        finally:
+            db.close()
+
+        if acquired and not self.is_leader:
+            self.is_leader = True
+            print(f"[{self.name}] {self.owner} es líder")
+            try:
+                self.on_elected()
+            except Exception as e:
+                # sin el scheduler andando no retenemos el lease: otro lo toma
+                print(f"[{self.name}] Error al asumir el liderazgo: {e}")
+                self._resign()
+        elif not acquired and self.is_leader:
+            self.is_leader = False
+            print(f"[{self.name}] {self.owner} perdió el liderazgo")
+            self._demote()
+
+    def _demote(self):
+        try:
+            self.on_demoted()
+        except Exception as e:
+            print(f"[{self.name}] Error al dejar el liderazgo: {e}")
+
+    def _resign(self):
+        """Deja de ser líder y libera el lease."""
+        self.is_leader = False
+        self._demote()
+        db: Session = SessionLocal()
+        try:
+            release_lease(db, self.lease_name, self.owner)
+        except Exception as e:
+            print(f"[{self.name}] Error liberando lease: {e}")
+        finally:
+            db.close()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._tick()
+            self._stop_event.wait(self.interval_seconds)
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_leader:
+            self._resign()
+
+
+elector: Optional[LeaderElector] = None
+
+
+def start_leader_election(
+    on_elected: Callable[[], None], on_demoted: Callable[[], None]
+):
+    global elector
+    if elector is None:
+        elector = LeaderElector(
+            name="scheduler",
+            on_elected=on_elected,
+            on_demoted=on_demoted,
+            ttl_seconds=settings.SCHEDULER_LEASE_TTL_SECONDS,
+            interval_seconds=settings.SCHEDULER_HEARTBEAT_SECONDS,
+        )
+        elector.start()
+
+
+def stop_leader_election():
+    global elector
+    if elector:
+        elector.stop()
+        elector = None
@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.ledger import AdBump
+
+
+class AdLedger:
+    """
+    Bitácora de una corrida sobre la tabla ad_bumps.
+    Vive en el loop del motor: los registros se escriben en un hilo aparte.
+    Cada anuncio republicado se escribe enseguida (si el proceso muere, el
+    reintento no lo vuelve a republicar); fallas y omisiones se acumulan en
+    lotes de LEDGER_BATCH_SIZE.
+
+    Al arrancar carga:
+      - los anuncios ya republicados por este mismo job (intentos previos
+        interrumpidos): se omiten y cuentan como republicados;
+      - si LEDGER_SKIP_WINDOW_MINUTES > 0, los republicados por cualquier
+        corrida en esa ventana: se omiten sin contarlos.
+    """
+
+    def __init__(self, job_id: Optional[int] = None, attempt: int = 1):
+        self.job_id = job_id
+        self.attempt = attempt
+        self.resumed: Set[str] = set()
+        self.recent: Set[str] = set()
+        self._buffer: List[Dict] = []
+        self._flush_lock = asyncio.Lock()
+
+    # ---- lectura ----
+
+    def _load_sync(self):
+        since = datetime.utcnow() - timedelta(minutes=settings.LEDGER_SKIP_WINDOW_MINUTES)
+        conditions = []
+        if self.job_id is not None:
+            conditions.append(AdBump.job_id == self.job_id)
+        if settings.LEDGER_SKIP_WINDOW_MINUTES > 0:
+            conditions.append(AdBump.created_at >= since)
+        if not conditions:
+            return
+
+        db: Session = SessionLocal()
+        try:
+            rows = (
+                db.query(AdBump.ad_id, AdBump.job_id)
+                .filter(AdBump.outcome == "bumped", or_(*conditions))
+                .all()
+            )
+        finally:
+            db.close()
+        for ad_id, job_id in rows:
+            if self.job_id is not None and job_id == self.job_id:
+                self.resumed.add(ad_id)
+            else:
+                self.recent.add(ad_id)
+
+    async def load(self) -> "AdLedger":
+        await asyncio.to_thread(self._load_sync)
+        if self.resumed:
+            print(f"Retomando job {self.job_id}: {len(self.resumed)} anuncios ya republicados.")
+        return self
+
+    def skip_reason(self, ad_id: str) -> Optional[str]:
+        """None si hay que republicar el anuncio; "resumed" o "recent" si no."""
+        if ad_id in self.resumed:
+            return "resumed"
+        if ad_id in self.recent:
+            return "recent"
+        return None
+
+    # ---- escritura ----
+
+    async def record(
+        self,
+        ad_id: str,
+        brand: str,
+        outcome: str,
+        latency_ms: Optional[int] = None,
+        error: Optional[str] = None,
+    ):
+        if outcome == "bumped":
+            self.resumed.add(ad_id)
+        self._buffer.append(
+            {
+                "job_id": self.job_id,
+                "attempt": self.attempt,
+                "ad_id": ad_id,
+                "brand": brand,
+                "outcome": outcome,
+                "latency_ms": latency_ms,
+                "error": (error or None) and str(error)[:1000],
+                "created_at": datetime.utcnow(),
+            }
+        )
+        if outcome == "bumped" or len(self._buffer) >= settings.LEDGER_BATCH_SIZE:
+            await self.flush()
+
+    def _write_sync(self, rows: List[Dict]):
+        db: Session = SessionLocal()
+        try:
+            db.bulk_insert_mappings(AdBump, rows)
+            db.commit()
+        finally:
+            db.close()
+
+    async def flush(self):
+        async with self._flush_lock:
+            rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            try:
+                await asyncio.to_thread(self._write_sync, rows)
+            except Exception as e:
+                # la bitácora no debe tumbar la corrida
+                print(f"No se pudo guardar la bitácora de anuncios: {e}")
@@ -0,0 +1,267 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+
+# Métricas de Prometheus de todo el pipeline. Se exponen en /metrics.
+# Con varios workers de gunicorn, definir PROMETHEUS_MULTIPROC_DIR (un
+# directorio vacío por despliegue) para sumar las de todos los procesos.
+
+# Buckets en segundos: de pasos del navegador (ms) a corridas completas (min)
+_STEP_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+_LONG_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+# ---- navegador y SuperCarros ----
+
+BROWSER_LAUNCH_SECONDS = Histogram(
+    "supercarros_browser_launch_seconds",
+    "Tiempo en lanzar un Chromium del pool",
+    buckets=_STEP_BUCKETS,
+)
+LOGIN_SECONDS = Histogram(
+    "supercarros_login_seconds",
+    "Tiempo del login completo en SuperCarros",
+    ["result"],  # ok, failed
+    buckets=_STEP_BUCKETS,
+)
+SESSION_CHECKS = Counter(
+    "supercarros_session_checks_total",
+    "Sesiones guardadas verificadas al abrir un contexto",
+    ["result"],  # reused, expired
+)
+WAIT_STEP_SECONDS = Histogram(
+    "supercarros_wait_step_seconds",
+    "Duración de cada espera por evento (brand_filter, bump_save, ...)",
+    ["step"],
+    buckets=_STEP_BUCKETS,
+)
+WAIT_STEP_TIMEOUTS = Counter(
+    "supercarros_wait_step_timeouts_total",
+    "Esperas por evento que vencieron",
+    ["step"],
+)
+AD_BUMP_SECONDS = Histogram(
+    "supercarros_ad_bump_seconds",
+    "Latencia de republicar un anuncio, con reintentos",
+    ["mode", "outcome"],  # browser/http, bumped/failed
+    buckets=_STEP_BUCKETS,
+)
+ADS_FOUND = Counter("supercarros_ads_found_total", "Anuncios encontrados por las corridas")
+ADS_BUMPED = Counter("supercarros_ads_bumped_total", "Anuncios republicados")
+ADS_SKIPPED = Counter(
+    "supercarros_ads_skipped_total",
+    "Anuncios omitidos por la bitácora",
+    ["reason"],  # resumed, recent
+)
+STEP_RETRIES = Counter(
+    "supercarros_step_retries_total",
+    "Reintentos de pasos contra SuperCarros por tipo de falla",
+    ["kind"],
+)
+BRANDS_FINISHED = Counter(
+    "supercarros_brands_total",
+    "Marcas procesadas por resultado",
+    ["status"],  # completed, failed
+)
+BLOCKED_REQUESTS = Counter(
+    "supercarros_blocked_requests_total",
+    "Pedidos de red bloqueados por la política de recursos",
+    ["resource_type"],
+)
+
+# ---- scheduler y cola ----
+
+SCHEDULER_LAG_SECONDS = Histogram(
+    "scheduler_lag_seconds",
+    "Atraso del disparo real respecto a next_run_at de la programación",
+    buckets=_LONG_BUCKETS,
+)
+SCHEDULER_SKIPPED = Counter(
+    "scheduler_skipped_total",
+    "Disparos omitidos por tener jobs pendientes (max_instances)",
+)
+JOB_QUEUE_SECONDS = Histogram(
+    "republication_job_queue_seconds",
+    "Tiempo de un job en la cola hasta que un worker lo toma",
+    ["kind"],
+    buckets=_LONG_BUCKETS,
+)
+JOB_SECONDS = Histogram(
+    "republication_job_seconds",
+    "Duración de los jobs de republicación",
+    ["kind", "status"],
+    buckets=_LONG_BUCKETS,
+)
+
+# ---- API y BD ----
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "Duración de los pedidos a la API",
+    ["method", "route", "status"],
+    buckets=_STEP_BUCKETS,
+)
+HTTP_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Tiempo en queries de la BD por pedido a la API",
+    ["method", "route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+HTTP_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Queries a la BD por pedido a la API",
+    ["method", "route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+
+# ---- estado (se actualiza al leer /metrics) ----
+
+CIRCUIT_OPEN = Gauge(
+    "supercarros_circuit_open",
+    "1 si el circuit breaker de la cuenta está abierto o medio abierto",
+    ["account"],
+    multiprocess_mode="max",
+)
+RATE_LIMIT_PER_MINUTE = Gauge(
+    "supercarros_rate_limit_per_minute",
+    "Última tasa vista del límite por cuenta",
+    ["account"],
+    multiprocess_mode="max",
+)
+BROWSER_CONTEXTS_ACTIVE = Gauge(
+    "browser_pool_active_contexts",
+    "Contextos prestados por el pool de navegadores",
+    multiprocess_mode="livesum",
+)
+BROWSER_MEMORY_MB = Gauge(
+    "browser_pool_memory_mb",
+    "RSS de los Chromium del pool",
+    multiprocess_mode="livesum",
+)
+
+
+def _refresh_state():
+    # imports locales: estos módulos importan este
+    from app.services import browser_pool
+    from app.services.rate_limit import _limiters
+    from app.services.resilience import _breakers
+
+    for key, breaker in list(_breakers.items()):
+        CIRCUIT_OPEN.labels(account=key).set(0 if breaker.state == "closed" else 1)
+    for key, limiter in list(_limiters.items()):
+        if limiter.rate:
+            RATE_LIMIT_PER_MINUTE.labels(account=key).set(limiter.rate * 60)
+    pool = browser_pool.browser_pool
+    if pool is not None:
+        slots = list(pool._slots)
+        BROWSER_CONTEXTS_ACTIVE.set(sum(s.active for s in slots))
+        BROWSER_MEMORY_MB.set(sum(s.memory_mb() for s in slots))
+
+
+def render_metrics():
+    """(cuerpo, content type) para la respuesta de /metrics."""
+    _refresh_state()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+# ---- tiempo de BD por pedido ----
+
+
+class _DbTimer:
+    def __init__(self):
+        self.seconds = 0.0
+        self.queries = 0
+
+
+# El middleware deja un _DbTimer por pedido; FastAPI copia el contexto a los
+# hilos de las rutas sync, así los eventos del engine lo ven.
+_db_timer: ContextVar[Optional[_DbTimer]] = ContextVar("db_timer", default=None)
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started: List[float] = conn.info.get("query_started") or []
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        timer = _db_timer.get()
+        if timer is not None:
+            timer.seconds += elapsed
+            timer.queries += 1
+
+
+def _route_template(scope) -> str:
+    """
+    Plantilla de la ruta que atendió el pedido, con su prefijo. Según la
+    versión de FastAPI, scope["route"].path ya trae el prefijo del router
+    (/api/jobs/{job_id}) o solo la parte propia (/{job_id}).
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "desconocida"
+    path = scope.get("path", "")
+    regex = getattr(route, "path_regex", None)
+    if regex is None or regex.fullmatch(path):
+        return template
+    for i, char in enumerate(path):
+        if char == "/" and regex.fullmatch(path[i:]):
+            return path[:i] + template
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: duración de cada pedido y tiempo/cantidad de queries
+    de la BD, etiquetados con la ruta (plantilla, ej. /api/jobs/{job_id}).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = _DbTimer()
+        token = _db_timer.set(timer)
+        status = {"code": 500}
+        started = time.perf_counter()
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _db_timer.reset(token)
+            path = _route_template(scope)
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.labels(method, path, str(status["code"])).observe(
+                time.perf_counter() - started
+            )
+            HTTP_DB_SECONDS.labels(method, path).observe(timer.seconds)
+            HTTP_DB_QUERIES.labels(method, path).observe(timer.queries)
@@ -0,0 +1,217 @@
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.queries import finish_brand_runs, get_schedule_with_brands, start_brand_runs
+from app.models.brand import Brand
+from app.models.job import RepublicationJob
+from app.models.schedule import Schedule
+from app.services.progress import publish_job_finished
+from app.services.scheduler import compute_next_run_for_schedule
+
+
+def _brand_accounts(schedule: Schedule, brands: List[Brand]) -> Dict[str, Optional[int]]:
+    return {b.name: b.account_id or schedule.account_id for b in brands}
+
+
+class SchedulePlan:
+    """
+    Corrida combinada de varias programaciones que dispararon juntas:
+    una sola sesión de navegador sobre la unión de sus marcas (sin repetir),
+    y después se reparte el conteo por marca a cada programación.
+    """
+
+    def __init__(self):
+        self.jobs: List[RepublicationJob] = []
+        self.schedules: Dict[int, Schedule] = {}
+        self.brands_by_job: Dict[int, List[Brand]] = {}
+        self.errors: Dict[int, str] = {}
+        self.run_ids_by_job: Dict[int, Dict[str, int]] = {}
+
+    def add(self, db: Session, job: RepublicationJob) -> Optional[str]:
+        """Agrega el job al plan; devuelve el error si no se puede ejecutar."""
+        schedule = get_schedule_with_brands(db, job.schedule_id)
+        if not schedule:
+            error = "Programación no encontrada"
+        else:
+            brands = schedule.brands_list
+            error = None if brands else "La programación no tiene marcas asociadas"
+        if error:
+            self.errors[job.id] = error
+            return error
+        self.jobs.append(job)
+        self.schedules[job.id] = schedule
+        self.brands_by_job[job.id] = brands
+        return None
+
+    @property
+    def brand_accounts(self) -> Dict[str, Optional[int]]:
+        """
+        {brand_name: account_id} de la unión de marcas: la cuenta de la marca
+        o, si no tiene, la de su programación. claim_sibling_jobs no combina
+        programaciones que resuelven la misma marca a cuentas distintas.
+        """
+        accounts: Dict[str, Optional[int]] = {}
+        for job in self.jobs:
+            accounts.update(
+                _brand_accounts(self.schedules[job.id], self.brands_by_job[job.id])
+            )
+        return accounts
+
+    def conflicts_with(self, schedule: Optional[Schedule]) -> bool:
+        """True si la programación usa otra cuenta para alguna marca del plan."""
+        if not schedule:
+            return False
+        planned = self.brand_accounts
+        return any(
+            name in planned and planned[name] != account_id
+            for name, account_id in _brand_accounts(schedule, schedule.brands_list).items()
+        )
+
+    @property
+    def brand_names(self) -> List[str]:
+        """Unión de marcas de todas las programaciones, en orden y sin duplicados."""
+        names: List[str] = []
+        seen = set()
+        for job in self.jobs:
+            for brand in self.brands_by_job[job.id]:
+                if brand.name not in seen:
+                    seen.add(brand.name)
+                    names.append(brand.name)
+        return names
+
+    def start_runs(self, db: Session, now: datetime) -> Dict[str, List[int]]:
+        """
+        Crea las filas "running" de cada programación del plan y devuelve
+        {brand_name: [run_ids]} para reportar el avance de la corrida única.
+        """
+        run_ids: Dict[str, List[int]] = {}
+        for job in self.jobs:
+            job_runs = start_brand_runs(
+                db,
+                self.brands_by_job[job.id],
+                now,
+                job_id=job.id,
+                schedule_id=self.schedules[job.id].id,
+                user_id=job.user_id,
+            )
+            for brand_name, run_id in job_runs.items():
+                run_ids.setdefault(brand_name, []).append(run_id)
+            self.run_ids_by_job[job.id] = job_runs
+        db.commit()
+        return run_ids
+
+    def finish(self, db: Session, results: Dict[str, int], now: datetime) -> Dict[int, Dict[str, int]]:
+        """
+        Cierra las corridas de cada programación con el conteo por marca y
+        devuelve {job_id: {brand_name: vehicles_count}}.
+        """
+        per_job: Dict[int, Dict[str, int]] = {}
+        for job in self.jobs:
+            schedule = self.schedules[job.id]
+            brands = self.brands_by_job[job.id]
+            finish_brand_runs(db, self._job_run_ids(job), results)
+            schedule.last_run_at = now
+            schedule.next_run_at = compute_next_run_for_schedule(schedule, now)
+            db.add(schedule)
+            per_job[job.id] = {b.name: int(results.get(b.name, 0)) for b in brands}
+        db.commit()
+        return per_job
+
+    def fail(self, db: Session, error: str):
+        for job in self.jobs:
+            finish_brand_runs(db, self._job_run_ids(job), {}, error=error)
+        db.commit()
+
+    def _job_run_ids(self, job: RepublicationJob) -> Dict[str, List[int]]:
+        return {name: [run_id] for name, run_id in self.run_ids_by_job.get(job.id, {}).items()}
+
+
+def wait_for_siblings(job: RepublicationJob):
+    """
+    Las programaciones con la misma hora se encolan casi a la vez; el worker
+    espera unos segundos desde el encolado para que lleguen todas antes de
+    armar el plan.
+    """
+    settle = settings.PLANNER_SETTLE_SECONDS
+    if settle <= 0 or job.created_at is None:
+        return
+    elapsed = (datetime.utcnow() - job.created_at).total_seconds()
+    if elapsed < settle:
+        time.sleep(settle - elapsed)
+
+
+def claim_sibling_jobs(
+    db: Session,
+    job: RepublicationJob,
+    plan: SchedulePlan,
+) -> List[RepublicationJob]:
+    """
+    Reclama los jobs de programación encolados dentro de la ventana
+    PLANNER_WINDOW_SECONDS alrededor del job líder y los agrega al plan.
+    Mismo UPDATE condicionado que claim_next_job, así ningún otro worker los
+    toma en paralelo. Las programaciones que usan otra cuenta para una marca
+    del plan quedan en la cola y corren aparte.
+    """
+    window = timedelta(seconds=settings.PLANNER_WINDOW_SECONDS)
+    if not window or job.created_at is None:
+        return []
+
+    candidates = (
+        db.query(RepublicationJob.id, RepublicationJob.schedule_id)
+        .filter(
+            RepublicationJob.kind == "schedule",
+            RepublicationJob.status == "queued",
+            RepublicationJob.id != job.id,
+            RepublicationJob.created_at >= job.created_at - window,
+            RepublicationJob.created_at <= job.created_at + window,
+        )
+        .order_by(RepublicationJob.created_at.asc(), RepublicationJob.id.asc())
+        .all()
+    )
+    siblings = []
+    for job_id, schedule_id in candidates:
+        if plan.conflicts_with(get_schedule_with_brands(db, schedule_id)):
+            continue
+        claimed = (
+            db.query(RepublicationJob)
+            .filter(
+                RepublicationJob.id == job_id,
+                RepublicationJob.status == "queued",
+            )
+            .update(
+                {
+                    RepublicationJob.status: "running",
+                    RepublicationJob.worker_id: job.worker_id,
+                    RepublicationJob.started_at: datetime.utcnow(),
+                    RepublicationJob.attempts: RepublicationJob.attempts + 1,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            sibling = db.query(RepublicationJob).get(job_id)
+            plan.add(db, sibling)
+            siblings.append(sibling)
+    return siblings
+
+
+def finish_sibling(
+    db: Session,
+    job: RepublicationJob,
+    leader_id: int,
+    result: Optional[Dict[str, int]] = None,
+    error: Optional[str] = None,
+):
+    job.status = "failed" if error else "completed"
+    job.result = result
+    job.error = error
+    job.payload = {**(job.payload or {}), "merged_into": leader_id}
+    job.finished_at = datetime.utcnow()
+    db.add(job)
+    db.commit()
+    publish_job_finished(job.id, job.status, job.error)
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.run import RepublicationRun
+
+
+class ProgressHub:
+    """
+    Pub/sub en memoria del proceso para el avance de las corridas.
+    Se publica desde cualquier hilo (workers, loop del motor) y cada
+    suscriptor recibe los eventos en una asyncio.Queue de su propio loop
+    (ej. el endpoint SSE en el loop de FastAPI).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue, Optional[int]]] = set()
+
+    def subscribe(self, job_id: Optional[int] = None) -> asyncio.Queue:
+        """Debe llamarse desde el loop que va a consumir la cola."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.PROGRESS_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue, job_id))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers = {s for s in self._subscribers if s[1] is not queue}
+
+    def publish(self, event: Dict):
+        with self._lock:
+            targets = list(self._subscribers)
+        for loop, queue, job_id in targets:
+            if job_id is not None and event.get("job_id") != job_id:
+                continue
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # loop cerrado: el suscriptor ya no existe
+                self.unsubscribe(queue)
+
+
+def _offer(queue: asyncio.Queue, event: Dict):
+    # un cliente lento pierde eventos intermedios, no frena la corrida
+    if not queue.full():
+        queue.put_nowait(event)
+
+
+progress_hub = ProgressHub()
+
+
+def _update_runs_sync(run_ids: List[int], values: Dict):
+    db: Session = SessionLocal()
+    try:
+        db.query(RepublicationRun).filter(RepublicationRun.id.in_(run_ids)).update(
+            values, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+class RunProgress:
+    """
+    Avance de una corrida en curso. Vive en el loop del motor: publica cada
+    cambio en progress_hub y lo guarda en las filas "running" de
+    RepublicationRun (al empezar y terminar cada marca, y cada
+    PROGRESS_PERSIST_EVERY anuncios republicados).
+    `run_ids` es {brand_name: [ids de RepublicationRun]} (varias filas si la
+    marca es de varias programaciones combinadas).
+    """
+
+    def __init__(self, job_id: Optional[int], run_ids: Dict[str, List[int]]):
+        self.job_id = job_id
+        self.run_ids = run_ids
+        self.found: Dict[str, int] = {}
+        self.bumped: Dict[str, int] = {}
+
+    def _publish(self, type_: str, brand: str, **extra):
+        progress_hub.publish(
+            {
+                "type": type_,
+                "job_id": self.job_id,
+                "brand": brand,
+                "run_ids": self.run_ids.get(brand, []),
+                "ads_found": self.found.get(brand),
+                "ads_bumped": self.bumped.get(brand, 0),
+                **extra,
+            }
+        )
+
+    async def _persist(self, brand: str, values: Dict):
+        run_ids = self.run_ids.get(brand)
+        if not run_ids:
+            return
+        try:
+            await asyncio.to_thread(_update_runs_sync, run_ids, values)
+        except Exception as e:
+            print(f"No se pudo guardar el avance de {brand}: {e}")
+
+    async def brand_started(self, brand: str, ads_found: int, already_bumped: int = 0):
+        self.found[brand] = ads_found
+        self.bumped[brand] = already_bumped
+        self._publish("brand_started", brand)
+        await self._persist(
+            brand,
+            {
+                RepublicationRun.ads_found: ads_found,
+                RepublicationRun.ads_bumped: already_bumped,
+            },
+        )
+
+    async def ad_bumped(self, brand: str):
+        self.bumped[brand] = self.bumped.get(brand, 0) + 1
+        self._publish("ad_bumped", brand)
+        if self.bumped[brand] % settings.PROGRESS_PERSIST_EVERY == 0:
+            await self._persist(brand, {RepublicationRun.ads_bumped: self.bumped[brand]})
+
+    async def brand_finished(self, brand: str, count: int):
+        self.bumped[brand] = max(count, 0)
+        status = "completed" if count >= 0 else "failed"
+        self._publish("brand_finished", brand, status=status)
+        await self._persist(
+            brand,
+            {
+                RepublicationRun.ads_bumped: max(count, 0),
+                RepublicationRun.vehicles_count: max(count, 0),
+                RepublicationRun.status: status,
+                RepublicationRun.finished_at: datetime.utcnow(),
+            },
+        )
+
+
+def publish_job_finished(job_id: int, status: str, error: Optional[str] = None):
+    progress_hub.publish(
+        {"type": "job_finished", "job_id": job_id, "status": status, "error": error}
+    )
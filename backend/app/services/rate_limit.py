@@ -0,0 +1,217 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.rate_limit import RateBucket
+from app.services.resilience import REJECTED, THROTTLED, TIMEOUT, classify
+
+T = TypeVar("T")
+
+# Fallas que indican que SuperCarros nos está frenando (o no da abasto)
+SLOW_DOWN = (THROTTLED, REJECTED, TIMEOUT)
+LATENCY_ALPHA = 0.2  # peso de cada muestra en el promedio móvil
+CAS_RETRIES = 20
+
+
+def _per_second(per_minute: float) -> float:
+    return per_minute / 60.0
+
+
+class _Feedback:
+    """Resultados observados desde la última reserva, pendientes de aplicar."""
+
+    def __init__(self):
+        self.successes = 0
+        self.slow_down = False
+        self.latencies = []
+
+    def __bool__(self):
+        return bool(self.successes or self.slow_down or self.latencies)
+
+    def merge(self, other: "_Feedback"):
+        self.successes += other.successes
+        self.slow_down = self.slow_down or other.slow_down
+        self.latencies.extend(other.latencies)
+
+
+def _adapt(row: RateBucket, feedback: _Feedback, now: float) -> Dict:
+    """
+    AIMD sobre la tasa compartida: cada éxito la sube de forma que en un
+    minuto sin problemas gane RATE_LIMIT_INCREASE_PER_MINUTE; un error de
+    SuperCarros o un promedio de latencia sobre RATE_LIMIT_TARGET_LATENCY_MS
+    la multiplica por RATE_LIMIT_DECREASE_FACTOR (como mucho una vez cada
+    RATE_LIMIT_DECREASE_COOLDOWN_SECONDS, para que varios workers no la
+    bajen varias veces por el mismo episodio).
+    """
+    rate = row.rate
+    latency = row.latency_ms
+    for sample in feedback.latencies:
+        latency = sample if latency is None else latency + LATENCY_ALPHA * (sample - latency)
+
+    last_decrease_at = row.last_decrease_at
+    slow = feedback.slow_down or (
+        latency is not None and latency > settings.RATE_LIMIT_TARGET_LATENCY_MS
+    )
+    if slow:
+        if (
+            last_decrease_at is None
+            or now - last_decrease_at >= settings.RATE_LIMIT_DECREASE_COOLDOWN_SECONDS
+        ):
+            rate *= settings.RATE_LIMIT_DECREASE_FACTOR
+            last_decrease_at = now
+    elif feedback.successes:
+        per_minute = max(rate * 60.0, 1.0)
+        rate += feedback.successes * _per_second(settings.RATE_LIMIT_INCREASE_PER_MINUTE) / per_minute
+
+    rate = min(
+        max(rate, _per_second(settings.RATE_LIMIT_MIN_PER_MINUTE)),
+        _per_second(settings.RATE_LIMIT_MAX_PER_MINUTE),
+    )
+    return {"rate": rate, "latency_ms": latency, "last_decrease_at": last_decrease_at}
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket por cuenta de SuperCarros guardado en rate_buckets, así
+    todas las páginas, contextos y procesos que usan la misma cuenta
+    comparten el mismo ritmo.
+
+    `acquire()` reserva un turno: descuenta un token (puede quedar en
+    negativo, lo que forma la fila de espera) y duerme lo que falte para
+    que ese token exista. `observe()` acumula la latencia y el resultado de
+    cada paso; se aplican a la tasa en la siguiente reserva, en el mismo
+    UPDATE. Vive en el loop del motor.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.rate: Optional[float] = None  # última tasa vista (tokens/s)
+        self._feedback = _Feedback()
+        self._lock: Optional[asyncio.Lock] = None
+
+    # ---- BD ----
+
+    def _create_sync(self, db: Session, now: float) -> bool:
+        try:
+            db.add(
+                RateBucket(
+                    key=self.key,
+                    tokens=float(settings.RATE_LIMIT_BURST),
+                    rate=_per_second(settings.RATE_LIMIT_INITIAL_PER_MINUTE),
+                    updated_at=now,
+                    version=0,
+                )
+            )
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            return False
+
+    def _reserve_sync(self, feedback: _Feedback, tokens: int) -> Tuple[float, float]:
+        """
+        Aplica `feedback` y descuenta `tokens` con compare-and-swap sobre
+        `version`. Devuelve (segundos a esperar, tasa resultante).
+        """
+        db: Session = SessionLocal()
+        try:
+            for _ in range(CAS_RETRIES):
+                now = time.time()
+                row = db.query(RateBucket).get(self.key)
+                if row is None:
+                    self._create_sync(db, now)
+                    continue
+
+                values = _adapt(row, feedback, now)
+                elapsed = max(0.0, now - row.updated_at)
+                available = min(
+                    float(settings.RATE_LIMIT_BURST), row.tokens + elapsed * row.rate
+                )
+                remaining = available - tokens
+                updated = (
+                    db.query(RateBucket)
+                    .filter(RateBucket.key == self.key, RateBucket.version == row.version)
+                    .update(
+                        {
+                            RateBucket.tokens: remaining,
+                            RateBucket.updated_at: now,
+                            RateBucket.version: row.version + 1,
+                            RateBucket.rate: values["rate"],
+                            RateBucket.latency_ms: values["latency_ms"],
+                            RateBucket.last_decrease_at: values["last_decrease_at"],
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                if updated:
+                    return max(0.0, -remaining / values["rate"]), values["rate"]
+                db.expire_all()
+        finally:
+            db.close()
+        raise RuntimeError(f"No se pudo reservar turno para {self.key}")
+
+    async def _reserve(self, tokens: int) -> float:
+        feedback, self._feedback = self._feedback, _Feedback()
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # dentro del proceso se serializa; entre procesos decide el CAS
+        async with self._lock:
+            try:
+                wait, self.rate = await asyncio.to_thread(self._reserve_sync, feedback, tokens)
+                return wait
+            except Exception as e:
+                # sin BD no se frena la corrida, pero se va al ritmo mínimo
+                print(f"No se pudo consultar el límite de {self.key}: {e}")
+                self._feedback.merge(feedback)
+                return tokens / _per_second(settings.RATE_LIMIT_MIN_PER_MINUTE)
+
+    # ---- API ----
+
+    async def acquire(self):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        wait = await self._reserve(1)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def observe(self, latency_ms: int, kind: Optional[str] = None):
+        """Registra un paso: `kind` None si salió bien, o el tipo de falla."""
+        if kind is None:
+            self._feedback.successes += 1
+            self._feedback.latencies.append(latency_ms)
+        elif kind in SLOW_DOWN:
+            self._feedback.slow_down = True
+
+    async def flush(self):
+        """Aplica lo observado sin reservar turno (al terminar la corrida)."""
+        if settings.RATE_LIMIT_ENABLED and self._feedback:
+            await self._reserve(0)
+
+    async def run(self, step: Callable[[], Awaitable[T]]) -> T:
+        """Espera turno, ejecuta `step` y registra su latencia y resultado."""
+        await self.acquire()
+        started = time.perf_counter()
+        try:
+            result = await step()
+        except Exception as e:
+            self.observe(int((time.perf_counter() - started) * 1000), classify(e))
+            raise
+        self.observe(int((time.perf_counter() - started) * 1000))
+        return result
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def rate_limiter_for(key: Optional[str] = None) -> AdaptiveRateLimiter:
+    """Limitador de la cuenta `key` (por defecto SUPERCARROS_USER), uno por proceso."""
+    key = key or settings.SUPERCARROS_USER
+    if key not in _limiters:
+        _limiters[key] = AdaptiveRateLimiter(key)
+    return _limiters[key]
@@ -0,0 +1,210 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, TypeVar
+
+import httpx
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.core.config import settings
+from app.services.metrics import STEP_RETRIES
+
+T = TypeVar("T")
+
+# Tipos de falla
+TIMEOUT = "timeout"
+SELECTOR_MISSING = "selector_missing"
+SESSION_EXPIRED = "session_expired"
+BROWSER_CRASHED = "browser_crashed"
+REJECTED = "rejected"  # SuperCarros respondió con error
+THROTTLED = "throttled"  # HTTP 429/503: nos está frenando
+NETWORK = "network"
+UNKNOWN = "unknown"
+
+# Se reintentan en el mismo anuncio, sin recrear la página. REJECTED no:
+# SuperCarros rechazó ese anuncio y reintentar repetiría el POST.
+RETRYABLE = (TIMEOUT, SELECTOR_MISSING, THROTTLED, NETWORK)
+# Obligan a recrear página/contexto (y sesión) antes de seguir
+FATAL_FOR_PAGE = (SESSION_EXPIRED, BROWSER_CRASHED)
+# Cuentan para el circuit breaker (el sitio o la red está degradado)
+DEGRADED = (TIMEOUT, NETWORK, BROWSER_CRASHED, THROTTLED)
+
+_CRASH_MARKERS = (
+    "target closed",
+    "target page, context or browser has been closed",
+    "browser has been closed",
+    "browser closed",
+    "page crashed",
+    "connection closed",
+)
+_SELECTOR_MARKERS = (
+    "waiting for locator",
+    "waiting for selector",
+    "strict mode violation",
+    "element is not attached",
+    "element is not visible",
+    "no element",
+)
+
+
+class SuperCarrosError(Exception):
+    """Error de un paso contra SuperCarros, con su tipo ya clasificado."""
+
+    def __init__(self, kind: str, message: str = ""):
+        super().__init__(message or kind)
+        self.kind = kind
+
+
+class CircuitOpenError(SuperCarrosError):
+    def __init__(self, message: str = "SuperCarros degradado, corrida pausada"):
+        super().__init__(UNKNOWN, message)
+
+
+def classify(exc: BaseException) -> str:
+    if isinstance(exc, SuperCarrosError):
+        return exc.kind
+    message = str(exc).lower()
+    if "sesión de supercarros expirada" in message or "/login" in message:
+        return SESSION_EXPIRED
+    if isinstance(exc, (PlaywrightTimeoutError, asyncio.TimeoutError, httpx.TimeoutException)):
+        return TIMEOUT
+    if isinstance(exc, httpx.HTTPStatusError):
+        return THROTTLED if exc.response.status_code in (429, 503) else REJECTED
+    if isinstance(exc, httpx.TransportError):
+        return NETWORK
+    if isinstance(exc, PlaywrightError):
+        if any(m in message for m in _CRASH_MARKERS):
+            return BROWSER_CRASHED
+        if any(m in message for m in _SELECTOR_MARKERS):
+            return SELECTOR_MISSING
+    return UNKNOWN
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full jitter: aleatorio entre 0 y base * 2^intento (con tope)."""
+    cap = min(
+        settings.SUPERCARROS_RETRY_MAX_DELAY_SECONDS,
+        settings.SUPERCARROS_RETRY_BASE_DELAY_SECONDS * (2 ** attempt),
+    )
+    return random.uniform(0, cap)
+
+
+async def retry_async(
+    step: Callable[[], Awaitable[T]],
+    attempts: Optional[int] = None,
+    retry_on: Iterable[str] = RETRYABLE,
+    on_retry: Optional[Callable[[int, str, BaseException], Awaitable[None]]] = None,
+    breaker: Optional["CircuitBreaker"] = None,
+) -> T:
+    """
+    Ejecuta `step` reintentando las fallas de tipo `retry_on` con backoff
+    exponencial con jitter. Cada falla y éxito se reporta al circuit breaker
+    de la cuenta (`breaker`, por defecto el de SUPERCARROS_USER).
+    Lanza SuperCarrosError con el tipo de la última falla.
+    """
+    attempts = attempts or settings.SUPERCARROS_RETRY_ATTEMPTS
+    retry_on = tuple(retry_on)
+    breaker = breaker or breaker_for()
+    for attempt in range(attempts):
+        await breaker.wait_until_closed()
+        try:
+            result = await step()
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            kind = classify(e)
+            breaker.record_failure(kind)
+            if kind not in retry_on or attempt == attempts - 1:
+                if isinstance(e, SuperCarrosError):
+                    raise
+                raise SuperCarrosError(kind, str(e)) from e
+            STEP_RETRIES.labels(kind).inc()
+            if on_retry:
+                await on_retry(attempt + 1, kind, e)
+            await asyncio.sleep(backoff_delay(attempt))
+        else:
+            breaker.record_success()
+            return result
+    raise SuperCarrosError(UNKNOWN, "Sin intentos")  # attempts <= 0
+
+
+class CircuitBreaker:
+    """
+    Corta las corridas cuando SuperCarros está degradado.
+    Tras `failure_threshold` fallas seguidas de tipo DEGRADED se abre por
+    `cooldown` segundos: los pasos esperan (pausa) en vez de seguir fallando.
+    Pasado el cooldown queda medio abierto; el siguiente éxito lo cierra y
+    una nueva falla lo vuelve a abrir. Si pasan más de `max_wait` segundos
+    desde que se abrió por primera vez sin un éxito en el medio, la espera
+    lanza CircuitOpenError y la corrida se aborta.
+    Vive en el loop del motor.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown: float, max_wait: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_wait = max_wait
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        # primera apertura desde el último éxito (las reaperturas no la mueven)
+        self.first_opened_at: Optional[float] = None
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def record_success(self):
+        if self.opened_at is not None:
+            print("Circuit breaker de SuperCarros cerrado.")
+        self.failures = 0
+        self.opened_at = None
+        self.first_opened_at = None
+
+    def record_failure(self, kind: str):
+        if kind not in DEGRADED:
+            return
+        self.failures += 1
+        if self.state == "half_open" or (
+            self.opened_at is None and self.failures >= self.failure_threshold
+        ):
+            self.opened_at = time.monotonic()
+            if self.first_opened_at is None:
+                self.first_opened_at = self.opened_at
+            self.times_opened += 1
+            print(
+                f"Circuit breaker de SuperCarros abierto por {self.cooldown:.0f}s "
+                f"({self.failures} fallas seguidas)."
+            )
+
+    async def wait_until_closed(self):
+        while self.state == "open":
+            now = time.monotonic()
+            waited = now - self.first_opened_at
+            if waited >= self.max_wait:
+                raise CircuitOpenError()
+            remaining = self.cooldown - (now - self.opened_at)
+            await asyncio.sleep(max(0.1, min(remaining, self.max_wait - waited)))
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker_for(key: Optional[str] = None) -> CircuitBreaker:
+    """
+    Circuit breaker de la cuenta `key` (por defecto SUPERCARROS_USER), uno por
+    proceso: las fallas de una cuenta no pausan a las demás.
+    """
+    key = key or settings.SUPERCARROS_USER
+    if key not in _breakers:
+        _breakers[key] = CircuitBreaker(
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            cooldown=settings.CIRCUIT_COOLDOWN_SECONDS,
+            max_wait=settings.CIRCUIT_MAX_WAIT_SECONDS,
+        )
+    return _breakers[key]
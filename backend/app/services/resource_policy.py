@@ -0,0 +1,189 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+from app.services.metrics import BLOCKED_REQUESTS
+
+# Flags de Chromium que apagan servicios que no usamos (GPU, extensiones,
+# sincronización, actualizaciones, audio...). BROWSER_EXTRA_ARGS se suma al final.
+LEAN_LAUNCH_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-domain-reliability",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+]
+
+# Tipos que el sitio de SuperCarros necesita: de ellos dependen el filtro de
+# marca y el popup de republicar. Nunca se bloquean en sus dominios.
+SITE_RESOURCE_TYPES = {"document", "script", "stylesheet", "xhr", "fetch"}
+
+# Tamaño aproximado de lo que no se descarga, por tipo de recurso.
+# Solo sirve para estimar el ahorro: al abortar no se conoce el tamaño real.
+_TYPICAL_BYTES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "script": 80_000,
+    "stylesheet": 30_000,
+}
+_DEFAULT_TYPICAL_BYTES = 10_000
+
+
+def launch_args() -> List[str]:
+    args = list(LEAN_LAUNCH_ARGS) if settings.BROWSER_LEAN_LAUNCH else []
+    return args + list(settings.BROWSER_EXTRA_ARGS)
+
+
+def _host(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+def _matches(host: str, domains: Iterable[str]) -> Optional[str]:
+    """Dominio de la lista que cubre `host` (el mismo o un subdominio)."""
+    for domain in domains:
+        if host == domain or host.endswith("." + domain):
+            return domain
+    return None
+
+
+class ResourcePolicy:
+    """
+    Qué pedidos de red deja pasar un contexto de Playwright.
+    Se bloquean los tipos de recurso de `blocked_types` (imágenes, fuentes,
+    video...) y todo lo de `blocked_domains` (redes de anuncios, analítica).
+    Los dominios de `allowed_domains` nunca se bloquean. En los dominios del
+    sitio (`site_domains`, más el de la cuenta al aplicar la política) los
+    tipos de SITE_RESOURCE_TYPES pasan siempre, aunque estén en blocked_types.
+    """
+
+    def __init__(
+        self,
+        blocked_types: Iterable[str],
+        blocked_domains: Iterable[str],
+        allowed_domains: Iterable[str] = (),
+        site_domains: Iterable[str] = (),
+    ):
+        self.blocked_types = {t.lower() for t in blocked_types}
+        self.blocked_domains = [d.lower().lstrip(".") for d in blocked_domains]
+        self.allowed_domains = [d.lower().lstrip(".") for d in allowed_domains]
+        self.site_domains = [d.lower().lstrip(".") for d in site_domains if d]
+
+    def block_reason(
+        self, resource_type: str, url: str, site_domains: Iterable[str] = ()
+    ) -> Optional[str]:
+        """None si el pedido pasa; si no, "type:<tipo>" o "domain:<dominio>"."""
+        if not url.startswith(("http://", "https://")):
+            return None
+        host = _host(url)
+        if _matches(host, self.allowed_domains):
+            return None
+        if resource_type in SITE_RESOURCE_TYPES and _matches(
+            host, [*self.site_domains, *site_domains]
+        ):
+            return None
+        domain = _matches(host, self.blocked_domains)
+        if domain:
+            return f"domain:{domain}"
+        if resource_type in self.blocked_types:
+            return f"type:{resource_type}"
+        return None
+
+    async def apply(
+        self,
+        context,
+        stats: Optional["ResourceStats"] = None,
+        site_url: Optional[str] = None,
+    ):
+        """
+        Instala la política en el contexto (antes de abrir páginas).
+        `site_url` es la base de la cuenta, si usa otro dominio.
+        """
+        site_domains = [_host(site_url)] if site_url else []
+
+        async def _handle(route):
+            request = route.request
+            reason = self.block_reason(request.resource_type, request.url, site_domains)
+            if reason is None:
+                await route.continue_()
+                return
+            BLOCKED_REQUESTS.labels(request.resource_type).inc()
+            if stats is not None:
+                stats.blocked(request.resource_type, reason)
+            await route.abort("blockedbyclient")
+
+        await context.route("**/*", _handle)
+        if stats is not None:
+            context.on("response", stats.response)
+
+
+class ResourceStats:
+    """
+    Contadores de red de una corrida: pedidos bloqueados (por tipo y por
+    motivo) y pedidos/bytes que sí se descargaron (según Content-Length).
+    Los bytes bloqueados son una estimación. Con `parent` cada cambio se
+    suma también a los totales del proceso.
+    """
+
+    def __init__(self, parent: Optional["ResourceStats"] = None):
+        self.parent = parent
+        self.blocked_requests = 0
+        self.blocked_bytes_estimated = 0
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+        self.blocked_by_type: Counter = Counter()
+        self.blocked_by_reason: Counter = Counter()
+
+    def blocked(self, resource_type: str, reason: str):
+        self.blocked_requests += 1
+        self.blocked_bytes_estimated += _TYPICAL_BYTES.get(resource_type, _DEFAULT_TYPICAL_BYTES)
+        self.blocked_by_type[resource_type] += 1
+        self.blocked_by_reason[reason] += 1
+        if self.parent is not None:
+            self.parent.blocked(resource_type, reason)
+
+    def allowed(self, size: int):
+        self.allowed_requests += 1
+        self.allowed_bytes += size
+        if self.parent is not None:
+            self.parent.allowed(size)
+
+    def response(self, response):
+        try:
+            size = int(response.headers.get("content-length") or 0)
+        except ValueError:
+            size = 0
+        self.allowed(size)
+
+    def summary(self) -> Dict:
+        return {
+            "blocked_requests": self.blocked_requests,
+            "blocked_kb_estimated": round(self.blocked_bytes_estimated / 1024),
+            "allowed_requests": self.allowed_requests,
+            "allowed_kb": round(self.allowed_bytes / 1024),
+            "blocked_by_type": dict(self.blocked_by_type),
+            "blocked_by_reason": dict(self.blocked_by_reason.most_common(10)),
+        }
+
+
+# Totales del proceso desde que arrancó
+resource_totals = ResourceStats()
+
+
+def default_policy() -> Optional[ResourcePolicy]:
+    if not settings.RESOURCE_BLOCKING_ENABLED:
+        return None
+    return ResourcePolicy(
+        blocked_types=settings.RESOURCE_BLOCKED_TYPES,
+        blocked_domains=settings.RESOURCE_BLOCKED_DOMAINS,
+        allowed_domains=settings.RESOURCE_ALLOWED_DOMAINS,
+        site_domains=[_host(settings.SUPERCARROS_BASE_URL)],
+    )
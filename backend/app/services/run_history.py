@@ -0,0 +1,177 @@
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session
+
+from app.models.brand import Brand
+from app.models.run import RepublicationRun
+from app.models.schedule import Schedule
+
+STATUS_LABELS = {
+    "completed": "Ejecutado",
+    "running": "En proceso",
+    "failed": "Fallido",
+}
+
+EXPORT_FIELDS = [
+    "id",
+    "run_at",
+    "brand_id",
+    "brand_name",
+    "schedule_id",
+    "schedule_name",
+    "user_id",
+    "vehicles_count",
+    "status",
+    "is_manual",
+    "job_id",
+    "ads_found",
+    "ads_bumped",
+    "finished_at",
+    "error",
+]
+EXPORT_BATCH_SIZE = 1000
+
+
+def status_label(status: Optional[str]) -> str:
+    return STATUS_LABELS.get(status or "completed", STATUS_LABELS["completed"])
+
+
+def encode_cursor(run_at: datetime, run_id: int) -> str:
+    raw = f"{run_at.isoformat()}|{run_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Lanza ValueError si el cursor no es válido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        run_at, run_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return datetime.fromisoformat(run_at), int(run_id)
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def runs_query(
+    db: Session,
+    schedule_id: Optional[int] = None,
+    brand_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    is_manual: Optional[bool] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Query:
+    """
+    Corridas con nombre de marca y programación, de la más nueva a la más
+    vieja por (run_at, id). Cada filtro tiene su índice (filtro, run_at, id)
+    en RepublicationRun.
+    """
+    q = (
+        db.query(RepublicationRun, Brand.name, Schedule.name)
+        .join(Brand, Brand.id == RepublicationRun.brand_id)
+        .outerjoin(Schedule, Schedule.id == RepublicationRun.schedule_id)
+    )
+    if schedule_id is not None:
+        q = q.filter(RepublicationRun.schedule_id == schedule_id)
+    if brand_id is not None:
+        q = q.filter(RepublicationRun.brand_id == brand_id)
+    if user_id is not None:
+        q = q.filter(RepublicationRun.user_id == user_id)
+    if status is not None:
+        q = q.filter(RepublicationRun.status == status)
+    if is_manual is not None:
+        q = q.filter(RepublicationRun.is_manual == is_manual)
+    if start is not None:
+        q = q.filter(RepublicationRun.run_at >= start)
+    if end is not None:
+        q = q.filter(RepublicationRun.run_at < end)
+    return q.order_by(RepublicationRun.run_at.desc(), RepublicationRun.id.desc())
+
+
+def after_cursor(q: Query, run_at: datetime, run_id: int) -> Query:
+    """Keyset: filas estrictamente anteriores a (run_at, id)."""
+    return q.filter(
+        or_(
+            RepublicationRun.run_at < run_at,
+            and_(RepublicationRun.run_at == run_at, RepublicationRun.id < run_id),
+        )
+    )
+
+
+def _row_to_dict(row) -> Dict:
+    run, brand_name, schedule_name = row
+    return {
+        "id": run.id,
+        "run_at": run.run_at,
+        "brand_id": run.brand_id,
+        "brand_name": brand_name,
+        "schedule_id": run.schedule_id,
+        "schedule_name": schedule_name,
+        "user_id": run.user_id,
+        "vehicles_count": run.vehicles_count,
+        "status": run.status or "completed",
+        "status_label": status_label(run.status),
+        "is_manual": bool(run.is_manual),
+        "job_id": run.job_id,
+        "ads_found": run.ads_found,
+        "ads_bumped": run.ads_bumped,
+        "finished_at": run.finished_at,
+        "error": run.error,
+    }
+
+
+def page_runs(q: Query, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """Una página de corridas y el cursor de la siguiente (None si no hay más)."""
+    if cursor:
+        q = after_cursor(q, *decode_cursor(cursor))
+    rows = q.limit(limit + 1).all()
+    items = [_row_to_dict(r) for r in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["run_at"], last["id"])
+    return items, next_cursor
+
+
+def iter_runs(q: Query) -> Iterator[Dict]:
+    """Recorre todo el resultado en lotes por keyset, sin OFFSET."""
+    batch = q.limit(EXPORT_BATCH_SIZE).all()
+    while batch:
+        for row in batch:
+            yield _row_to_dict(row)
+        if len(batch) < EXPORT_BATCH_SIZE:
+            return
+        last = batch[-1][0]
+        batch = after_cursor(q, last.run_at, last.id).limit(EXPORT_BATCH_SIZE).all()
+
+
+def export_csv(q: Query) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for i, item in enumerate(iter_runs(q), start=1):
+        writer.writerow(
+            {
+                **item,
+                "run_at": item["run_at"].isoformat(),
+                "finished_at": item["finished_at"].isoformat() if item["finished_at"] else "",
+            }
+        )
+        if i % 200 == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_ndjson(q: Query) -> Iterator[str]:
+    for item in iter_runs(q):
+        yield json.dumps(
+            {k: item[k] for k in EXPORT_FIELDS}, default=datetime.isoformat
+        ) + "\n"
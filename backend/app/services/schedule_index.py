@@ -0,0 +1,156 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, time
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.models.schedule import Schedule
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# lunes=0 ... domingo=6
+WEEKDAY_MAP = {
+    "mon": 0,
+    "monday": 0,
+    "tue": 1,
+    "tuesday": 1,
+    "wed": 2,
+    "wednesday": 2,
+    "thu": 3,
+    "thursday": 3,
+    "fri": 4,
+    "friday": 4,
+    "sat": 5,
+    "saturday": 5,
+    "sun": 6,
+    "sunday": 6,
+}
+WEEKDAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+class CompiledSchedule:
+    """
+    Representación compilada de days_of_week/times_of_day: los minutos de la
+    semana (lunes 00:00 = 0) en que dispara, ordenados. Las consultas de
+    próxima ejecución y rangos son bisect sobre esa lista, sin volver a
+    parsear los strings.
+    """
+
+    def __init__(self, days: Tuple[int, ...], times: Tuple[Tuple[int, int], ...]):
+        self.days = days
+        self.times = times
+        self.minutes: List[int] = sorted(
+            {d * MINUTES_PER_DAY + h * 60 + m for d in days for h, m in times}
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.minutes)
+
+    @property
+    def cron_days(self) -> str:
+        """days_of_week normalizado para CronTrigger, ej: "mon,wed,fri"."""
+        return ",".join(WEEKDAY_NAMES[d] for d in self.days)
+
+    def iter_after(self, from_dt: datetime) -> Iterator[datetime]:
+        """Ejecuciones estrictamente posteriores a from_dt, en orden, sin fin."""
+        if not self.minutes:
+            return
+        week_start = datetime.combine(
+            from_dt.date() - timedelta(days=from_dt.weekday()), time()
+        )
+        offset = (from_dt - week_start).total_seconds() / 60
+        i = bisect_right(self.minutes, offset)
+        while True:
+            if i == len(self.minutes):
+                i = 0
+                week_start += timedelta(days=7)
+            yield week_start + timedelta(minutes=self.minutes[i])
+            i += 1
+
+    def next_after(self, from_dt: datetime) -> Optional[datetime]:
+        return next(self.iter_after(from_dt), None)
+
+    def occurrences(self, from_dt: datetime, n: int) -> List[datetime]:
+        return list(islice(self.iter_after(from_dt), n))
+
+    def fires_between(self, start: datetime, end: datetime) -> bool:
+        """True si dispara en [start, end)."""
+        if not self.minutes or end <= start:
+            return False
+        if end - start >= timedelta(days=7):
+            return True
+        week_start = datetime.combine(
+            start.date() - timedelta(days=start.weekday()), time()
+        )
+        lo = (start - week_start).total_seconds() / 60
+        hi = (end - week_start).total_seconds() / 60
+        if hi <= MINUTES_PER_WEEK:
+            return bisect_left(self.minutes, hi) > bisect_left(self.minutes, lo)
+        # el rango cruza el fin de semana
+        return (
+            bisect_left(self.minutes, lo) < len(self.minutes)
+            or bisect_left(self.minutes, hi - MINUTES_PER_WEEK) > 0
+        )
+
+
+def _parse_days(days_of_week: str) -> Tuple[int, ...]:
+    days = {
+        WEEKDAY_MAP[d.strip().lower()]
+        for d in days_of_week.split(",")
+        if d and d.strip().lower() in WEEKDAY_MAP
+    }
+    return tuple(sorted(days))
+
+
+def _parse_times(times_of_day: str) -> Tuple[Tuple[int, int], ...]:
+    times = set()
+    for t in times_of_day.split(","):
+        if not t or not t.strip():
+            continue
+        try:
+            hour, minute = [int(x) for x in t.strip().split(":", 1)]
+        except Exception:
+            continue
+        if 0 <= hour < 24 and 0 <= minute < 60:
+            times.add((hour, minute))
+    return tuple(sorted(times))
+
+
+@lru_cache(maxsize=1024)
+def _compile(days_of_week: str, times_of_day: str) -> CompiledSchedule:
+    return CompiledSchedule(_parse_days(days_of_week), _parse_times(times_of_day))
+
+
+def compile_schedule(schedule: Schedule) -> CompiledSchedule:
+    """
+    Versión compilada de la programación. Se cachea por el contenido de
+    days_of_week/times_of_day, así un cambio de configuración genera una
+    nueva entrada y las programaciones iguales comparten la misma.
+    """
+    return _compile(schedule.days_of_week or "", schedule.times_of_day or "")
+
+
+def _tagged(runs: Iterator[datetime], index: int, schedule: Schedule):
+    for run_at in runs:
+        yield run_at, index, schedule
+
+
+def upcoming_runs(
+    schedules: Iterable[Schedule], limit: int, from_dt: Optional[datetime] = None
+) -> List[Tuple[datetime, Schedule]]:
+    """Próximas `limit` ejecuciones entre todas las programaciones, en orden."""
+    now = from_dt or datetime.utcnow()
+    streams = [
+        _tagged(compile_schedule(schedule).iter_after(now), index, schedule)
+        for index, schedule in enumerate(schedules)
+    ]
+    merged = heapq.merge(*streams, key=lambda item: (item[0], item[1]))
+    return [(run_at, schedule) for run_at, _, schedule in islice(merged, limit)]
+
+
+def schedules_firing_between(
+    schedules: Iterable[Schedule], start: datetime, end: datetime
+) -> List[Schedule]:
+    return [s for s in schedules if compile_schedule(s).fires_between(start, end)]
@@ -1,18 +1,24 @@
-from datetime import datetime, timedelta, time
-from typing import Optional
+from datetime import datetime
+from typing import Dict, Optional
 
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.job import Job
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
-from app.models.schedule import Schedule, ScheduleBrand
-from app.models.brand import Brand
-from app.models.run import RepublicationRun
-from app.services.supercarros import run_republication_job
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.job import RepublicationJob
+from app.models.schedule import Schedule
+from app.services.metrics import SCHEDULER_LAG_SECONDS, SCHEDULER_SKIPPED
+from app.services.schedule_index import compile_schedule
 
 scheduler: Optional[BackgroundScheduler] = None
 JOB_PREFIX = "schedule_"
+SYNC_JOB_ID = "sync_schedules"
 
 
 def compute_next_run_for_schedule(
@@ -22,129 +28,130 @@ def compute_next_run_for_schedule(
     Calcula la próxima ejecución en base a days_of_week y times_of_day.
     Devuelve un datetime o None si no hay configuración válida.
     """
-    if not schedule.days_of_week or not schedule.times_of_day:
-        return None
-
-    now = from_dt or datetime.utcnow()
-    today = now.date()
-    now_weekday = now.weekday()
-
-    # mapear strings a números de día (lunes=0 ... domingo=6)
-    weekday_map = {
-        "mon": 0,
-        "monday": 0,
-        "tue": 1,
-        "tuesday": 1,
-        "wed": 2,
-        "wednesday": 2,
-        "thu": 3,
-        "thursday": 3,
-        "fri": 4,
-        "friday": 4,
-        "sat": 5,
-        "saturday": 5,
-        "sun": 6,
-        "sunday": 6,
-    }
-
-    days = [
-        d.strip().lower()
-        for d in schedule.days_of_week.split(",")
-        if d and d.strip()
-    ]
-    times = [
-        t.strip()
-        for t in schedule.times_of_day.split(",")
-        if t and t.strip()
-    ]
-
-    if not days or not times:
-        return None
-
-    candidates = []
-
-    for d in days:
-        if d not in weekday_map:
-            continue
-        target_w = weekday_map[d]
-        days_ahead = (target_w - now_weekday) % 7
-
-        for time_str in times:
-            try:
-                hour, minute = [int(x) for x in time_str.split(":", 1)]
-            except Exception:
-                continue
-
-            candidate_date = today + timedelta(days=days_ahead)
-            candidate_dt = datetime.combine(
-                candidate_date, time(hour=hour, minute=minute)
-            )
-            # si ya pasó hoy, empuja a la próxima semana
-            if candidate_dt <= now:
-                candidate_dt = candidate_dt + timedelta(days=7)
-            candidates.append(candidate_dt)
-
-    if not candidates:
-        return None
-
-    return min(candidates)
+    return compile_schedule(schedule).next_after(from_dt or datetime.utcnow())
 
 
 def _schedule_job(schedule_id: int):
     """
-    Función que ejecuta realmente la republicación programada para un schedule.
+    Disparo del cron de una programación.
+    No ejecuta el navegador aquí: encola el job para que lo tome cualquier
+    worker de la cola (ver app.services.job_queue), así el líder del
+    scheduler queda liviano y la ejecución escala aparte.
     """
+    # import local: job_queue importa este módulo
+    from app.services.job_queue import enqueue_job
+
     db: Session = SessionLocal()
     try:
         schedule = db.query(Schedule).get(schedule_id)
         if not schedule or not schedule.is_active:
             return
+        if schedule.next_run_at is not None:
+            # next_run_at se recalcula al ejecutar, así que aún es el disparo esperado
+            SCHEDULER_LAG_SECONDS.observe(
+                max(0.0, (datetime.utcnow() - schedule.next_run_at).total_seconds())
+            )
 
-        links = (
-            db.query(ScheduleBrand)
-            .filter(ScheduleBrand.schedule_id == schedule.id)
+        # No acumular corridas solapadas de la misma programación
+        # (las ejecuciones inmediatas pedidas a mano no cuentan)
+        payloads = (
+            db.query(RepublicationJob.payload)
+            .filter(
+                RepublicationJob.schedule_id == schedule.id,
+                RepublicationJob.status.in_(["queued", "running"]),
+            )
             .all()
         )
-        brand_names = []
-        for link in links:
-            brand = db.query(Brand).get(link.brand_id)
-            if brand:
-                brand_names.append(brand.name)
-
-        if not brand_names:
+        pending = sum(1 for (payload,) in payloads if not (payload or {}).get("run_once"))
+        if pending >= schedule_policies(schedule)["max_instances"]:
+            SCHEDULER_SKIPPED.inc()
+            print(f"Programación {schedule.id} ya tiene {pending} job(s) pendientes, se omite.")
             return
 
-        results = run_republication_job(brand_names)
-        now = datetime.utcnow()
-
-        # guardar corridas
-        for brand_name, count in results.items():
-            brand = (
-                db.query(Brand).filter(Brand.name == brand_name).first()
-            )
-            if brand and count >= 0:
-                run = RepublicationRun(
-                    schedule_id=schedule.id,
-                    brand_id=brand.id,
-                    vehicles_count=count,
-                    run_at=now,
-                    status="completed",
-                    is_manual=False,
-                )
-                db.add(run)
-
-        schedule.last_run_at = now
-        schedule.next_run_at = compute_next_run_for_schedule(schedule, now)
-        db.add(schedule)
-        db.commit()
+        enqueue_job(db, kind="schedule", schedule_id=schedule.id)
     finally:
         db.close()
 
 
+def schedule_policies(schedule: Schedule) -> Dict:
+    """Políticas de disparo de la programación, con defaults de settings."""
+    return {
+        "max_instances": schedule.max_instances or settings.SCHEDULER_MAX_INSTANCES,
+        "coalesce": (
+            settings.SCHEDULER_COALESCE
+            if schedule.coalesce is None
+            else schedule.coalesce
+        ),
+        "misfire_grace_time": (
+            schedule.misfire_grace_time
+            if schedule.misfire_grace_time is not None
+            else settings.SCHEDULER_MISFIRE_GRACE_SECONDS
+        ),
+    }
+
+
+def _desired_jobs(schedule: Schedule) -> Dict[str, CronTrigger]:
+    """job_id -> trigger cron por cada hora configurada."""
+    if not schedule.is_active:
+        return {}
+
+    compiled = compile_schedule(schedule)
+    if not compiled.cron_days or not compiled.times:
+        return {}
+    desired = {}
+    for hour, minute in compiled.times:
+        job_id = f"{JOB_PREFIX}{schedule.id}_{hour:02d}{minute:02d}"
+        desired[job_id] = CronTrigger(
+            day_of_week=compiled.cron_days, hour=hour, minute=minute
+        )
+    return desired
+
+
+def _jobs_by_schedule() -> Dict[int, Dict[str, Job]]:
+    grouped: Dict[int, Dict[str, Job]] = {}
+    for job in scheduler.get_jobs(jobstore="default"):
+        if not job.id.startswith(JOB_PREFIX):
+            continue
+        schedule_id = int(job.id[len(JOB_PREFIX):].split("_", 1)[0])
+        grouped.setdefault(schedule_id, {})[job.id] = job
+    return grouped
+
+
+def _apply_schedule(schedule: Schedule, existing: Dict[str, Job]):
+    """
+    Lleva los jobs guardados de una programación al estado deseado sin
+    borrar los que no cambiaron (así conservan su próxima ejecución y los
+    disparos perdidos durante un deploy se recuperan según misfire_grace_time).
+    """
+    desired = _desired_jobs(schedule)
+    policies = schedule_policies(schedule)
+
+    for job_id, job in existing.items():
+        if job_id not in desired:
+            scheduler.remove_job(job_id)
+
+    for job_id, trigger in desired.items():
+        job = existing.get(job_id)
+        if job is None:
+            scheduler.add_job(
+                _schedule_job,
+                trigger=trigger,
+                id=job_id,
+                args=[schedule.id],
+                replace_existing=True,
+                **policies,
+            )
+            continue
+        if str(job.trigger) != str(trigger):
+            scheduler.reschedule_job(job_id, trigger=trigger)
+        if any(getattr(job, k) != v for k, v in policies.items()):
+            scheduler.modify_job(job_id, **policies)
+
+
 def refresh_schedule_job(schedule_id: int, db: Session):
     """
-    Crea o actualiza uno o varios jobs de APScheduler para una programación,
-    basado en days_of_week y times_of_day.
+    Crea, actualiza o elimina los jobs de APScheduler de una programación,
+    basado en days_of_week, times_of_day y sus políticas de disparo.
     """
     global scheduler
     if scheduler is None:
@@ -152,82 +159,96 @@ def refresh_schedule_job(schedule_id: int, db: Session):
 
     schedule = db.query(Schedule).get(schedule_id)
     if not schedule:
+        remove_schedule_job(schedule_id)
         return
 
-    # eliminar jobs existentes de este schedule
-    prefix = f"{JOB_PREFIX}{schedule.id}_"
-    for job in list(scheduler.get_jobs()):
-        if job.id.startswith(prefix):
-            try:
-                scheduler.remove_job(job.id)
-            except Exception:
-                pass
-
-    if not schedule.is_active or not schedule.days_of_week or not schedule.times_of_day:
-        return
-
-    # construir trigger cron por cada hora configurada
-    days_str = schedule.days_of_week  # ej: "mon,wed,fri"
-    time_strings = [
-        t.strip()
-        for t in schedule.times_of_day.split(",")
-        if t and t.strip()
-    ]
-
-    for t_str in time_strings:
-        try:
-            hour, minute = [int(x) for x in t_str.split(":", 1)]
-        except Exception:
-            continue
-
-        trigger = CronTrigger(
-            day_of_week=days_str,
-            hour=hour,
-            minute=minute,
-        )
-        job_id = f"{JOB_PREFIX}{schedule.id}_{hour:02d}{minute:02d}"
-        scheduler.add_job(
-            _schedule_job,
-            trigger=trigger,
-            id=job_id,
-            args=[schedule.id],
-            replace_existing=True,
-        )
+    _apply_schedule(schedule, _jobs_by_schedule().get(schedule.id, {}))
 
 
 def remove_schedule_job(schedule_id: int):
     global scheduler
     if scheduler is None:
         return
-    prefix = f"{JOB_PREFIX}{schedule_id}_"
-    for job in list(scheduler.get_jobs()):
-        if job.id.startswith(prefix):
-            try:
-                scheduler.remove_job(job.id)
-            except Exception:
-                pass
+    for job_id in _jobs_by_schedule().get(schedule_id, {}):
+        try:
+            scheduler.remove_job(job_id)
+        except Exception:
+            pass
 
 
-def load_all_schedules():
+def sync_schedules():
+    """
+    Sincroniza el job store con la BD de programaciones de forma incremental.
+    Corre al iniciar y periódicamente en el líder, porque las rutas pueden
+    ejecutarse en otro worker que no tiene el scheduler.
+    """
+    if scheduler is None:
+        return
     db: Session = SessionLocal()
     try:
-        schedules = db.query(Schedule).filter(Schedule.is_active == True).all()
-        for s in schedules:
-            refresh_schedule_job(s.id, db)
+        existing = _jobs_by_schedule()
+        seen = set()
+        for s in db.query(Schedule).all():
+            seen.add(s.id)
+            try:
+                _apply_schedule(s, existing.get(s.id, {}))
+            except Exception as e:
+                # una programación mal cargada no frena a las demás
+                print(f"Programación {s.id} no se pudo registrar: {e}")
+        for schedule_id, jobs in existing.items():
+            if schedule_id not in seen:
+                for job_id in jobs:
+                    scheduler.remove_job(job_id)
     finally:
         db.close()
 
 
+def load_all_schedules():
+    sync_schedules()
+
+
 def start_scheduler():
+    """
+    Solo debe correr en el proceso líder (ver app.services.leader).
+    Los jobs viven en la BD (apscheduler_jobs), así sobreviven reinicios y
+    cambios de líder; el executor está acotado al tamaño del pool de
+    navegadores.
+    """
     global scheduler
     if scheduler is None:
-        scheduler = BackgroundScheduler()
+        scheduler = BackgroundScheduler(
+            jobstores={
+                "default": SQLAlchemyJobStore(engine=engine),
+                "memory": MemoryJobStore(),
+            },
+            executors={
+                "default": ThreadPoolExecutor(
+                    settings.SCHEDULER_EXECUTOR_WORKERS or settings.BROWSER_POOL_SIZE
+                ),
+            },
+            job_defaults={
+                "coalesce": settings.SCHEDULER_COALESCE,
+                "max_instances": settings.SCHEDULER_MAX_INSTANCES,
+                "misfire_grace_time": settings.SCHEDULER_MISFIRE_GRACE_SECONDS,
+            },
+        )
         scheduler.start()
         load_all_schedules()
+        scheduler.add_job(
+            sync_schedules,
+            trigger="interval",
+            seconds=settings.SCHEDULER_SYNC_SECONDS,
+            id=SYNC_JOB_ID,
+            jobstore="memory",
+            replace_existing=True,
+        )
 
 
 def shutdown_scheduler():
     global scheduler
     if scheduler:
-        scheduler.shutdown()
-        scheduler = None
+        try:
+            if scheduler.running:
+                scheduler.shutdown()
+        finally:
+            scheduler = None
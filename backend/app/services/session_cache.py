@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+class SessionCache:
+    """
+    Guarda el storage_state de Playwright (cookies + localStorage) tras un
+    login exitoso en SuperCarros, para que las siguientes corridas creen el
+    contexto ya autenticado y no pasen por /Login.
+
+    Se persiste en un archivo JSON para sobrevivir reinicios y compartirse
+    entre los workers de gunicorn.
+    """
+
+    def __init__(self, path: str, max_age_minutes: int):
+        self.path = path
+        self.max_age = timedelta(minutes=max_age_minutes)
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._mtime: Optional[float] = None
+
+    def _read_file(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            self._data, self._mtime = None, None
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+            self._mtime = mtime
+        except (OSError, ValueError):
+            self._data, self._mtime = None, None
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve {"storage_state", "home_url", "saved_at"} o None si no hay
+        sesión guardada o ya es demasiado vieja.
+        """
+        with self._lock:
+            self._read_file()
+            if not self._data:
+                return None
+            try:
+                saved_at = datetime.fromisoformat(self._data["saved_at"])
+            except (KeyError, ValueError):
+                return None
+            if datetime.utcnow() - saved_at > self.max_age:
+                return None
+            return self._data
+
+    def save(self, storage_state: Dict[str, Any], home_url: str):
+        data = {
+            "storage_state": storage_state,
+            "home_url": home_url,
+            "saved_at": datetime.utcnow().isoformat(),
+        }
+        with self._lock:
+            # temporal único por escritor: varios procesos pueden loguearse a la vez
+            directory, name = os.path.split(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+            self._data = data
+            self._mtime = os.path.getmtime(self.path)
+
+    def invalidate(self):
+        with self._lock:
+            self._data, self._mtime = None, None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+session_cache = SessionCache(
+    path=settings.SUPERCARROS_SESSION_FILE,
+    max_age_minutes=settings.SUPERCARROS_SESSION_MAX_AGE_MINUTES,
+)
+
+_account_caches: Dict[int, SessionCache] = {}
+_account_caches_lock = threading.Lock()
+
+
+def session_cache_for(account_id: Optional[int]) -> SessionCache:
+    """Sesión guardada de la cuenta (None = la cuenta de settings)."""
+    if account_id is None:
+        return session_cache
+    with _account_caches_lock:
+        if account_id not in _account_caches:
+            root, ext = os.path.splitext(settings.SUPERCARROS_SESSION_FILE)
+            _account_caches[account_id] = SessionCache(
+                path=f"{root}.account{account_id}{ext or '.json'}",
+                max_age_minutes=settings.SUPERCARROS_SESSION_MAX_AGE_MINUTES,
+            )
+        return _account_caches[account_id]
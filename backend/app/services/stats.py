@@ -0,0 +1,169 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.brand import Brand
+from app.models.run import RepublicationRun
+from app.models.stats import BrandDailyStat
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def _as_date(value) -> date:
+    # func.date() devuelve date en MySQL y str en SQLite
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _upsert(db: Session, totals: Dict[Tuple[int, date], List[int]]):
+    """Suma (vehicles, runs) a cada fila (brand_id, day), creándola si falta."""
+    if not totals:
+        return
+    rows = [
+        {"brand_id": brand_id, "day": day, "vehicles_count": v, "runs_count": r}
+        for (brand_id, day), (v, r) in totals.items()
+    ]
+    table = BrandDailyStat.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+
+        stmt = insert(table)
+        stmt = stmt.on_duplicate_key_update(
+            vehicles_count=table.c.vehicles_count + stmt.inserted.vehicles_count,
+            runs_count=table.c.runs_count + stmt.inserted.runs_count,
+        )
+        db.execute(stmt, rows)
+        return
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["brand_id", "day"],
+            set_={
+                "vehicles_count": table.c.vehicles_count + stmt.excluded.vehicles_count,
+                "runs_count": table.c.runs_count + stmt.excluded.runs_count,
+            },
+        )
+        db.execute(stmt, rows)
+        return
+
+    # otros motores: UPDATE y, si no existía, INSERT
+    for row in rows:
+        updated = (
+            db.query(BrandDailyStat)
+            .filter(
+                BrandDailyStat.brand_id == row["brand_id"],
+                BrandDailyStat.day == row["day"],
+            )
+            .update(
+                {
+                    BrandDailyStat.vehicles_count: BrandDailyStat.vehicles_count
+                    + row["vehicles_count"],
+                    BrandDailyStat.runs_count: BrandDailyStat.runs_count + row["runs_count"],
+                },
+                synchronize_session=False,
+            )
+        )
+        if not updated:
+            db.add(BrandDailyStat(**row))
+
+
+def record_runs(db: Session, runs: Iterable[Dict]):
+    """
+    Acumula en brand_daily_stats las corridas recién guardadas
+    (dicts con brand_id, run_at y vehicles_count). No hace commit: va en la
+    misma transacción que el INSERT de las corridas.
+    """
+    totals: Dict[Tuple[int, date], List[int]] = defaultdict(lambda: [0, 0])
+    for run in runs:
+        entry = totals[(run["brand_id"], _as_date(run["run_at"]))]
+        entry[0] += int(run["vehicles_count"] or 0)
+        entry[1] += 1
+    _upsert(db, totals)
+
+
+def rebuild_daily_stats(
+    db: Session, start: Optional[date] = None, end: Optional[date] = None
+) -> int:
+    """
+    Recalcula el acumulado desde republication_runs para [start, end]
+    (todo el historial si no se indica). Solo cuenta las corridas
+    "completed", igual que record_runs. Devuelve las filas escritas.
+    """
+    stats_q = db.query(BrandDailyStat)
+    runs_q = db.query(
+        RepublicationRun.brand_id,
+        func.date(RepublicationRun.run_at),
+        func.sum(RepublicationRun.vehicles_count),
+        func.count(RepublicationRun.id),
+    ).filter(RepublicationRun.status == "completed")
+    if start:
+        stats_q = stats_q.filter(BrandDailyStat.day >= start)
+        runs_q = runs_q.filter(RepublicationRun.run_at >= datetime.combine(start, datetime.min.time()))
+    if end:
+        stats_q = stats_q.filter(BrandDailyStat.day <= end)
+        runs_q = runs_q.filter(
+            RepublicationRun.run_at < datetime.combine(end + timedelta(days=1), datetime.min.time())
+        )
+
+    stats_q.delete(synchronize_session=False)
+    rows = [
+        {
+            "brand_id": brand_id,
+            "day": _as_date(day),
+            "vehicles_count": int(vehicles or 0),
+            "runs_count": int(runs or 0),
+        }
+        for brand_id, day, vehicles, runs in runs_q.group_by(
+            RepublicationRun.brand_id, func.date(RepublicationRun.run_at)
+        )
+    ]
+    db.bulk_insert_mappings(BrandDailyStat, rows)
+    db.commit()
+    return len(rows)
+
+
+def _bucket(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def brand_stats(
+    db: Session, start: date, end: date, granularity: str = "day"
+) -> List[Dict]:
+    """
+    Vehículos republicados por marca y periodo entre start y end (inclusive),
+    leyendo solo brand_daily_stats.
+    """
+    q = (
+        db.query(Brand.name, BrandDailyStat.day, BrandDailyStat.vehicles_count)
+        .join(Brand, Brand.id == BrandDailyStat.brand_id)
+        .filter(BrandDailyStat.day >= start, BrandDailyStat.day <= end)
+    )
+    totals: Dict[Tuple[date, str], int] = defaultdict(int)
+    for brand_name, day, vehicles in q:
+        totals[(_bucket(_as_date(day), granularity), brand_name)] += vehicles or 0
+    return [
+        {
+            "brand_name": brand_name,
+            "date": datetime.combine(bucket, datetime.min.time()),
+            "vehicles_count": vehicles,
+        }
+        for (bucket, brand_name), vehicles in sorted(totals.items())
+    ]
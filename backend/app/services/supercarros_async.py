@@ -0,0 +1,553 @@
+import asyncio
+import time
+from typing import Any, List, Dict, Optional, Tuple
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.core.config import settings
+from app.services.accounts import SuperCarrosAccount, default_account
+from app.services.browser_pool import get_browser_pool
+from app.services.http_bump import HttpBumper
+from app.services.inventory import ad_item_selector, extract_ads, snapshot_inventory
+from app.services.ledger import AdLedger
+from app.services.metrics import (
+    AD_BUMP_SECONDS,
+    ADS_BUMPED,
+    ADS_FOUND,
+    ADS_SKIPPED,
+    BRANDS_FINISHED,
+    LOGIN_SECONDS,
+    SESSION_CHECKS,
+)
+from app.services.progress import RunProgress
+from app.services.rate_limit import AdaptiveRateLimiter, rate_limiter_for
+from app.services.resource_policy import ResourceStats, resource_totals
+from app.services.resilience import (
+    FATAL_FOR_PAGE,
+    REJECTED,
+    SELECTOR_MISSING,
+    SESSION_EXPIRED,
+    CircuitOpenError,
+    CircuitBreaker,
+    SuperCarrosError,
+    backoff_delay,
+    breaker_for,
+    classify,
+    retry_async,
+)
+from app.services.session_cache import session_cache_for
+from app.services.waits import WaitStrategy
+
+BUMP_MODES = ("browser", "http")
+
+# Evita que varios contextos en paralelo hagan login a la vez en la misma cuenta
+_login_locks: Dict[Optional[int], asyncio.Lock] = {}
+
+
+def _login_lock(account: SuperCarrosAccount) -> asyncio.Lock:
+    if account.id not in _login_locks:
+        _login_locks[account.id] = asyncio.Lock()
+    return _login_locks[account.id]
+
+
+async def is_login_page(page) -> bool:
+    """True si SuperCarros nos mandó (o dejó) en la pantalla de login."""
+    return "/login" in page.url.lower() or await page.locator("#username").count() > 0
+
+
+async def _page_error(page, message: str) -> SuperCarrosError:
+    """SESSION_EXPIRED si estamos en /Login; si no, SELECTOR_MISSING."""
+    if await is_login_page(page):
+        return SuperCarrosError(SESSION_EXPIRED, "Sesión de SuperCarros expirada")
+    return SuperCarrosError(SELECTOR_MISSING, message)
+
+
+async def login_supercarros(page, account: Optional[SuperCarrosAccount] = None):
+    """Login en SuperCarros usando Playwright (por defecto la cuenta de settings)."""
+    account = account or default_account()
+    started = time.perf_counter()
+    await page.goto(account.login_url)
+    await page.wait_for_load_state("domcontentloaded")
+
+    # Cerrar popup si aparece
+    try:
+        await page.get_by_text("Click Aquí para Cerrar", exact=False).click()
+    except:
+        pass
+
+    # Login
+    await page.locator("#username").fill(account.username)
+    await page.locator("#password").fill(account.password)
+    await page.get_by_role("button", name="Entrar").click()
+    await page.wait_for_load_state("networkidle")
+
+    if await is_login_page(page):
+        LOGIN_SECONDS.labels("failed").observe(time.perf_counter() - started)
+        print(f"Login en SuperCarros ({account.name}) no fue exitoso, no se guarda la sesión.")
+        return
+    LOGIN_SECONDS.labels("ok").observe(time.perf_counter() - started)
+
+    # Guardar cookies/localStorage para las próximas corridas
+    session_cache_for(account.id).save(await page.context.storage_state(), page.url)
+
+
+async def _open_home(page, session: Dict[str, Any]) -> bool:
+    await page.goto(session["home_url"])
+    await page.wait_for_load_state("domcontentloaded")
+    return not await is_login_page(page)
+
+
+async def ensure_session(
+    page, session: Optional[Dict[str, Any]], account: Optional[SuperCarrosAccount] = None
+):
+    """
+    Deja la página autenticada en la pantalla de anuncios de la cuenta.
+    Si el contexto viene con una sesión guardada, solo navega a la página
+    principal; si SuperCarros redirige a /Login la sesión expiró y se hace
+    login completo.
+    """
+    account = account or default_account()
+    cache = session_cache_for(account.id)
+    if session:
+        if await _open_home(page, session):
+            SESSION_CHECKS.labels("reused").inc()
+            return
+        SESSION_CHECKS.labels("expired").inc()
+        print("Sesión de SuperCarros expirada, iniciando sesión de nuevo...")
+
+    async with _login_lock(account):
+        # Otro contexto pudo haber renovado la sesión mientras esperábamos
+        fresh = cache.load()
+        if fresh and (not session or fresh["saved_at"] != session["saved_at"]):
+            await page.context.add_cookies(fresh["storage_state"].get("cookies", []))
+            if await _open_home(page, fresh):
+                return
+
+        if session:
+            cache.invalidate()
+        await login_supercarros(page, account)
+
+
+def _latency_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
+
+async def _rate_limited(limiter: Optional[AdaptiveRateLimiter], step):
+    if limiter is None:
+        return await step()
+    return await limiter.run(step)
+
+
+async def _bump_via_http(
+    brand: str,
+    ads: List[Dict[str, Optional[str]]],
+    bumper: HttpBumper,
+    ledger: Optional[AdLedger] = None,
+    progress: Optional[RunProgress] = None,
+    limiter: Optional[AdaptiveRateLimiter] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> int:
+    targets = []
+    for ad in ads:
+        if ad.get("bump_href"):
+            targets.append(ad)
+        else:
+            print(f"No se encontró el link REPUBLICAR para id {ad['id']}.")
+            if ledger:
+                await ledger.record(ad["id"], brand, "failed", error="Sin link REPUBLICAR")
+
+    async def _bump_once(href):
+        if not await bumper.bump(href):
+            raise SuperCarrosError(REJECTED, "SuperCarros respondió con error")
+        return True
+
+    async def _timed_bump(ad):
+        started = time.perf_counter()
+        try:
+            ok = await retry_async(
+                lambda: _rate_limited(limiter, lambda: _bump_once(ad["bump_href"])),
+                breaker=breaker,
+            )
+        except Exception as e:
+            return e, _latency_ms(started)
+        if progress:
+            await progress.ad_bumped(brand)
+        return ok, _latency_ms(started)
+
+    outcomes = await asyncio.gather(*(_timed_bump(ad) for ad in targets))
+
+    procesados = 0
+    fatal: Optional[Exception] = None
+    for ad, (ok, latency) in zip(targets, outcomes):
+        ad_id = ad["id"]
+        AD_BUMP_SECONDS.labels("http", "bumped" if ok is True else "failed").observe(latency / 1000)
+        if ok is True:
+            procesados += 1
+            ADS_BUMPED.inc()
+            print(f"Anuncio {ad_id} republicado vía HTTP para {brand}.")
+            if ledger:
+                await ledger.record(ad_id, brand, "bumped", latency)
+            continue
+        kind = classify(ok)
+        print(f"Error republicando id {ad_id} vía HTTP ({kind}): {ok}")
+        if ledger:
+            await ledger.record(ad_id, brand, "failed", latency, f"{kind}: {ok}")
+        if kind in FATAL_FOR_PAGE or isinstance(ok, CircuitOpenError):
+            fatal = fatal or ok
+    if fatal is not None:
+        # la corrida renueva sesión/cliente y retoma la marca (la bitácora
+        # evita repetir lo ya republicado)
+        raise fatal
+    return procesados
+
+
+async def republicar_marca(
+    page,
+    brand: str,
+    waits: Optional[WaitStrategy] = None,
+    bumper: Optional[HttpBumper] = None,
+    ads: Optional[List[Dict[str, Optional[str]]]] = None,
+    ledger: Optional[AdLedger] = None,
+    progress: Optional[RunProgress] = None,
+    limiter: Optional[AdaptiveRateLimiter] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> int:
+    """
+    República anuncios de una marca dada dentro de SuperCarros.
+    Flujo:
+      1. Selecciona la marca en el combo #Brand.
+      2. Lee TODOS los anuncios visibles para esa marca en una sola
+         evaluación del DOM (ver app.services.inventory).
+      3. Para cada id:
+         - Clic en el REPUBLICAR de ese id.
+         - Clic en Guardar en el popup.
+    Las esperas son por evento (ver WaitStrategy), no sleeps fijos.
+    Con `bumper` el paso 3 se hace por HTTP directo en vez de clics.
+    Si ya se tienen los anuncios (`ads`, ej. de snapshot_inventory) se
+    omiten los pasos 1 y 2.
+    Con `ledger` cada anuncio queda registrado en ad_bumps y se omiten los
+    ya republicados (los del mismo job cuentan como republicados).
+    Con `progress` se reporta el avance (anuncios encontrados y republicados).
+    Con `limiter` cada republicación espera su turno en el límite de la
+    cuenta (ver app.services.rate_limit); `breaker` es el circuit breaker
+    de la cuenta.
+    Devuelve la cantidad de anuncios republicados.
+    """
+    waits = waits or WaitStrategy()
+    print(f"== Procesando marca: {brand} ==")
+
+    if ads is None:
+        # Seleccionar marca y esperar la respuesta del filtro
+        try:
+            await waits.select_brand(page, brand)
+        except PlaywrightTimeoutError:
+            raise await _page_error(page, f"No se pudo filtrar la marca {brand}")
+
+        # Asegurarnos de que haya anuncios de esa marca
+        if not await waits.ads_visible(page, ad_item_selector(brand)):
+            if await is_login_page(page):
+                raise SuperCarrosError(SESSION_EXPIRED, "Sesión de SuperCarros expirada")
+            print(f"No se encontraron anuncios para la marca {brand}.")
+            return 0
+
+        # 1) Tomar TODOS los anuncios de esta marca de una vez
+        ads = await extract_ads(page, brand)
+
+    ad_ids = [ad["id"] for ad in ads]
+    print(f"Encontrados {len(ad_ids)} anuncios para {brand}: {ad_ids}")
+    found = len(ad_ids)
+    ADS_FOUND.inc(found)
+
+    if not ad_ids:
+        if progress:
+            await progress.brand_started(brand, 0)
+        return 0
+
+    procesados = 0
+    if ledger:
+        pending = []
+        for ad in ads:
+            reason = ledger.skip_reason(ad["id"])
+            if reason is None:
+                pending.append(ad)
+                continue
+            if reason == "resumed":
+                procesados += 1
+            ADS_SKIPPED.labels(reason).inc()
+            await ledger.record(ad["id"], brand, "skipped", error=reason)
+        if len(pending) < len(ads):
+            print(f"Omitidos {len(ads) - len(pending)} anuncios ya republicados de {brand}.")
+        ads = pending
+        ad_ids = [ad["id"] for ad in ads]
+
+    if progress:
+        await progress.brand_started(brand, found, procesados)
+
+    if bumper is not None:
+        procesados += await _bump_via_http(
+            brand, ads, bumper, ledger, progress, limiter, breaker
+        )
+        print(f"Finalizado para {brand}. Anuncios procesados: {procesados}")
+        return procesados
+
+    async def _failed(ad_id, started, error):
+        AD_BUMP_SECONDS.labels("browser", "failed").observe(_latency_ms(started) / 1000)
+        if ledger:
+            await ledger.record(ad_id, brand, "failed", _latency_ms(started), error)
+
+    async def _bump_once(ad_id):
+        # Localizar el link REPUBLICAR específico de este anuncio
+        bump_link = page.locator(
+            f"{ad_item_selector(brand)} li.Bump a.cboxElement[href*='/{ad_id}']"
+        )
+        if await bump_link.count() == 0:
+            raise await _page_error(page, f"No se encontró REPUBLICAR para id {ad_id}")
+        await bump_link.first.click(timeout=waits.timeout("bump_popup"))
+
+        # Popup de republicación -> clic en Guardar
+        await waits.wait_bump_popup(page)
+
+        # Esperar el POST de republicación y que cierre el popup
+        if not await waits.save_bump(page):
+            raise SuperCarrosError(REJECTED, "SuperCarros respondió con error")
+
+    async def _before_retry(attempt, kind, error):
+        print(f"Reintento {attempt} para {brand} ({kind}): {error}")
+        if await is_login_page(page):
+            raise SuperCarrosError(SESSION_EXPIRED, "Sesión de SuperCarros expirada")
+        # cerrar el popup de colorbox si quedó abierto
+        try:
+            await page.keyboard.press("Escape")
+        except Exception:
+            pass
+
+    # 2) Republicar UNO POR UNO basado en el id
+    for ad_id in ad_ids:
+        print(f"Repuplicando anuncio {ad_id} de {brand}...")
+        started = time.perf_counter()
+
+        try:
+            await retry_async(
+                lambda: _rate_limited(limiter, lambda: _bump_once(ad_id)),
+                on_retry=_before_retry,
+                breaker=breaker,
+            )
+        except SuperCarrosError as e:
+            print(f"No se pudo republicar id {ad_id} ({e.kind}): {e}")
+            await _failed(ad_id, started, f"{e.kind}: {e}")
+            if e.kind in FATAL_FOR_PAGE or isinstance(e, CircuitOpenError):
+                # la corrida recrea página/contexto y retoma la marca
+                raise
+            continue
+
+        procesados += 1
+        ADS_BUMPED.inc()
+        AD_BUMP_SECONDS.labels("browser", "bumped").observe(_latency_ms(started) / 1000)
+        if ledger:
+            await ledger.record(ad_id, brand, "bumped", _latency_ms(started))
+        if progress:
+            await progress.ad_bumped(brand)
+        print(f"Anuncio {ad_id} republicado ({procesados}) para {brand}.")
+
+    print(f"Finalizado para {brand}. Anuncios procesados: {procesados}")
+    return procesados
+
+
+async def run_republication_job(
+    brands: List[str],
+    concurrency: Optional[int] = None,
+    bump_mode: Optional[str] = None,
+    single_pass: bool = False,
+    job_id: Optional[int] = None,
+    attempt: int = 1,
+    progress: Optional[RunProgress] = None,
+    account: Optional[SuperCarrosAccount] = None,
+) -> Dict[str, int]:
+    """
+    Ejecuta una corrida de republicación para una lista de marcas de una
+    cuenta de SuperCarros (por defecto la de settings).
+    Debe correr en el loop del motor (ver app.services.supercarros para la
+    fachada sync y la versión awaitable desde FastAPI).
+
+    Las marcas se reparten entre hasta `concurrency` contextos aislados del
+    pool (por defecto el máximo de la cuenta), todos con la misma sesión
+    guardada de la cuenta, y se procesan en paralelo en el mismo event loop.
+
+    bump_mode "http" republica con HttpBumper (el navegador solo hace login
+    y descubre anuncios); por defecto SUPERCARROS_BUMP_MODE.
+
+    Con single_pass cada contexto carga el listado sin filtro una sola vez,
+    agrupa los anuncios por data-brand y republica sin volver a filtrar
+    #Brand por cada marca (pensado para corridas de todas las marcas).
+
+    Cada anuncio se registra en la bitácora ad_bumps con job_id/attempt; si
+    el job se reintenta, se retoma omitiendo lo ya republicado.
+    `progress` recibe el avance por marca (ver app.services.progress).
+
+    Cada anuncio se reintenta con backoff ante fallas transitorias; si la
+    página o el navegador se caen, o la sesión expira, el worker abre un
+    contexto nuevo y retoma la marca (hasta SUPERCARROS_BRAND_ATTEMPTS).
+    Con SuperCarros degradado el circuit breaker pausa la corrida y la aborta
+    si no se recupera (ver app.services.resilience).
+    Las republicaciones de todos los workers comparten el límite adaptativo
+    de la cuenta (ver app.services.rate_limit).
+    Los contextos bloquean imágenes, fuentes, anuncios y analítica; al final
+    se imprimen los pedidos bloqueados y descargados de la corrida.
+    Retorna dict {brand_name: vehicles_count}
+    """
+    bump_mode = bump_mode or settings.SUPERCARROS_BUMP_MODE
+    if bump_mode not in BUMP_MODES:
+        raise ValueError(f"bump_mode inválido: {bump_mode}")
+
+    account = account or default_account()
+    cache = session_cache_for(account.id)
+    pool = get_browser_pool()
+    workers = min(
+        concurrency or account.max_concurrency,
+        account.max_concurrency,
+        pool.capacity,
+        len(brands),
+    )
+
+    resources = ResourceStats(parent=resource_totals)
+    session = cache.load()
+    if workers > 1 and session is None:
+        # Un solo login antes de abrir los contextos en paralelo
+        async with pool.context(resource_stats=resources, site_url=account.base_url) as context:
+            await ensure_session(await context.new_page(), None, account)
+        session = cache.load()
+
+    pending: "asyncio.Queue[str]" = asyncio.Queue()
+    for brand in brands:
+        pending.put_nowait(brand)
+    results: Dict[str, int] = {}
+    brand_attempts: Dict[str, int] = {}
+    waits = WaitStrategy()
+    ledger = await AdLedger(job_id, attempt).load()
+    limiter = rate_limiter_for(account.rate_key)
+    breaker = breaker_for(account.rate_key)
+    # Un solo cliente HTTP por corrida, creado con la primera página logueada
+    # (se renueva si la sesión expira)
+    bumpers: List[HttpBumper] = []
+    bumper_lock = asyncio.Lock()
+
+    async def _get_bumper(page, stale: Optional[HttpBumper] = None) -> Optional[HttpBumper]:
+        if bump_mode != "http":
+            return None
+        async with bumper_lock:
+            if not bumpers or bumpers[-1] is stale:
+                bumpers.append(await HttpBumper.from_page(page, account.base_url))
+            return bumpers[-1]
+
+    def _next_brand() -> Optional[str]:
+        try:
+            return pending.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+    async def _worker():
+        brand = _next_brand()
+        bumper = None
+        while brand is not None:
+            current = cache.load()
+            context_options = {"storage_state": current["storage_state"]} if current else {}
+            try:
+                async with pool.context(
+                    resource_stats=resources, site_url=account.base_url, **context_options
+                ) as context:
+                    page = await context.new_page()
+
+                    await ensure_session(page, current, account)
+                    bumper = await _get_bumper(page, stale=bumper)
+                    inventory = await snapshot_inventory(page, waits) if single_pass else None
+
+                    while brand is not None:
+                        ads = inventory.get(brand, []) if inventory is not None else None
+                        count = await republicar_marca(
+                            page, brand, waits, bumper, ads, ledger, progress, limiter, breaker
+                        )
+                        results[brand] = count
+                        BRANDS_FINISHED.labels("completed").inc()
+                        if progress:
+                            await progress.brand_finished(brand, count)
+                        brand = _next_brand()
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                # Página/navegador caído o sesión expirada: contexto nuevo y
+                # se retoma la marca (lo ya republicado queda en la bitácora)
+                kind = classify(e)
+                tries = brand_attempts[brand] = brand_attempts.get(brand, 0) + 1
+                print(f"Falla ({kind}) procesando {brand}, intento {tries}: {e}")
+                if kind == SESSION_EXPIRED:
+                    cache.invalidate()
+                if tries >= settings.SUPERCARROS_BRAND_ATTEMPTS:
+                    print(f"Se abandona la marca {brand} tras {tries} intentos.")
+                    results[brand] = -1
+                    BRANDS_FINISHED.labels("failed").inc()
+                    if progress:
+                        await progress.brand_finished(brand, -1)
+                    brand = _next_brand()
+                await asyncio.sleep(backoff_delay(tries))
+
+    try:
+        await asyncio.gather(*(_worker() for _ in range(max(1, workers))))
+    finally:
+        for bumper in bumpers:
+            await bumper.aclose()
+        await ledger.flush()
+        await limiter.flush()
+    print(f"Tiempos de espera por paso: {waits.summary()}")
+    print(f"Recursos de red: {resources.summary()}")
+    if limiter.rate:
+        print(f"Ritmo de republicación de {account.name}: {limiter.rate * 60:.1f}/min")
+
+    # mismo orden que las marcas recibidas
+    return {brand: results[brand] for brand in brands if brand in results}
+
+
+async def run_accounts_job(
+    groups: List[Tuple[SuperCarrosAccount, List[str]]],
+    bump_mode: Optional[str] = None,
+    single_pass: bool = False,
+    job_id: Optional[int] = None,
+    attempt: int = 1,
+    progress: Optional[RunProgress] = None,
+) -> Dict[str, int]:
+    """
+    Corre las marcas de varias cuentas a la vez: cada cuenta es una
+    run_republication_job con su propia sesión, contextos y límite, y todas
+    comparten el pool de navegadores. Si falla la corrida de una cuenta sus
+    marcas no aparecen en el resultado y las demás siguen; si fallan todas
+    se relanza el primer error.
+    Retorna dict {brand_name: vehicles_count}
+    """
+    if len(groups) == 1:
+        account, brands = groups[0]
+        return await run_republication_job(
+            brands, None, bump_mode, single_pass, job_id, attempt, progress, account
+        )
+
+    outcomes = await asyncio.gather(
+        *(
+            run_republication_job(
+                brands, None, bump_mode, single_pass, job_id, attempt, progress, account
+            )
+            for account, brands in groups
+        ),
+        return_exceptions=True,
+    )
+
+    results: Dict[str, int] = {}
+    errors = []
+    for (account, _), outcome in zip(groups, outcomes):
+        if not isinstance(outcome, BaseException):
+            results.update(outcome)
+            continue
+        # sus marcas quedan fuera del resultado: finish_brand_runs deja
+        # "failed" las que no llegaron a terminar
+        print(f"Falló la corrida de la cuenta {account.name}: {outcome}")
+        errors.append(outcome)
+    if errors and len(errors) == len(groups):
+        raise errors[0]
+    return results
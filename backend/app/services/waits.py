@@ -0,0 +1,171 @@
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.core.config import settings
+from app.services.metrics import WAIT_STEP_SECONDS, WAIT_STEP_TIMEOUTS
+
+# Timeouts por paso (ms); se pueden sobreescribir con SUPERCARROS_WAIT_TIMEOUTS_MS
+DEFAULT_TIMEOUTS_MS: Dict[str, int] = {
+    "brand_filter": 10000,  # respuesta AJAX del filtro de marca
+    "ads_visible": 5000,  # li.AdItem de la marca en pantalla
+    "bump_popup": 10000,  # botón Guardar del popup
+    "bump_save": 10000,  # POST de republicación
+    "popup_close": 5000,  # colorbox se cierra
+}
+
+# colorbox elimina este nodo al cerrar el popup
+COLORBOX_CONTENT = "#cboxLoadedContent"
+
+_AJAX_TYPES = ("xhr", "fetch", "document")
+
+
+def _matches(pattern: str, response) -> bool:
+    if pattern:
+        return re.search(pattern, response.url) is not None
+    return response.request.resource_type in _AJAX_TYPES
+
+
+def _is_filter_response(response) -> bool:
+    return _matches(settings.SUPERCARROS_FILTER_URL_PATTERN, response)
+
+
+def _is_bump_response(response) -> bool:
+    return response.request.method == "POST" and _matches(
+        settings.SUPERCARROS_BUMP_URL_PATTERN, response
+    )
+
+
+class StepStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "timeouts": self.timeouts,
+        }
+
+
+class WaitStrategy:
+    """
+    Esperas por eventos concretos en vez de sleeps fijos o networkidle:
+    la respuesta AJAX del filtro de marca, el POST de republicación y el
+    cierre del popup de colorbox. Registra cuánto tarda cada paso.
+    Se crea una por corrida.
+    """
+
+    def __init__(self, timeouts_ms: Optional[Dict[str, int]] = None):
+        self.timeouts_ms = {
+            **DEFAULT_TIMEOUTS_MS,
+            **settings.SUPERCARROS_WAIT_TIMEOUTS_MS,
+            **(timeouts_ms or {}),
+        }
+        self.stats: Dict[str, StepStats] = {}
+
+    def timeout(self, step: str) -> int:
+        return self.timeouts_ms[step]
+
+    def _stats(self, step: str) -> StepStats:
+        return self.stats.setdefault(step, StepStats())
+
+    def _timed_out(self, step: str):
+        self._stats(step).timeouts += 1
+        WAIT_STEP_TIMEOUTS.labels(step).inc()
+
+    @asynccontextmanager
+    async def timed(self, step: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            WAIT_STEP_SECONDS.labels(step).observe(elapsed / 1000)
+            stats = self._stats(step)
+            stats.count += 1
+            stats.total_ms += elapsed
+            stats.max_ms = max(stats.max_ms, elapsed)
+
+    async def select_brand(self, page, brand: str):
+        """
+        Selecciona la marca y espera la respuesta del filtro. Si no aparece
+        #Brand o la opción de la marca (ej. la sesión expiró y se está en
+        /Login) lanza el TimeoutError de Playwright; si solo no llega la
+        respuesta del filtro se sigue.
+        """
+        selected = False
+        async with self.timed("brand_filter"):
+            try:
+                async with page.expect_response(
+                    _is_filter_response, timeout=self.timeout("brand_filter")
+                ):
+                    await page.locator("#Brand").select_option(
+                        brand, timeout=self.timeout("brand_filter")
+                    )
+                    selected = True
+            except PlaywrightTimeoutError:
+                if not selected:
+                    raise
+                self._timed_out("brand_filter")
+
+    async def ads_visible(self, page, selector: str) -> bool:
+        async with self.timed("ads_visible"):
+            try:
+                await page.wait_for_selector(
+                    selector, timeout=self.timeout("ads_visible")
+                )
+                return True
+            except PlaywrightTimeoutError:
+                self._timed_out("ads_visible")
+                return False
+
+    async def wait_bump_popup(self, page):
+        """Espera el botón Guardar del popup. Lanza TimeoutError si no aparece."""
+        async with self.timed("bump_popup"):
+            try:
+                await page.get_by_text("Guardar").wait_for(
+                    timeout=self.timeout("bump_popup")
+                )
+            except PlaywrightTimeoutError:
+                self._timed_out("bump_popup")
+                raise
+
+    async def save_bump(self, page) -> bool:
+        """
+        Clic en Guardar y espera el POST de republicación y el cierre del popup.
+        Devuelve False si el POST respondió con error; si no llega a tiempo
+        lanza TimeoutError (el reintento lo clasifica como TIMEOUT).
+        """
+        async with self.timed("bump_save"):
+            try:
+                async with page.expect_response(
+                    _is_bump_response, timeout=self.timeout("bump_save")
+                ) as response_info:
+                    await page.get_by_text("Guardar").click()
+                response = await response_info.value
+            except PlaywrightTimeoutError:
+                self._timed_out("bump_save")
+                raise
+
+        async with self.timed("popup_close"):
+            try:
+                await page.wait_for_selector(
+                    COLORBOX_CONTENT,
+                    state="detached",
+                    timeout=self.timeout("popup_close"),
+                )
+            except PlaywrightTimeoutError:
+                self._timed_out("popup_close")
+
+        return response.ok
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {step: s.as_dict() for step, s in self.stats.items()}
@@ -0,0 +1,323 @@
+"""
+Benchmark de la republicación contra el mock local de SuperCarros.
+
+Levanta tools.mock_supercarros con la latencia, cantidad de anuncios y fallas
+del escenario, corre run_republication_job contra él (pool de Chromium real,
+BD SQLite temporal) y reporta anuncios/min, latencia por anuncio p50/p95
+(de la bitácora ad_bumps) y el pico de RSS del proceso más sus Chromium.
+Cada resultado se agrega a benchmarks/results.jsonl con el commit actual
+para comparar entre commits.
+
+Uso:
+    python -m benchmarks.bench_republication                     # escenario baseline
+    python -m benchmarks.bench_republication --scenario flaky --runs 3
+    python -m benchmarks.bench_republication --scenario http --ads-per-brand 50
+    python -m benchmarks.bench_republication --compare           # tabla por commit
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import psutil
+
+from tools.mock_supercarros import MockSuperCarros
+
+RESULTS_FILE = Path(__file__).resolve().parent / "results.jsonl"
+
+SCENARIOS: Dict[str, Dict] = {
+    # sitio sano, latencia de red típica
+    "baseline": {"brands": 3, "ads_per_brand": 20, "latency_ms": 50, "jitter_ms": 20},
+    "http": {"brands": 3, "ads_per_brand": 20, "latency_ms": 50, "jitter_ms": 20, "bump_mode": "http"},
+    # 10% de errores y 5% de 429 en el POST de republicación
+    "flaky": {
+        "brands": 3,
+        "ads_per_brand": 20,
+        "latency_ms": 50,
+        "jitter_ms": 20,
+        "failure_rate": 0.10,
+        "throttle_rate": 0.05,
+    },
+    # sitio lento y con fotos pesadas (mide la política de recursos)
+    "slow": {"brands": 3, "ads_per_brand": 10, "latency_ms": 400, "jitter_ms": 200, "image_kb": 200},
+    # muchas marcas en una sola pasada
+    "single_pass": {"brands": 10, "ads_per_brand": 10, "latency_ms": 50, "single_pass": True},
+}
+DEFAULTS = {
+    "brands": 3,
+    "ads_per_brand": 20,
+    "latency_ms": 0,
+    "jitter_ms": 0,
+    "failure_rate": 0.0,
+    "throttle_rate": 0.0,
+    "image_kb": 0,
+    "bump_mode": "browser",
+    "concurrency": None,
+    "single_pass": False,
+    "rate_limit": False,
+}
+BRAND_NAMES = [
+    "Toyota", "Honda", "Hyundai", "Kia", "Nissan", "Mazda",
+    "Ford", "Chevrolet", "Mitsubishi", "Suzuki", "Jeep", "BMW",
+]
+
+
+def _git_commit() -> str:
+    try:
+        sha = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+        dirty = subprocess.call(
+            ["git", "diff", "--quiet", "HEAD", "--", "app", "tools"], stderr=subprocess.DEVNULL
+        )
+        return f"{sha}-dirty" if dirty else sha
+    except Exception:
+        return "desconocido"
+
+
+class RssSampler(threading.Thread):
+    """Pico de RSS (MB) de este proceso y de todos sus hijos (Chromium)."""
+
+    def __init__(self, interval: float = 0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_self_mb = 0.0
+        self.peak_total_mb = 0.0
+        self._stop_event = threading.Event()
+
+    def sample(self):
+        proc = psutil.Process()
+        own = proc.memory_info().rss
+        total = own
+        for child in proc.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        self.peak_self_mb = max(self.peak_self_mb, own / (1024 * 1024))
+        self.peak_total_mb = max(self.peak_total_mb, total / (1024 * 1024))
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.sample()
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.sample()
+
+
+def _percentile(values: List[float], pct: int) -> Optional[float]:
+    if not values:
+        return None
+    if len(values) == 1:
+        return float(values[0])
+    return round(statistics.quantiles(values, n=100, method="inclusive")[pct - 1], 1)
+
+
+def _configure_env(mock: MockSuperCarros, params: Dict, workdir: str):
+    # settings se construye al importar app.core.config: va antes de importar app
+    os.environ.update(
+        {
+            "SUPERCARROS_BASE_URL": mock.base_url,
+            "SUPERCARROS_USER": mock.username,
+            "SUPERCARROS_PASS": mock.password,
+            "SUPERCARROS_SESSION_FILE": os.path.join(workdir, "session.json"),
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            # cada corrida republica todo de nuevo
+            "LEDGER_SKIP_WINDOW_MINUTES": "0",
+            "RATE_LIMIT_ENABLED": "true" if params["rate_limit"] else "false",
+            # no esperar minutos si el escenario abre el circuit breaker
+            "CIRCUIT_MAX_WAIT_SECONDS": "30",
+        }
+    )
+
+
+def run_benchmark(name: str, params: Dict, runs: int) -> List[Dict]:
+    brands = BRAND_NAMES[: params["brands"]]
+    mock = MockSuperCarros(
+        brands=brands,
+        ads_per_brand=params["ads_per_brand"],
+        latency_ms=params["latency_ms"],
+        jitter_ms=params["jitter_ms"],
+        failure_rate=params["failure_rate"],
+        throttle_rate=params["throttle_rate"],
+        image_kb=params["image_kb"],
+        seed=42,
+    ).start()
+    workdir = tempfile.mkdtemp(prefix="bench_supercarros_")
+    _configure_env(mock, params, workdir)
+
+    from app.db.session import SessionLocal, init_db
+    from app.models.ledger import AdBump
+    from app.services.browser_pool import shutdown_browser_pool, start_browser_pool
+    from app.services.supercarros import run_republication_job
+
+    init_db()
+    sampler = RssSampler()
+    sampler.start()
+    results = []
+    try:
+        started = time.perf_counter()
+        start_browser_pool()
+        pool_start_s = time.perf_counter() - started
+
+        for i in range(runs):
+            bumps_before = sum(mock.bumps.values())
+            started = time.perf_counter()
+            counts = run_republication_job(
+                brands,
+                concurrency=params["concurrency"],
+                bump_mode=params["bump_mode"],
+                single_pass=params["single_pass"],
+                job_id=None,
+            )
+            elapsed = time.perf_counter() - started
+
+            db = SessionLocal()
+            try:
+                latencies = [
+                    ms
+                    for (ms,) in db.query(AdBump.latency_ms).filter(
+                        AdBump.outcome == "bumped", AdBump.latency_ms.isnot(None)
+                    )
+                ]
+                failed = db.query(AdBump).filter(AdBump.outcome == "failed").count()
+                db.query(AdBump).delete()
+                db.commit()
+            finally:
+                db.close()
+
+            bumped = sum(c for c in counts.values() if c > 0)
+            results.append(
+                {
+                    "scenario": name,
+                    "run": i + 1,
+                    "commit": _git_commit(),
+                    "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+                    "params": params,
+                    "ads_total": len(mock.ads),
+                    "ads_bumped": bumped,
+                    "ads_failed": failed,
+                    "server_bumps": sum(mock.bumps.values()) - bumps_before,
+                    "brands_failed": sum(1 for c in counts.values() if c < 0),
+                    "elapsed_s": round(elapsed, 2),
+                    "pool_start_s": round(pool_start_s, 2),
+                    "ads_per_min": round(bumped / elapsed * 60, 1) if elapsed else 0.0,
+                    "p50_ms": _percentile(latencies, 50),
+                    "p95_ms": _percentile(latencies, 95),
+                    "peak_rss_mb": round(sampler.peak_self_mb, 1),
+                    "peak_rss_total_mb": round(sampler.peak_total_mb, 1),
+                    "mock_requests": mock.requests,
+                    "mock_failures": {str(k): v for k, v in mock.failures.items()},
+                    "python": sys.version.split()[0],
+                }
+            )
+            print(
+                f"[{name} #{i + 1}] {bumped}/{len(mock.ads)} anuncios en {elapsed:.1f}s "
+                f"({results[-1]['ads_per_min']}/min) p50={results[-1]['p50_ms']}ms "
+                f"p95={results[-1]['p95_ms']}ms RSS={results[-1]['peak_rss_total_mb']}MB"
+            )
+    finally:
+        sampler.stop()
+        shutdown_browser_pool()
+        mock.stop()
+    return results
+
+
+def save_results(results: List[Dict], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def compare(path: Path, scenario: Optional[str] = None, last: int = 10):
+    """Promedio por (escenario, commit), en el orden en que se midieron."""
+    if not path.exists():
+        print(f"No hay resultados en {path}")
+        return
+    groups: Dict[tuple, List[Dict]] = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        r = json.loads(line)
+        if scenario and r["scenario"] != scenario:
+            continue
+        groups.setdefault((r["scenario"], r["commit"]), []).append(r)
+
+    def _avg(rows, key):
+        values = [r[key] for r in rows if r.get(key) is not None]
+        return round(statistics.mean(values), 1) if values else None
+
+    header = f"{'escenario':<12} {'commit':<16} {'n':>3} {'ads/min':>9} {'Δ%':>7} {'p50 ms':>8} {'p95 ms':>8} {'RSS MB':>8}"
+    print(header)
+    print("-" * len(header))
+    previous: Dict[str, float] = {}
+    by_scenario: Dict[str, List] = {}
+    for (name, commit), rows in groups.items():
+        by_scenario.setdefault(name, []).append((commit, rows))
+    for name, entries in by_scenario.items():
+        for commit, rows in entries[-last:]:
+            rate = _avg(rows, "ads_per_min")
+            delta = ""
+            if rate and previous.get(name):
+                delta = f"{(rate - previous[name]) / previous[name] * 100:+.1f}"
+            previous[name] = rate
+            print(
+                f"{name:<12} {commit:<16} {len(rows):>3} {rate or '-':>9} {delta:>7} "
+                f"{_avg(rows, 'p50_ms') or '-':>8} {_avg(rows, 'p95_ms') or '-':>8} "
+                f"{_avg(rows, 'peak_rss_total_mb') or '-':>8}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de republicación contra el mock")
+    parser.add_argument("--scenario", default="baseline", choices=sorted(SCENARIOS))
+    parser.add_argument("--runs", type=int, default=1, help="corridas con el mismo pool")
+    parser.add_argument("--brands", type=int)
+    parser.add_argument("--ads-per-brand", type=int)
+    parser.add_argument("--latency-ms", type=int)
+    parser.add_argument("--jitter-ms", type=int)
+    parser.add_argument("--failure-rate", type=float)
+    parser.add_argument("--throttle-rate", type=float)
+    parser.add_argument("--image-kb", type=int)
+    parser.add_argument("--bump-mode", choices=["browser", "http"])
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--single-pass", action="store_true", default=None)
+    parser.add_argument("--rate-limit", action="store_true", default=None,
+                        help="activar el límite adaptativo (por defecto apagado)")
+    parser.add_argument("--output", type=Path, default=RESULTS_FILE)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="comparar resultados guardados")
+    parser.add_argument("--last", type=int, default=10, help="commits por escenario en --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.output, args.scenario if "--scenario" in sys.argv else None, args.last)
+        return
+
+    params = {**DEFAULTS, **SCENARIOS[args.scenario]}
+    for key in DEFAULTS:
+        value = getattr(args, key)
+        if value is not None:
+            params[key] = value
+    params["brands"] = min(params["brands"], len(BRAND_NAMES))
+
+    results = run_benchmark(args.scenario, params, max(1, args.runs))
+    if not args.no_save:
+        save_results(results, args.output)
+        print(f"Resultados agregados a {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import os
+import tempfile
+
+# BD sqlite propia de los tests: tiene que quedar definida antes de importar app
+_DB_DIR = tempfile.mkdtemp(prefix="republisher-tests-")
+os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(_DB_DIR, "test.db")
+
+import pytest  # noqa: E402
+
+from app.db.session import Base, SessionLocal, engine, init_db  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    init_db()
+
+
+@pytest.fixture
+def db():
+    """Sesión sobre la BD de los tests; al terminar se vacían todas las tablas."""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
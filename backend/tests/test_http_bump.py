@@ -0,0 +1,81 @@
+import asyncio
+import re
+from typing import Dict, List
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.http_bump import HttpBumper
+from app.services.resilience import SESSION_EXPIRED, CircuitBreaker, SuperCarrosError
+from app.services.supercarros_async import _bump_via_http
+from tools.mock_supercarros import MockSuperCarros
+
+_BUMP_HREF_RE = re.compile(r'data-id="(\d+)".*?href="(/Anuncios/Republicar/\d+)"')
+
+
+@pytest.fixture
+def mock():
+    server = MockSuperCarros(brands=["Toyota", "Honda"], ads_per_brand=3).start()
+    yield server
+    server.stop()
+
+
+def _login(mock: MockSuperCarros) -> Dict:
+    """storage_state con las cookies de una sesión logueada, como el de Playwright."""
+    with httpx.Client(base_url=mock.base_url) as client:
+        client.post("/Login", data={"username": mock.username, "password": mock.password})
+        return {
+            "cookies": [
+                {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+                for c in client.cookies.jar
+            ]
+        }
+
+
+def _ads(mock: MockSuperCarros, storage_state: Dict, brand: str) -> List[Dict]:
+    cookies = {c["name"]: c["value"] for c in storage_state["cookies"]}
+    html = httpx.get(f"{mock.base_url}/Anuncios/Lista", params={"brand": brand}, cookies=cookies).text
+    return [{"id": ad_id, "bump_href": href} for ad_id, href in _BUMP_HREF_RE.findall(html)]
+
+
+def _bump(mock, storage_state, ads, brand="Toyota") -> int:
+    async def run():
+        bumper = HttpBumper(storage_state, mock.base_url, concurrency=2)
+        try:
+            breaker = CircuitBreaker(failure_threshold=100, cooldown=1, max_wait=5)
+            return await _bump_via_http(brand, ads, bumper, breaker=breaker)
+        finally:
+            await bumper.aclose()
+
+    return asyncio.run(run())
+
+
+def test_http_bump_republishes_every_ad(mock):
+    state = _login(mock)
+    ads = _ads(mock, state, "Toyota")
+    assert len(ads) == 3
+
+    assert _bump(mock, state, ads) == 3
+    assert dict(mock.bumps) == {ad["id"]: 1 for ad in ads}
+
+
+def test_http_bump_expired_session_is_fatal(mock):
+    ads = _ads(mock, _login(mock), "Honda")
+
+    with pytest.raises(SuperCarrosError) as info:
+        _bump(mock, {"cookies": []}, ads, brand="Honda")
+    assert info.value.kind == SESSION_EXPIRED
+    assert not mock.bumps
+
+
+def test_http_bump_throttled_is_retried_and_counted_as_failed(mock, monkeypatch):
+    monkeypatch.setattr(settings, "SUPERCARROS_RETRY_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "SUPERCARROS_RETRY_BASE_DELAY_SECONDS", 0)
+    mock.throttle_rate = 1.0
+    state = _login(mock)
+    ads = _ads(mock, state, "Toyota")
+
+    assert _bump(mock, state, ads) == 0
+    assert mock.failures[429] == 2 * len(ads)
+    assert not mock.bumps
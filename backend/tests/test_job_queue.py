@@ -0,0 +1,97 @@
+import threading
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.brand import Brand
+from app.models.job import RepublicationJob
+from app.models.run import RepublicationRun
+from app.services.job_queue import (
+    claim_next_job,
+    enqueue_job,
+    release_worker_jobs,
+    requeue_stale_jobs,
+)
+
+
+def test_claims_oldest_job_first(db):
+    first = enqueue_job(db, "manual")
+    second = enqueue_job(db, "manual")
+
+    claimed = claim_next_job(db, "worker-1")
+    assert claimed.id == first.id
+    assert (claimed.status, claimed.worker_id, claimed.attempts) == ("running", "worker-1", 1)
+    assert claim_next_job(db, "worker-2").id == second.id
+    assert claim_next_job(db, "worker-3") is None
+
+
+def test_each_job_is_claimed_by_one_worker(db):
+    jobs = 5
+    for _ in range(jobs):
+        enqueue_job(db, "manual")
+    claimed = []
+
+    def worker(name):
+        session = SessionLocal()
+        try:
+            while True:
+                job = claim_next_job(session, name)
+                if job is None:
+                    return
+                claimed.append(job.id)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=worker, args=(f"worker-{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(claimed) == sorted(set(claimed))
+    assert len(claimed) == jobs
+
+
+def _running_job_with_run(db, worker_id, started_at, attempts=1):
+    brand = db.query(Brand).filter(Brand.name == "Toyota").first()
+    if brand is None:
+        brand = Brand(name="Toyota")
+        db.add(brand)
+        db.commit()
+    job = RepublicationJob(
+        kind="manual",
+        status="running",
+        worker_id=worker_id,
+        started_at=started_at,
+        attempts=attempts,
+    )
+    db.add(job)
+    db.commit()
+    run = RepublicationRun(brand_id=brand.id, job_id=job.id, status="running")
+    db.add(run)
+    db.commit()
+    return job, run
+
+
+def test_stale_jobs_are_requeued_and_their_runs_closed(db):
+    old = datetime.utcnow() - timedelta(minutes=settings.job_stale_minutes + 1)
+    stale, stale_run = _running_job_with_run(db, "worker-1", old)
+    fresh, fresh_run = _running_job_with_run(db, "worker-2", datetime.utcnow())
+
+    assert requeue_stale_jobs(db) == [stale.id]
+    db.expire_all()
+    assert (stale.status, stale.worker_id) == ("queued", None)
+    assert stale_run.status == "failed"
+    assert fresh.status == "running"
+    assert fresh_run.status == "running"
+
+
+def test_released_job_fails_after_max_attempts(db):
+    job, run = _running_job_with_run(
+        db, "worker-1", datetime.utcnow(), attempts=settings.JOB_MAX_ATTEMPTS
+    )
+
+    assert release_worker_jobs(db, "worker-1", "Proceso caído", requeue=True) == [job.id]
+    db.expire_all()
+    assert (job.status, job.error) == ("failed", "Proceso caído")
+    assert run.status == "failed"
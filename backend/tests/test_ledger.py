@@ -0,0 +1,45 @@
+import asyncio
+
+from app.core.config import settings
+from app.models.job import RepublicationJob
+from app.models.ledger import AdBump
+from app.services.ledger import AdLedger
+
+
+def _job(db) -> int:
+    job = RepublicationJob(kind="manual", status="running")
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def _interrupted_attempt(job_id: int):
+    """Primer intento: republica "1", falla "2" y se corta sin flush."""
+
+    async def run():
+        ledger = await AdLedger(job_id, attempt=1).load()
+        await ledger.record("1", "Toyota", "bumped", 100)
+        await ledger.record("2", "Toyota", "failed", 100, "timeout")
+
+    asyncio.run(run())
+
+
+def test_retry_resumes_bumped_ads_of_the_same_job(db):
+    job_id = _job(db)
+    _interrupted_attempt(job_id)
+
+    ledger = asyncio.run(AdLedger(job_id, attempt=2).load())
+    assert ledger.skip_reason("1") == "resumed"
+    assert ledger.skip_reason("2") is None
+    # los republicados se escriben al momento; la falla quedó en el buffer
+    assert [r.ad_id for r in db.query(AdBump).all()] == ["1"]
+
+
+def test_other_jobs_only_skip_within_the_window(db, monkeypatch):
+    _interrupted_attempt(_job(db))
+    other = _job(db)
+
+    assert asyncio.run(AdLedger(other).load()).skip_reason("1") is None
+
+    monkeypatch.setattr(settings, "LEDGER_SKIP_WINDOW_MINUTES", 60)
+    assert asyncio.run(AdLedger(other).load()).skip_reason("1") == "recent"
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+from app.models.account import Account
+from app.models.brand import Brand
+from app.models.job import RepublicationJob
+from app.models.schedule import Schedule, ScheduleBrand
+from app.services.job_queue import enqueue_job
+from app.services.planner import SchedulePlan, claim_sibling_jobs
+
+
+def _brands(db, *names):
+    brands = {name: Brand(name=name) for name in names}
+    db.add_all(brands.values())
+    db.commit()
+    return brands
+
+
+def _schedule(db, name, brands, account_id=None) -> Schedule:
+    schedule = Schedule(
+        name=name,
+        days_of_week="mon",
+        times_of_day="09:00",
+        account_id=account_id,
+        brands=[ScheduleBrand(brand=b) for b in brands],
+    )
+    db.add(schedule)
+    db.commit()
+    return schedule
+
+
+def _leader_plan(db, schedule):
+    leader = enqueue_job(db, "schedule", schedule_id=schedule.id)
+    leader.status = "running"
+    leader.worker_id = "worker-1"
+    db.commit()
+    plan = SchedulePlan()
+    assert plan.add(db, leader) is None
+    return leader, plan
+
+
+def test_siblings_in_the_window_merge_into_one_plan(db):
+    brands = _brands(db, "Toyota", "Honda", "Kia")
+    first = _schedule(db, "mañana", [brands["Toyota"], brands["Honda"]])
+    second = _schedule(db, "mañana 2", [brands["Honda"], brands["Kia"]])
+    late = _schedule(db, "tarde", [brands["Kia"]])
+
+    leader, plan = _leader_plan(db, first)
+    sibling = enqueue_job(db, "schedule", schedule_id=second.id)
+    outside = enqueue_job(db, "schedule", schedule_id=late.id)
+    outside.created_at = leader.created_at + timedelta(hours=1)
+    db.commit()
+
+    siblings = claim_sibling_jobs(db, leader, plan)
+
+    assert [s.id for s in siblings] == [sibling.id]
+    assert plan.brand_names == ["Toyota", "Honda", "Kia"]
+    db.refresh(sibling)
+    db.refresh(outside)
+    assert (sibling.status, sibling.worker_id) == ("running", "worker-1")
+    assert outside.status == "queued"
+
+
+def test_schedule_with_another_account_for_a_shared_brand_runs_apart(db):
+    brands = _brands(db, "Toyota", "Honda")
+    account = Account(name="dealer", username="dealer", encrypted_password="x")
+    db.add(account)
+    db.commit()
+    mine = _schedule(db, "propia", [brands["Toyota"]])
+    theirs = _schedule(db, "dealer", [brands["Toyota"], brands["Honda"]], account.id)
+
+    leader, plan = _leader_plan(db, mine)
+    other = enqueue_job(db, "schedule", schedule_id=theirs.id)
+
+    assert claim_sibling_jobs(db, leader, plan) == []
+    assert plan.brand_names == ["Toyota"]
+    assert db.query(RepublicationJob).get(other.id).status == "queued"
+
+
+def test_sibling_already_claimed_is_not_merged(db):
+    brands = _brands(db, "Toyota")
+    first = _schedule(db, "a", [brands["Toyota"]])
+    second = _schedule(db, "b", [brands["Toyota"]])
+
+    leader, plan = _leader_plan(db, first)
+    taken = enqueue_job(db, "schedule", schedule_id=second.id)
+    taken.status = "running"
+    taken.worker_id = "worker-2"
+    taken.started_at = datetime.utcnow()
+    db.commit()
+
+    assert claim_sibling_jobs(db, leader, plan) == []
+    db.refresh(taken)
+    assert taken.worker_id == "worker-2"
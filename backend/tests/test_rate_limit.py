@@ -0,0 +1,49 @@
+import threading
+
+from app.core.config import settings
+from app.models.rate_limit import RateBucket
+from app.services.rate_limit import AdaptiveRateLimiter, _Feedback
+
+
+def test_limiters_share_the_bucket(db):
+    # dos procesos con la misma cuenta: la ráfaga es una sola
+    a = AdaptiveRateLimiter("cuenta")
+    b = AdaptiveRateLimiter("cuenta")
+    waits = [
+        limiter._reserve_sync(_Feedback(), 1)[0]
+        for limiter in (a, b) * settings.RATE_LIMIT_BURST
+    ]
+    burst = settings.RATE_LIMIT_BURST
+    assert all(w == 0 for w in waits[:burst])
+    assert all(w > 0 for w in waits[burst:])
+    assert waits[burst:] == sorted(waits[burst:])
+
+
+def test_concurrent_reservations_are_not_lost(db):
+    reservations = 8
+
+    def reserve():
+        AdaptiveRateLimiter("cuenta")._reserve_sync(_Feedback(), 1)
+
+    threads = [threading.Thread(target=reserve) for _ in range(reservations)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    row = db.query(RateBucket).get("cuenta")
+    assert row.version == reservations
+    assert row.tokens < settings.RATE_LIMIT_BURST - reservations + 1
+
+
+def test_slow_down_lowers_the_rate_once_per_cooldown(db):
+    limiter = AdaptiveRateLimiter("cuenta")
+    _, initial = limiter._reserve_sync(_Feedback(), 0)
+
+    slow = _Feedback()
+    slow.slow_down = True
+    _, lowered = limiter._reserve_sync(slow, 0)
+    _, again = AdaptiveRateLimiter("cuenta")._reserve_sync(slow, 0)
+
+    assert lowered == initial * settings.RATE_LIMIT_DECREASE_FACTOR
+    assert again == lowered
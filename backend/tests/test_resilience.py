@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.resilience import (
+    REJECTED,
+    TIMEOUT,
+    CircuitBreaker,
+    CircuitOpenError,
+    SuperCarrosError,
+    breaker_for,
+    retry_async,
+)
+
+
+def test_breaker_aborts_when_site_never_recovers():
+    # cooldown menor que max_wait: cada sondeo medio abierto falla y lo reabre
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.1, max_wait=0.5)
+
+    async def run():
+        started = time.monotonic()
+        while time.monotonic() - started < 3:
+            await breaker.wait_until_closed()
+            breaker.record_failure(TIMEOUT)
+
+    started = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(run())
+    assert time.monotonic() - started < 1.5
+    assert breaker.times_opened > 1
+
+
+def test_breaker_success_resets_max_wait():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.1, max_wait=0.3)
+
+    async def run():
+        for _ in range(4):
+            breaker.record_failure(TIMEOUT)
+            await breaker.wait_until_closed()
+            breaker.record_success()
+
+    asyncio.run(run())
+    assert breaker.state == "closed"
+    assert breaker.first_opened_at is None
+
+
+def test_rejected_is_not_retried_nor_degrades_the_site():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60, max_wait=60)
+    calls = []
+
+    async def step():
+        calls.append(1)
+        raise SuperCarrosError(REJECTED, "rechazado")
+
+    with pytest.raises(SuperCarrosError) as info:
+        asyncio.run(retry_async(step, attempts=3, breaker=breaker))
+    assert info.value.kind == REJECTED
+    assert len(calls) == 1
+    assert breaker.state == "closed"
+
+
+def test_breakers_are_per_account():
+    breaker_for("cuenta-a").record_failure(TIMEOUT)
+    assert breaker_for("cuenta-a") is not breaker_for("cuenta-b")
+    assert breaker_for("cuenta-b").failures == 0
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_active_user
+from app.main import app
+from app.models.brand import Brand
+from app.models.run import RepublicationRun
+
+
+@pytest.fixture
+def client():
+    # sin `with`: no arrancan el scheduler, el pool ni los workers
+    app.dependency_overrides[get_current_active_user] = lambda: None
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def runs(db):
+    """Dos marcas con varias corridas en el mismo run_at (empates en el cursor)."""
+    toyota, honda = Brand(name="Toyota"), Brand(name="Honda")
+    db.add_all([toyota, honda])
+    db.commit()
+    base = datetime(2024, 1, 1, 9)
+    for i in range(7):
+        for brand in (toyota, honda):
+            db.add(
+                RepublicationRun(
+                    brand_id=brand.id, run_at=base + timedelta(hours=i // 3), vehicles_count=i
+                )
+            )
+    db.commit()
+    return toyota, honda
+
+
+def _all_pages(client, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        body = client.get("/api/runs/", params={**params, "cursor": cursor}).json()
+        ids += [(item["run_at"], item["id"]) for item in body["items"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+def test_pages_cover_every_run_once_newest_first(client, runs, db):
+    ids, pages = _all_pages(client, limit=4)
+
+    assert len(ids) == db.query(RepublicationRun).count() == 14
+    assert pages == 4
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_cursor_keeps_the_filters(client, runs):
+    toyota, _ = runs
+    ids, _ = _all_pages(client, limit=3, brand_id=toyota.id)
+
+    body = client.get("/api/runs/", params={"brand_id": toyota.id, "limit": 100}).json()
+    assert [i["id"] for i in body["items"]] == [run_id for _, run_id in ids]
+    assert all(i["brand_name"] == "Toyota" for i in body["items"])
+    assert len(ids) == 7
+
+
+def test_invalid_cursor_is_a_bad_request(client):
+    response = client.get("/api/runs/", params={"cursor": "no-es-un-cursor"})
+    assert response.status_code == 400
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from app.models.schedule import Schedule
+from app.services.schedule_index import _compile, compile_schedule, upcoming_runs
+
+# 2024-01-01 fue lunes
+MONDAY = datetime(2024, 1, 1)
+
+
+def test_parses_days_and_times_ignoring_garbage():
+    compiled = _compile("Fri, mon,monday,xx,", "14:30,9:00,25:00,abc,09:00")
+    assert compiled.days == (0, 4)
+    assert compiled.times == ((9, 0), (14, 30))
+    assert compiled.cron_days == "mon,fri"
+    assert not _compile("", "09:00")
+
+
+def test_next_after_is_strict_and_wraps_the_week():
+    compiled = _compile("mon,fri", "09:00,14:30")
+    assert compiled.next_after(MONDAY.replace(hour=9)) == MONDAY.replace(hour=14, minute=30)
+    assert compiled.next_after(datetime(2024, 1, 5, 15)) == datetime(2024, 1, 8, 9)
+    assert compiled.occurrences(MONDAY, 3) == [
+        datetime(2024, 1, 1, 9),
+        datetime(2024, 1, 1, 14, 30),
+        datetime(2024, 1, 5, 9),
+    ]
+
+
+def test_fires_between_is_half_open_and_crosses_weeks():
+    compiled = _compile("sun,mon", "09:00")
+    nine = MONDAY.replace(hour=9)
+    assert compiled.fires_between(nine, nine.replace(minute=1))
+    assert not compiled.fires_between(MONDAY, nine)
+    # domingo 10:00 -> lunes 09:30: solo el lunes, ya en la semana siguiente
+    assert compiled.fires_between(datetime(2024, 1, 7, 10), datetime(2024, 1, 8, 9, 30))
+    assert not compiled.fires_between(datetime(2024, 1, 7, 10), datetime(2024, 1, 8, 8))
+
+
+def test_equal_schedules_share_the_compiled_entry_and_runs_merge_in_order():
+    a = Schedule(name="a", days_of_week="mon", times_of_day="10:00")
+    b = Schedule(name="b", days_of_week="mon", times_of_day="09:00,11:00")
+    same = Schedule(name="c", days_of_week="mon", times_of_day="10:00")
+    assert compile_schedule(a) is compile_schedule(same)
+
+    runs = upcoming_runs([a, b], 3, MONDAY)
+    assert [(run_at.hour, s.name) for run_at, s in runs] == [(9, "b"), (10, "a"), (11, "b")]
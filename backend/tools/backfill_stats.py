@@ -0,0 +1,31 @@
+"""
+Reconstruye brand_daily_stats a partir de republication_runs.
+
+Uso:
+    python -m tools.backfill_stats                       # todo el historial
+    python -m tools.backfill_stats --start 2024-01-01 --end 2024-01-31
+"""
+import argparse
+from datetime import date
+
+from app.db.session import SessionLocal, init_db
+from app.services.stats import rebuild_daily_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill de brand_daily_stats")
+    parser.add_argument("--start", type=date.fromisoformat, default=None)
+    parser.add_argument("--end", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        rows = rebuild_daily_stats(db, args.start, args.end)
+    finally:
+        db.close()
+    print(f"brand_daily_stats: {rows} filas reconstruidas")
+
+
+if __name__ == "__main__":
+    main()
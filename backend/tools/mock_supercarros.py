@@ -0,0 +1,351 @@
+"""
+Mock local de los endpoints de SuperCarros usados por el republicador.
+
+Sirve /Login, el listado de anuncios (#Brand, li.AdItem, input.AdCheckBox,
+li.Bump a.cboxElement), el popup de republicación con "Guardar" y el POST de
+republicación con token anti-forgery. Sirve para probar los motores browser
+y http sin tocar el sitio real.
+
+Para benchmarks (ver benchmarks/bench_republication.py) se puede agregar
+latencia por pedido, fotos por anuncio y fallas inyectadas en el POST de
+republicación (500 o 429).
+
+Uso:
+    python -m tools.mock_supercarros --port 8765
+    SUPERCARROS_BASE_URL=http://127.0.0.1:8765 SUPERCARROS_USER=demo SUPERCARROS_PASS=demo ...
+"""
+import argparse
+import html
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+SESSION_COOKIE = "ASP.NET_SessionId"
+TOKEN_FIELD = "__RequestVerificationToken"
+
+LOGIN_HTML = """<!doctype html>
+<html><body>
+<div id="popup"><a href="#" onclick="this.parentNode.remove()">Click Aquí para Cerrar</a></div>
+<form method="post" action="/Login">
+  <input id="username" name="username">
+  <input id="password" name="password" type="password">
+  <button type="submit">Entrar</button>
+</form>
+</body></html>"""
+
+ADS_HTML = """<!doctype html>
+<html><body>
+<input type="hidden" name="{token_field}" value="{token}">
+<select id="Brand" name="Brand">
+  <option value="">Todas</option>
+  {options}
+</select>
+<ul id="AdList">{items}</ul>
+<div id="colorbox" style="display:none"></div>
+<script>
+const box = document.getElementById('colorbox');
+document.getElementById('Brand').addEventListener('change', async (e) => {{
+  const r = await fetch('/Anuncios/Lista?brand=' + encodeURIComponent(e.target.value));
+  document.getElementById('AdList').innerHTML = await r.text();
+}});
+document.addEventListener('click', async (e) => {{
+  const a = e.target.closest('a.cboxElement');
+  if (!a) return;
+  e.preventDefault();
+  const r = await fetch(a.getAttribute('href'));
+  box.innerHTML = '<div id="cboxLoadedContent">' + await r.text() + '</div>';
+  box.style.display = 'block';
+}});
+document.addEventListener('submit', async (e) => {{
+  const f = e.target;
+  if (!f.closest('#colorbox')) return;
+  e.preventDefault();
+  await fetch(f.action, {{method: 'POST', body: new URLSearchParams(new FormData(f))}});
+  document.getElementById('cboxLoadedContent').remove();
+  box.style.display = 'none';
+}});
+</script>
+</body></html>"""
+
+POPUP_HTML = """<form method="post" action="/Anuncios/Republicar/{ad_id}">
+  <input type="hidden" name="{token_field}" value="{token}">
+  <input type="hidden" name="id" value="{ad_id}">
+  <p>¿Republicar anuncio {ad_id}?</p>
+  <button type="submit">Guardar</button>
+</form>"""
+
+
+class MockSuperCarros:
+    """
+    Servidor HTTP en un hilo con estado en memoria.
+    `bumps` cuenta los POST de republicación aceptados por id de anuncio y
+    `failures` los que se hicieron fallar a propósito (por código).
+
+    latency_ms/jitter_ms: demora de cada respuesta (base + aleatorio).
+    failure_rate: fracción de POST de republicación que responden 500.
+    throttle_rate: fracción que responde 429 (SuperCarros frenándonos).
+    image_kb: si es > 0, cada anuncio trae una foto de ese tamaño.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        brands: Optional[List[str]] = None,
+        ads_per_brand: int = 5,
+        username: str = "demo",
+        password: str = "demo",
+        latency_ms: int = 0,
+        jitter_ms: int = 0,
+        failure_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        image_kb: int = 0,
+        seed: Optional[int] = None,
+    ):
+        self.username = username
+        self.password = password
+        self.ads: List[Dict[str, str]] = []
+        ad_id = 1000
+        for brand in brands or ["Toyota", "Honda", "Hyundai"]:
+            for i in range(ads_per_brand):
+                ad_id += 1
+                self.ads.append(
+                    {
+                        "id": str(ad_id),
+                        "brand": brand,
+                        "title": f"{brand} modelo {i + 1}",
+                        "price": f"RD$ {(i + 1) * 500000:,}",
+                    }
+                )
+        self.sessions: Dict[str, str] = {}
+        self.bumps: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.logins = 0
+        self.requests = 0
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.throttle_rate = throttle_rate
+        self.image_kb = image_kb
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockSuperCarros":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # ---- latencia y fallas ----
+
+    def delay(self):
+        with self._lock:
+            self.requests += 1
+            extra = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+        if self.latency_ms or extra:
+            time.sleep((self.latency_ms + extra) / 1000)
+
+    def injected_failure(self) -> Optional[int]:
+        """Código HTTP con el que debe fallar este POST de republicación, o None."""
+        with self._lock:
+            r = self._random.random()
+        if r < self.throttle_rate:
+            return 429
+        if r < self.throttle_rate + self.failure_rate:
+            return 500
+        return None
+
+    # ---- render ----
+
+    def brand_names(self) -> List[str]:
+        return sorted({ad["brand"] for ad in self.ads})
+
+    def render_items(self, brand: str = "") -> str:
+        parts = []
+        for ad in self.ads:
+            if brand and ad["brand"] != brand:
+                continue
+            parts.append(
+                '<li class="AdItem" data-brand="{brand}">'
+                "{photo}"
+                '<input type="checkbox" class="AdCheckBox" data-id="{id}">'
+                '<span class="Title">{title}</span>'
+                '<span class="Price">{price}</span>'
+                '<ul><li class="Bump"><a class="cboxElement" '
+                'href="/Anuncios/Republicar/{id}">REPUBLICAR</a></li></ul>'
+                "</li>".format(
+                    photo='<img src="/img/{}.jpg">'.format(html.escape(ad["id"]))
+                    if self.image_kb
+                    else "",
+                    **{k: html.escape(v) for k, v in ad.items()},
+                )
+            )
+        return "".join(parts)
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(
+                self,
+                status: int,
+                body: str = "",
+                headers: Optional[Dict] = None,
+                content_type: str = "text/html; charset=utf-8",
+            ):
+                data = body.encode("utf-8") if isinstance(body, str) else body
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _redirect(self, location: str, headers: Optional[Dict] = None):
+                self._send(302, "", {"Location": location, **(headers or {})})
+
+            def _session_token(self) -> Optional[str]:
+                for part in (self.headers.get("Cookie") or "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == SESSION_COOKIE:
+                        return mock.sessions.get(value)
+                return None
+
+            def _form(self) -> Dict[str, str]:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length).decode("utf-8")
+                return {k: v[0] for k, v in parse_qs(raw).items()}
+
+            def do_GET(self):
+                mock.delay()
+                url = urlparse(self.path)
+                if url.path == "/Login":
+                    return self._send(200, LOGIN_HTML)
+                if url.path.startswith("/img/"):
+                    return self._send(
+                        200, b"\0" * (mock.image_kb * 1024), content_type="image/jpeg"
+                    )
+
+                token = self._session_token()
+                if token is None:
+                    return self._redirect("/Login")
+
+                if url.path in ("/", "/Anuncios"):
+                    options = "".join(
+                        f'<option value="{html.escape(b)}">{html.escape(b)}</option>'
+                        for b in mock.brand_names()
+                    )
+                    return self._send(
+                        200,
+                        ADS_HTML.format(
+                            token_field=TOKEN_FIELD,
+                            token=token,
+                            options=options,
+                            items=mock.render_items(),
+                        ),
+                    )
+                if url.path == "/Anuncios/Lista":
+                    brand = parse_qs(url.query).get("brand", [""])[0]
+                    return self._send(200, mock.render_items(brand))
+                if url.path.startswith("/Anuncios/Republicar/"):
+                    ad_id = url.path.rsplit("/", 1)[-1]
+                    return self._send(
+                        200,
+                        POPUP_HTML.format(
+                            ad_id=html.escape(ad_id), token_field=TOKEN_FIELD, token=token
+                        ),
+                    )
+                return self._send(404, "Not found")
+
+            def do_POST(self):
+                mock.delay()
+                url = urlparse(self.path)
+                form = self._form()
+                if url.path == "/Login":
+                    if (
+                        form.get("username") == mock.username
+                        and form.get("password") == mock.password
+                    ):
+                        session_id = secrets.token_hex(16)
+                        with mock._lock:
+                            mock.sessions[session_id] = secrets.token_hex(16)
+                            mock.logins += 1
+                        return self._redirect(
+                            "/Anuncios",
+                            {"Set-Cookie": f"{SESSION_COOKIE}={session_id}; Path=/"},
+                        )
+                    return self._send(200, LOGIN_HTML)
+
+                token = self._session_token()
+                if token is None:
+                    return self._redirect("/Login")
+
+                if url.path.startswith("/Anuncios/Republicar/"):
+                    if form.get(TOKEN_FIELD) != token:
+                        return self._send(400, "Token anti-forgery inválido")
+                    failure = mock.injected_failure()
+                    if failure is not None:
+                        with mock._lock:
+                            mock.failures[failure] += 1
+                        return self._send(failure, "Error inyectado")
+                    ad_id = url.path.rsplit("/", 1)[-1]
+                    with mock._lock:
+                        mock.bumps[ad_id] += 1
+                    return self._send(200, '{"ok": true}')
+                return self._send(404, "Not found")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock local de SuperCarros")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ads-per-brand", type=int, default=5)
+    parser.add_argument("--brands", default="Toyota,Honda,Hyundai")
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--image-kb", type=int, default=0)
+    args = parser.parse_args()
+
+    mock = MockSuperCarros(
+        host=args.host,
+        port=args.port,
+        brands=[b.strip() for b in args.brands.split(",") if b.strip()],
+        ads_per_brand=args.ads_per_brand,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        throttle_rate=args.throttle_rate,
+        image_kb=args.image_kb,
+    )
+    print(f"Mock de SuperCarros en {mock.base_url} (usuario demo / demo)")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
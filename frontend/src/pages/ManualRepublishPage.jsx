@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from "react";
 import axios from "axios";
 import { useAuth } from "../context/AuthContext";
+import { createProgressTracker, waitForJob } from "../utils/jobs";
 
 export default function ManualRepublishPage() {
   const { token } = useAuth();
@@ -44,6 +45,18 @@ export default function ManualRepublishPage() {
     return interval;
   };
 
+  // Avance real del job (SSE): reemplaza la animación en cuanto llega un evento
+  const trackJob = (interval, label) => {
+    const track = createProgressTracker();
+    return (event) => {
+      const { brand, percent } = track(event);
+      if (percent == null) return;
+      clearInterval(interval);
+      setRunProgress(percent);
+      if (brand) setRunningLabel(`${label} (${brand})`);
+    };
+  };
+
   const stopProgress = (interval) => {
     if (interval) clearInterval(interval);
     setRunProgress(100);
@@ -63,11 +76,12 @@ export default function ManualRepublishPage() {
     setRunningLabel("Republicando marca seleccionada...");
     const interval = startProgress();
     try {
-      await axios.post(
+      const res = await axios.post(
         "/api/manual/run",
         { brand_ids: [Number(selectedBrandId)], all_brands: false },
         { headers }
       );
+      await waitForJob(res.data.id, headers, trackJob(interval, "Republicando marca seleccionada"));
       await loadHistory();
     } catch (err) {
       console.error(err);
@@ -85,11 +99,12 @@ export default function ManualRepublishPage() {
     setRunningLabel("Republicando todas las marcas...");
     const interval = startProgress();
     try {
-      await axios.post(
+      const res = await axios.post(
         "/api/manual/run",
         { all_brands: true },
         { headers }
       );
+      await waitForJob(res.data.id, headers, trackJob(interval, "Republicando todas las marcas"));
       await loadHistory();
     } catch (err) {
       console.error(err);
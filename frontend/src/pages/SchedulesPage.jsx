@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from "react";
 import axios from "axios";
 import { useAuth } from "../context/AuthContext";
+import { waitForJob } from "../utils/jobs";
 
 // MUI + Dayjs
 import dayjs from "dayjs";
@@ -183,7 +184,10 @@ export default function SchedulesPage() {
     }, 300);
 
     try {
-      await axios.post(`/api/schedules/${id}/run-once`, null, { headers });
+      const res = await axios.post(`/api/schedules/${id}/run-once`, null, {
+        headers,
+      });
+      await waitForJob(res.data.id, headers);
       setRunProgress(100);
       await new Promise((resolve) => setTimeout(resolve, 500));
     } catch (err) {
@@ -0,0 +1,86 @@
+import axios from "axios";
+
+function finalJob(job) {
+  if (job.status === "completed") return job;
+  if (job.status === "failed") {
+    throw new Error(job.error || "La republicación falló");
+  }
+  return null;
+}
+
+// Espera consultando /api/jobs/{id} (respaldo si el stream no está disponible).
+async function pollJob(jobId, headers, intervalMs) {
+  for (;;) {
+    const res = await axios.get(`/api/jobs/${jobId}`, { headers });
+    const job = finalJob(res.data);
+    if (job) return job;
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
+// Lee el stream SSE /api/jobs/{id}/events y llama onEvent por cada evento.
+// Se usa fetch (y no EventSource) para poder mandar el header Authorization.
+async function streamJobEvents(jobId, headers, onEvent) {
+  const res = await fetch(`${axios.defaults.baseURL || ""}/api/jobs/${jobId}/events`, {
+    headers,
+  });
+  if (!res.ok || !res.body) throw new Error(`SSE no disponible (${res.status})`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += decoder.decode(value, { stream: true });
+    let sep;
+    while ((sep = buffer.indexOf("\n\n")) >= 0) {
+      const chunk = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      const data = chunk
+        .split("\n")
+        .filter((line) => line.startsWith("data: "))
+        .map((line) => line.slice(6))
+        .join("\n");
+      if (data) onEvent(JSON.parse(data));
+    }
+  }
+}
+
+// Espera a que un job de republicación termine. Recibe el avance en vivo por
+// SSE (onProgress recibe cada evento: brand_started, ad_bumped,
+// brand_finished...) y si el stream falla consulta /api/jobs/{id} cada
+// intervalMs. Devuelve el job final; lanza error si el job falla.
+export async function waitForJob(jobId, headers, onProgress, intervalMs = 2000) {
+  try {
+    await streamJobEvents(jobId, headers, (event) => {
+      if (onProgress) onProgress(event);
+    });
+  } catch (err) {
+    console.warn("Sin avance en vivo, consultando estado del job", err);
+  }
+  return pollJob(jobId, headers, intervalMs);
+}
+
+// Porcentaje de avance a partir de los eventos del job.
+export function createProgressTracker() {
+  const found = {};
+  const bumped = {};
+  return (event) => {
+    if (event.type === "snapshot") {
+      (event.runs || []).forEach((run) => {
+        if (run.ads_found != null) found[run.brand] = run.ads_found;
+        if (run.ads_bumped != null) bumped[run.brand] = run.ads_bumped;
+      });
+    } else if (event.brand) {
+      if (event.ads_found != null) found[event.brand] = event.ads_found;
+      bumped[event.brand] = event.ads_bumped || 0;
+    }
+    const total = Object.values(found).reduce((a, b) => a + b, 0);
+    const done = Object.values(bumped).reduce((a, b) => a + b, 0);
+    return {
+      brand: event.brand,
+      percent: total ? Math.min(99, Math.round((done * 100) / total)) : null,
+    };
+  };
+}